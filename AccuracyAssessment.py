@@ -1,13 +1,38 @@
 from qgis.core import (
-    QgsProject, QgsVectorLayer, QgsFeature, QgsGeometry,
-    QgsPointXY, QgsRasterLayer, QgsField, QgsWkbTypes, edit, QgsMarkerSymbol, QgsCoordinateTransform, QgsGraduatedSymbolRenderer, QgsFillSymbol, QgsRuleBasedRenderer, QgsExpression, QgsFeatureRequest
+    QgsProject, QgsVectorLayer, QgsRasterLayer, QgsField, QgsWkbTypes, QgsMarkerSymbol, QgsGraduatedSymbolRenderer, QgsFillSymbol, QgsRuleBasedRenderer, QgsExpression, QgsFeatureRequest,
+    QgsApplication, QgsSettings
 )
+from qgis.gui import QgsFileWidget
 from qgis.PyQt.QtWidgets import (
-    QDialog, QVBoxLayout, QPushButton, QLabel, QLineEdit, QListWidget, QComboBox, QMessageBox, QAction, QFormLayout
+    QDialog, QVBoxLayout, QPushButton, QLabel, QLineEdit, QListWidget, QComboBox, QMessageBox, QAction, QFormLayout,
+    QSpinBox, QDockWidget, QWidget, QHBoxLayout, QShortcut, QFileDialog
 )
-from qgis.PyQt.QtCore import QVariant
-import random
+from qgis.PyQt.QtCore import QVariant, Qt, pyqtSignal
+from qgis.PyQt.QtGui import QKeySequence, QFontDatabase
+import os
+import time
+
+import numpy as np
+
+from .accuracy_statistics import format_report
+from .assessment_session import AssessmentSession, describe_classes
+from .attribute_update import add_field_if_missing
+from .feature_writer import OUTPUT_DRIVERS, OUTPUT_FILE_FILTER
+from .instrumentation import (
+    export_json, is_enabled, is_memory_tracing, recorded_profiles, set_enabled, set_memory_tracing, start_profile
+)
+from .layer_columns import column_cache
+from .render_prefetch import RenderPrefetcher
+from .point_generation import GENERATION_MODES
+from .processing_provider import AccuracyAssessmentProvider
+from .stratified_sampling import ALLOCATION_METHODS, ALLOCATION_OLOFSSON
+from .tasks import GeneratePointsTask, MergeLayersTask, StatisticsTask, TextMappingTask, log_profile, start_task
+from .window_statistics import HOMOGENEITY_ACTIONS, HOMOGENEITY_REPLACE, WindowFilter
+
 
+# Ключи настроек QGIS, включающих замеры производительности и памяти
+PROFILING_SETTING = "AccuracyAssessment/profiling"
+MEMORY_TRACING_SETTING = "AccuracyAssessment/memory_tracing"
 
 class AccuracyAssessment:
     def __init__(self, iface):
@@ -22,8 +47,19 @@ class AccuracyAssessment:
         self.action_assessment = None
         self.action_text_mapping = None
         self.action_statistics = None
+        self.action_profiling = None
+        self.action_memory_tracing = None
+        self.action_export_profiles = None
+        self.provider = None
+
+    def initProcessing(self):
+        # Алгоритмы Processing доступны и без интерфейса (qgis_process)
+        self.provider = AccuracyAssessmentProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
 
     def initGui(self):
+        self.initProcessing()
+
         # Генерация случайных точек
         self.action_generate = QAction("1. Генерация случайных точек", self.iface.mainWindow())
         self.action_generate.triggered.connect(self.open_generate_dialog)
@@ -48,7 +84,26 @@ class AccuracyAssessment:
         self.action_statistics = QAction("5. Статистика оценки точности", self.iface.mainWindow())
         self.action_statistics.triggered.connect(self.open_statistics_dialog)
         self.iface.addPluginToMenu("Accuracy Assessment Assistant", self.action_statistics)
-    
+
+        # Замеры производительности (сводки выводятся в журнал сообщений)
+        set_enabled(QgsSettings().value(PROFILING_SETTING, False, type=bool))
+        self.action_profiling = QAction("Замеры производительности", self.iface.mainWindow())
+        self.action_profiling.setCheckable(True)
+        self.action_profiling.setChecked(is_enabled())
+        self.action_profiling.toggled.connect(self.toggle_profiling)
+        self.iface.addPluginToMenu("Accuracy Assessment Assistant", self.action_profiling)
+
+        # Трассировка памяти замедляет весь процесс, поэтому включается отдельно
+        set_memory_tracing(QgsSettings().value(MEMORY_TRACING_SETTING, False, type=bool))
+        self.action_memory_tracing = QAction("Замеры памяти (замедляют работу)", self.iface.mainWindow())
+        self.action_memory_tracing.setCheckable(True)
+        self.action_memory_tracing.setChecked(is_memory_tracing())
+        self.action_memory_tracing.toggled.connect(self.toggle_memory_tracing)
+        self.iface.addPluginToMenu("Accuracy Assessment Assistant", self.action_memory_tracing)
+
+        self.action_export_profiles = QAction("Сохранить замеры в JSON…", self.iface.mainWindow())
+        self.action_export_profiles.triggered.connect(self.export_profiles)
+        self.iface.addPluginToMenu("Accuracy Assessment Assistant", self.action_export_profiles)
 
     def unload(self): # Выгрузка пунктов меню при закрытии модуля
         self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_generate)
@@ -56,6 +111,12 @@ class AccuracyAssessment:
         self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_assessment)
         self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_text_mapping)
         self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_statistics)
+        self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_profiling)
+        self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_memory_tracing)
+        self.iface.removePluginMenu("Accuracy Assessment Assistant", self.action_export_profiles)
+        set_enabled(False)
+        set_memory_tracing(False)
+        QgsApplication.processingRegistry().removeProvider(self.provider)
 
     # Открытие различных пунктов меню
     def open_generate_dialog(self):
@@ -78,6 +139,91 @@ class AccuracyAssessment:
         self.dialog_statistics = AssessmentStatisticsDialog(self.iface)
         self.dialog_statistics.exec_()
 
+    def toggle_profiling(self, enabled):
+        QgsSettings().setValue(PROFILING_SETTING, enabled)
+        set_enabled(enabled)
+
+    def toggle_memory_tracing(self, enabled):
+        QgsSettings().setValue(MEMORY_TRACING_SETTING, enabled)
+        set_memory_tracing(enabled)
+
+    def export_profiles(self):
+        if not recorded_profiles():
+            self.iface.messageBar().pushInfo(
+                "Замеры производительности", "Нет завершённых замеров: включите замеры и выполните операцию."
+            )
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self.iface.mainWindow(), "Сохранить замеры производительности", "", "JSON (*.json)"
+        )
+        if path:
+            export_json(path)
+
+
+def create_output_file_widget():
+    """Поле выбора файла GeoPackage/FlatGeobuf для записи точек."""
+    widget = QgsFileWidget()
+    widget.setStorageMode(QgsFileWidget.SaveFile)
+    widget.setFilter(OUTPUT_FILE_FILTER)
+    widget.setDialogTitle("Сохранить точки в файл")
+    return widget
+
+
+def output_file_path(parent, widget):
+    """Путь к файлу результата, None для временного слоя или False при неверном формате."""
+    path = widget.filePath().strip()
+    if not path:
+        return None
+    if os.path.splitext(path)[1].lower() not in OUTPUT_DRIVERS:
+        QMessageBox.warning(parent, "Ошибка", "Файл результата должен иметь расширение .gpkg или .fgb.")
+        return False
+    return path
+
+
+class WindowFilterInputs(QWidget):
+    """Параметры статистики окрестности точек и фильтра однородности."""
+
+    def __init__(self, allow_replace=True):
+        super().__init__()
+        self.window_spin = QSpinBox()
+        self.purity_spin = QSpinBox()
+        self.action_combo = QComboBox()
+
+        # Окно 1 x 1 — статистика окрестности не рассчитывается
+        self.window_spin.setRange(1, 25)
+        self.window_spin.setSingleStep(2)
+        self.window_spin.setValue(1)
+        self.purity_spin.setRange(0, 100)
+        self.purity_spin.setSuffix(" %")
+        for action, label in HOMOGENEITY_ACTIONS:
+            if allow_replace or action != HOMOGENEITY_REPLACE:
+                self.action_combo.addItem(label, action)
+
+        layout = QFormLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addRow("Окно окрестности, пикселей:", self.window_spin)
+        layout.addRow("Минимальная доля преобладающего класса:", self.purity_spin)
+        layout.addRow("Неоднородные точки:", self.action_combo)
+        self.setLayout(layout)
+
+        self.window_spin.valueChanged.connect(self.update_inputs)
+        self.update_inputs()
+
+    def update_inputs(self):
+        enabled = self.window_spin.value() > 1
+        self.purity_spin.setEnabled(enabled)
+        self.action_combo.setEnabled(enabled)
+
+    def window_filter(self):
+        """WindowFilter или None, если окрестность не используется."""
+        window_size = self.window_spin.value()
+        if window_size <= 1:
+            return None
+        # Чётное окно не имеет центрального пикселя — расширяем до нечётного
+        if window_size % 2 == 0:
+            window_size += 1
+        return WindowFilter(window_size, self.purity_spin.value() / 100.0, self.action_combo.currentData())
+
 
 class RandomPointGeneratorDialog(QDialog):
     def __init__(self, iface):
@@ -88,21 +234,59 @@ class RandomPointGeneratorDialog(QDialog):
 
         self.vector_layer = QComboBox()
         self.raster_layer = QComboBox()
+        self.mode_combo = QComboBox()
         self.point_count_input = QLineEdit()
+        self.min_distance_input = QLineEdit("0")
+        self.allocation_combo = QComboBox()
+        self.standard_error_input = QLineEdit("0.01")
+        self.expected_accuracy_input = QLineEdit("0.8")
+        self.window_inputs = WindowFilterInputs()
+        self.output_file = create_output_file_widget()
         self.upload_button = QPushButton("Создать точки")
 
+        for mode, label in GENERATION_MODES:
+            self.mode_combo.addItem(label, mode)
+        for method, label in ALLOCATION_METHODS:
+            self.allocation_combo.addItem(label, method)
+
+        self.stratified_form = QFormLayout()
+        self.stratified_form.addRow("Распределение точек:", self.allocation_combo)
+        self.stratified_form.addRow("Целевая стандартная ошибка:", self.standard_error_input)
+        self.stratified_form.addRow("Ожидаемая точность классов:", self.expected_accuracy_input)
+
         self.layout.addWidget(QLabel("Выберите векторный слой:"))
         self.layout.addWidget(self.vector_layer)
         self.layout.addWidget(QLabel("Выберите растровый слой:"))
         self.layout.addWidget(self.raster_layer)
+        self.layout.addWidget(QLabel("Область размещения точек:"))
+        self.layout.addWidget(self.mode_combo)
         self.layout.addWidget(QLabel("Введите количество точек:"))
         self.layout.addWidget(self.point_count_input)
+        self.layout.addWidget(QLabel("Минимальное расстояние между точками (в единицах СК векторного слоя, 0 — без ограничения):"))
+        self.layout.addWidget(self.min_distance_input)
+        self.layout.addLayout(self.stratified_form)
+        self.layout.addWidget(self.window_inputs)
+        self.layout.addWidget(QLabel("Файл результата (пусто — временный слой):"))
+        self.layout.addWidget(self.output_file)
         self.layout.addWidget(self.upload_button)
 
         self.setLayout(self.layout)
 
+        self.mode_combo.currentIndexChanged.connect(self.update_mode_inputs)
+        self.allocation_combo.currentIndexChanged.connect(self.update_mode_inputs)
         self.upload_button.clicked.connect(self.generate_random_points)
         self.load_layers()
+        self.update_mode_inputs()
+
+    def update_mode_inputs(self):
+        stratified = self.mode_combo.currentData() == "stratified"
+        olofsson = stratified and self.allocation_combo.currentData() == ALLOCATION_OLOFSSON
+        self.allocation_combo.setEnabled(stratified)
+        self.min_distance_input.setEnabled(not stratified)
+        self.standard_error_input.setEnabled(olofsson)
+        self.expected_accuracy_input.setEnabled(olofsson)
+        # При расчёте по стандартной ошибке число точек определяется автоматически
+        self.point_count_input.setEnabled(not olofsson)
 
     def load_layers(self):
         layers = QgsProject.instance().mapLayers().values()
@@ -121,29 +305,38 @@ class RandomPointGeneratorDialog(QDialog):
 
         vector_layer = QgsProject.instance().mapLayer(vector_layer_id)
         raster_layer = QgsProject.instance().mapLayer(raster_layer_id)
-        point_count = int(self.point_count_input.text())
-
-        project_crs = QgsProject.instance().crs()
-        point_layer = QgsVectorLayer(f"Point?crs={project_crs.authid()}", "Случайные точки", "memory")
-        provider = point_layer.dataProvider()
-        provider.addAttributes([QgsField("ID", QVariant.Int), QgsField("RasterValue", QVariant.Double)])
-        point_layer.updateFields()
-
-        for i in range(point_count):
-            extent = vector_layer.extent()
-            x = random.uniform(extent.xMinimum(), extent.xMaximum())
-            y = random.uniform(extent.yMinimum(), extent.yMaximum())
-            point = QgsFeature()
-            point.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
-            raster_value = self.get_raster_value(raster_layer, x, y)
-            point.setAttributes([i + 1, raster_value])
-            provider.addFeature(point)
-
-        point_layer.updateExtents()
-        QgsProject.instance().addMapLayer(point_layer)
-
-        # Применение стиля
-        self.apply_style_to_layer(point_layer)
+        try:
+            point_count = int(self.point_count_input.text()) if self.point_count_input.isEnabled() else None
+            target_standard_error = float(self.standard_error_input.text())
+            expected_accuracy = float(self.expected_accuracy_input.text())
+            min_distance = float(self.min_distance_input.text()) if self.min_distance_input.isEnabled() else 0
+        except ValueError:
+            QMessageBox.warning(self, "Ошибка", "Проверьте введённые числовые параметры.")
+            return
+        if self.standard_error_input.isEnabled():
+            if not 0 < target_standard_error <= 1:
+                QMessageBox.warning(self, "Ошибка", "Целевая стандартная ошибка должна быть больше 0 и не больше 1.")
+                return
+            if not 0 <= expected_accuracy <= 1:
+                QMessageBox.warning(self, "Ошибка", "Ожидаемая точность должна быть в диапазоне от 0 до 1.")
+                return
+        output_path = output_file_path(self, self.output_file)
+        if output_path is False:
+            return
+
+        # Генерация выполняется в фоне, слой добавляется в проект по завершении
+        task = GeneratePointsTask(
+            vector_layer, raster_layer, self.mode_combo.currentData(), point_count,
+            allocation_method=self.allocation_combo.currentData(),
+            target_standard_error=target_standard_error,
+            expected_accuracy=expected_accuracy,
+            output_path=output_path,
+            window=self.window_inputs.window_filter(),
+            min_distance=min_distance,
+        )
+        task.layerCreated.connect(self.apply_style_to_layer)
+        start_task(task, self.iface)
+        self.close()
 
     def apply_style_to_layer(self, layer):
         # Создаем символ для точек
@@ -158,13 +351,6 @@ class RandomPointGeneratorDialog(QDialog):
             layer.renderer().setSymbol(symbol)
             layer.triggerRepaint()
 
-    def get_raster_value(self, raster_layer, x, y):
-        if raster_layer.isValid():
-            provider = raster_layer.dataProvider()
-            value = provider.sample(QgsPointXY(x, y), 1)
-            return value[0] if value else None
-        return None
-
 class PointLayerMergerDialog(QDialog):
     def __init__(self, iface):
         super().__init__()
@@ -173,20 +359,40 @@ class PointLayerMergerDialog(QDialog):
         self.layout = QVBoxLayout()
 
         self.point_layers_list = QListWidget()
-        self.raster_layer_combo = QComboBox()
+        self.carried_fields_list = QListWidget()
+        self.tolerance_input = QLineEdit("0")
+        self.raster_bands_list = QListWidget()
+        self.workers_spin = QSpinBox()
+        self.window_inputs = WindowFilterInputs(allow_replace=False)
+        self.output_file = create_output_file_widget()
         self.merge_button = QPushButton("Объединить и заполнить точки")
 
         self.point_layers_list.setSelectionMode(QListWidget.MultiSelection)
+        self.carried_fields_list.setSelectionMode(QListWidget.MultiSelection)
+        self.raster_bands_list.setSelectionMode(QListWidget.MultiSelection)
+        # 1 — чтение в одном процессе, больше 1 — пул процессов (только растры GDAL)
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(1)
 
         self.layout.addWidget(QLabel("Выберите точечные слои:"))
         self.layout.addWidget(self.point_layers_list)
-        self.layout.addWidget(QLabel("Выберите растровый слой:"))
-        self.layout.addWidget(self.raster_layer_combo)
+        self.layout.addWidget(QLabel("Переносимые поля исходных слоёв:"))
+        self.layout.addWidget(self.carried_fields_list)
+        self.layout.addWidget(QLabel("Допуск совпадения точек (в единицах СК проекта, 0 — без удаления дубликатов):"))
+        self.layout.addWidget(self.tolerance_input)
+        self.layout.addWidget(QLabel("Выберите каналы растров (первый записывается в RasterValue):"))
+        self.layout.addWidget(self.raster_bands_list)
+        self.layout.addWidget(QLabel("Число процессов для чтения растра:"))
+        self.layout.addWidget(self.workers_spin)
+        self.layout.addWidget(self.window_inputs)
+        self.layout.addWidget(QLabel("Файл результата (пусто — временный слой):"))
+        self.layout.addWidget(self.output_file)
         self.layout.addWidget(self.merge_button)
 
         self.setLayout(self.layout)
 
         self.merge_button.clicked.connect(self.merge_layers)
+        self.point_layers_list.itemSelectionChanged.connect(self.load_fields)
         self.load_layers()
 
     def load_layers(self):
@@ -196,7 +402,24 @@ class PointLayerMergerDialog(QDialog):
                 self.point_layers_list.addItem(layer.name())
                 self.point_layers_list.item(self.point_layers_list.count() - 1).setData(1, layer.id())
             elif isinstance(layer, QgsRasterLayer):
-                self.raster_layer_combo.addItem(layer.name(), layer.id())
+                for band in range(1, layer.bandCount() + 1):
+                    self.raster_bands_list.addItem(f"{layer.name()} — {layer.bandName(band)}")
+                    self.raster_bands_list.item(self.raster_bands_list.count() - 1).setData(Qt.UserRole, (layer.id(), band))
+        if self.raster_bands_list.count():
+            self.raster_bands_list.item(0).setSelected(True)
+
+    def load_fields(self):
+        """Поля выбранных точечных слоёв; выбор уже отмеченных полей сохраняется."""
+        selected = {item.text() for item in self.carried_fields_list.selectedItems()}
+        names = []
+        for item in self.point_layers_list.selectedItems():
+            layer = QgsProject.instance().mapLayer(item.data(1))
+            if layer is not None:
+                names.extend(name for name in layer.fields().names() if name not in names)
+        self.carried_fields_list.clear()
+        for name in names:
+            self.carried_fields_list.addItem(name)
+            self.carried_fields_list.item(self.carried_fields_list.count() - 1).setSelected(name in selected)
 
     def merge_layers(self):
         selected_point_layer_ids = [
@@ -204,43 +427,36 @@ class PointLayerMergerDialog(QDialog):
             for i in range(self.point_layers_list.count())
             if self.point_layers_list.item(i).isSelected()
         ]
-        raster_layer_id = self.raster_layer_combo.currentData()
-        if not selected_point_layer_ids or not raster_layer_id:
-            QMessageBox.warning(self, "Ошибка", "Выберите точечные и растровый слой.")
+        selected_raster_bands = [
+            self.raster_bands_list.item(i).data(Qt.UserRole)
+            for i in range(self.raster_bands_list.count())
+            if self.raster_bands_list.item(i).isSelected()
+        ]
+        if not selected_point_layer_ids or not selected_raster_bands:
+            QMessageBox.warning(self, "Ошибка", "Выберите точечные слои и каналы растров.")
             return
 
-        raster_layer = QgsProject.instance().mapLayer(raster_layer_id)
-        project_crs = QgsProject.instance().crs()
-        raster_crs = raster_layer.crs()
-        crs_transform = QgsCoordinateTransform(project_crs, raster_crs, QgsProject.instance())
-
-        merged_layer = QgsVectorLayer(f"Point?crs={project_crs.authid()}", "Объединенные точки", "memory")
-        provider = merged_layer.dataProvider()
-        provider.addAttributes([QgsField("RasterValue", QVariant.Double)])
-        merged_layer.updateFields()
-
-        for layer_id in selected_point_layer_ids:
-            point_layer = QgsProject.instance().mapLayer(layer_id)
-            for feature in point_layer.getFeatures():
-                new_feature = QgsFeature()
-                new_feature.setGeometry(feature.geometry())
-                point_geom = feature.geometry().asPoint()
-                transformed_point = crs_transform.transform(QgsPointXY(point_geom.x(), point_geom.y()))
-                raster_value = self.get_raster_value(raster_layer, transformed_point.x(), transformed_point.y())
-                new_feature.setAttributes([raster_value])
-                provider.addFeature(new_feature)
-
-        merged_layer.updateExtents()
-        QgsProject.instance().addMapLayer(merged_layer)
-        self.apply_style_to_layer(merged_layer)
-
-    def get_raster_value(self, raster_layer, x, y):
-        if raster_layer.isValid():
-            provider = raster_layer.dataProvider()
-            value = provider.sample(QgsPointXY(x, y), 1)
-            if value[1]:  # Проверяем, успешно ли выполнено чтение
-                return value[0]
-        return None
+        try:
+            tolerance = float(self.tolerance_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Ошибка", "Проверьте допуск совпадения точек.")
+            return
+
+        raster_bands = [(QgsProject.instance().mapLayer(layer_id), band) for layer_id, band in selected_raster_bands]
+        point_layers = [QgsProject.instance().mapLayer(layer_id) for layer_id in selected_point_layer_ids]
+        output_path = output_file_path(self, self.output_file)
+        if output_path is False:
+            return
+
+        # Объединение выполняется в фоне, слой добавляется в проект по завершении
+        task = MergeLayersTask(
+            point_layers, raster_bands, self.workers_spin.value(), output_path, self.window_inputs.window_filter(),
+            tolerance=tolerance,
+            carried_fields=[item.text() for item in self.carried_fields_list.selectedItems()],
+        )
+        task.layerCreated.connect(self.apply_style_to_layer)
+        start_task(task, self.iface)
+        self.close()
 
     def apply_style_to_layer(self, layer):
     # Создаем символ с оранжевым кругом и чёрной окантовкой
@@ -255,6 +471,88 @@ class PointLayerMergerDialog(QDialog):
             layer.renderer().setSymbol(symbol)
             layer.triggerRepaint()
 
+class AssessmentDock(QDockWidget):
+    """Немодальная панель оценки точек с клавишами быстрого выбора."""
+
+    answered = pyqtSignal(int)
+    skipped = pyqtSignal()
+    aborted = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__("Оценка точек", parent)
+        self.setObjectName("AccuracyAssessmentDock")
+
+        widget = QWidget()
+        layout = QVBoxLayout()
+        self.progress_label = QLabel("")
+        self.value_label = QLabel("")
+        self.value_label.setWordWrap(True)
+        self.yes_button = QPushButton("Совпадает (Y)")
+        self.no_button = QPushButton("Не совпадает (N)")
+        self.skip_button = QPushButton("Пропустить класс")
+        self.skip_button.setToolTip("Не оценивать оставшиеся точки класса текущей точки")
+        self.abort_button = QPushButton("Прервать")
+        self.accuracy_label = QLabel("")
+        self.accuracy_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.accuracy_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.yes_button)
+        buttons.addWidget(self.no_button)
+        layout.addWidget(self.progress_label)
+        layout.addWidget(self.value_label)
+        layout.addLayout(buttons)
+        layout.addWidget(self.skip_button)
+        layout.addWidget(self.abort_button)
+        layout.addWidget(self.accuracy_label)
+        layout.addStretch()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+        self.yes_button.clicked.connect(lambda: self.answered.emit(1))
+        self.no_button.clicked.connect(lambda: self.answered.emit(0))
+        self.skip_button.clicked.connect(self.skipped.emit)
+        self.abort_button.clicked.connect(self.aborted.emit)
+
+        # Клавиши работают, только пока фокус в панели, и не мешают вводу
+        # в других виджетах QGIS; щелчок по панели возвращает ей фокус
+        self.setFocusPolicy(Qt.StrongFocus)
+        for key, value in (("Y", 1), ("1", 1), ("N", 0), ("0", 0)):
+            shortcut = QShortcut(QKeySequence(key), self)
+            shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(lambda value=value: self.answered.emit(value))
+
+    def activate(self):
+        """Показывает панель поверх других и передаёт ей фокус клавиатуры."""
+        self.raise_()
+        self.setFocus()
+
+    def show_point(self, display_value, position, total):
+        self.progress_label.setText(f"Точка {position} из {total}")
+        self.value_label.setText(f"Совпадение точки? (Значение: {display_value})")
+
+    def show_accuracy(self, running):
+        """Выводит текущую точность по классам карты."""
+        if running is None or not running.counts:
+            self.accuracy_label.setText("")
+            return
+        report = running.report()
+        labels = [str(label) for label in report.classes.tolist()]
+        width = max(len(label) for label in labels + ["Класс"]) + 2
+        lines = ["Класс".ljust(width) + "Точек  Совп.  Точность"]
+        for i, label in enumerate(labels):
+            lines.append(
+                f"{label.ljust(width)}{report.sample_counts[i]:>5}  {int(report.correct_counts[i]):>5}  "
+                f"{report.users[i] * 100:5.1f}% ± {np.nan_to_num(report.users_se[i]) * 100:.1f}%"
+            )
+        lines.append(f"Общая: {report.overall * 100:.1f}% (точек: {report.total})")
+        self.accuracy_label.setText("\n".join(lines))
+
+    def closeEvent(self, event):
+        self.aborted.emit()
+        super().closeEvent(event)
+
+
 class PointAssessmentDialog(QDialog):
     def __init__(self, iface):
         super().__init__()
@@ -269,6 +567,17 @@ class PointAssessmentDialog(QDialog):
         self.layout.addWidget(self.start_button)
         self.setLayout(self.layout)
 
+        self.layer = None
+        self.session = None
+        self.dock = None
+        self.prefetcher = None
+        self.pending = []
+        self.position = 0
+        self.current_feature = None
+        self.profile = None
+        self.render_started = None
+        self.write_error_shown = False
+
         self.start_button.clicked.connect(self.start_assessment)
         self.load_layers()
 
@@ -285,27 +594,71 @@ class PointAssessmentDialog(QDialog):
             return
 
         point_layer = QgsProject.instance().mapLayer(layer_id)
+        try:
+            self.add_assessment_column(point_layer)
+        except ValueError as error:
+            QMessageBox.warning(self, "Ошибка", str(error))
+            return
         self.hide()  # Скрытие основного окна
-        self.add_assessment_column(point_layer)
 
-        features = list(point_layer.getFeatures())
-        for feature in features:
-            self.evaluate_point(point_layer, feature)
+        # Оценка продолжается с первой неоценённой точки
+        self.layer = point_layer
+        self.session = AssessmentSession(point_layer)
+        if self.session.skipped_classes:
+            answer = QMessageBox.question(
+                self, "Пропущенные классы",
+                f"В прошлых сеансах пропущены классы: {describe_classes(self.session.skipped_classes)}. "
+                f"Вернуть их точки в оценку?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if answer == QMessageBox.Yes:
+                self.session.reset_skipped_classes()
+        self.pending = self.session.pending_feature_ids()
+        self.position = 0
+        if not self.pending:
+            session, self.session = self.session, None
+            session.close()
+            if session.skipped_count:
+                message = (
+                    f"Все точки слоя, кроме пропущенных классов ({describe_classes(session.skipped_classes)}), "
+                    f"уже оценены. Не оценено точек: {session.skipped_count}."
+                )
+            else:
+                message = "Все точки слоя уже оценены."
+            QMessageBox.information(self, "Готово", message)
+            self.close()
+            return
 
-        QMessageBox.information(self, "Готово", "Оценка завершена!")
-        self.close()
+        self.profile = start_profile("evaluate_point")
+        self.prefetcher = RenderPrefetcher(self.iface.mapCanvas())
+        self.iface.mapCanvas().mapCanvasRefreshed.connect(self.record_render_time)
+        self.dock = AssessmentDock(self.iface.mainWindow())
+        self.dock.answered.connect(self.record_answer)
+        self.dock.skipped.connect(self.skip_current_class)
+        self.dock.aborted.connect(lambda: self.finish_assessment(False))
+        self.iface.addDockWidget(Qt.RightDockWidgetArea, self.dock)
+        self.dock.activate()
+        self.dock.show_accuracy(self.session.running)
+        self.show_current_point()
 
     def add_assessment_column(self, layer):
-        provider = layer.dataProvider()
-        if 'Assessment' not in [field.name() for field in provider.fields()]:
-            provider.addAttributes([QgsField('Assessment', QVariant.Int)])
-            layer.updateFields()
+        add_field_if_missing(layer, QgsField('Assessment', QVariant.Int))
+
+    def show_current_point(self):
+        self.current_feature = self.layer.getFeature(self.pending[self.position])
+        self.evaluate_point(self.layer, self.current_feature)
 
     def evaluate_point(self, layer, feature):
+        """Показывает точку на карте и в панели оценки, заранее отрисовывая следующие."""
+        with self.profile.stage("evaluate_point", 1):
+            self.display_point(layer, feature)
+
+    def display_point(self, layer, feature):
         canvas = self.iface.mapCanvas()
-        canvas.setInteractive(False)
         canvas.setCenter(feature.geometry().asPoint())
         canvas.zoomScale(7500)
+        # Время отрисовки холста отсчитывается от запроса до mapCanvasRefreshed
+        self.render_started = time.perf_counter()
         canvas.refresh()
 
         # Выделение точки
@@ -324,17 +677,88 @@ class PointAssessmentDialog(QDialog):
         if display_value is None or display_value == "":
             display_value = "Нет данных"
 
-        # Показ диалога оценки
-        reply = self.show_custom_dialog(display_value)
+        self.dock.show_point(display_value, self.position + 1, len(self.pending))
+        self.prefetch_next_points()
 
-        # Сохранение оценки
-        with edit(layer):
-            feature['Assessment'] = 1 if reply == QMessageBox.Yes else 0
-            layer.updateFeature(feature)
+    def prefetch_next_points(self):
+        """Запускает фоновую отрисовку видов для следующих точек."""
+        next_ids = self.pending[self.position + 1:self.position + 1 + self.prefetcher.depth]
+        if not next_ids:
+            return
+        request = QgsFeatureRequest().setFilterFids(next_ids).setSubsetOfAttributes([])
+        centers = {feature.id(): feature.geometry().asPoint() for feature in self.layer.getFeatures(request)}
+        self.prefetcher.prefetch([centers[feature_id] for feature_id in next_ids if feature_id in centers])
+
+    def record_render_time(self):
+        if self.render_started is not None:
+            self.profile.add_stage("canvas_render", time.perf_counter() - self.render_started, 1)
+            self.render_started = None
+
+    def record_answer(self, value):
+        # Сохранение оценки (запись в слой выполняется сеансом пакетами)
+        with self.profile.stage("record_answer", 1):
+            self.session.record(self.current_feature, value)
+        if self.session.write_error and not self.write_error_shown:
+            # Оценки остаются в памяти, запись повторяется при следующем сохранении
+            self.iface.messageBar().pushWarning("Оценка точек", self.session.write_error)
+            self.write_error_shown = True
+        self.dock.show_accuracy(self.session.running)
+        self.remove_highlight(self.layer)
+        self.position += 1
+        self.show_next_point()
+
+    def skip_current_class(self):
+        """Исключает из оценки оставшиеся точки класса текущей точки (и в следующих сеансах)."""
+        fields = self.layer.fields()
+        class_field = 'RasterText' if fields.indexOf('RasterText') >= 0 else 'RasterValue'
+        if fields.indexOf(class_field) < 0:
+            return
+        remaining = self.session.skip_class(self.current_feature[class_field], self.pending[self.position:])
+        self.pending = self.pending[:self.position] + remaining
+        self.remove_highlight(self.layer)
+        self.show_next_point()
+
+    def show_next_point(self):
+        if self.position >= len(self.pending):
+            self.finish_assessment(True)
+        else:
+            self.show_current_point()
 
-        # Удаление выделения
-        self.remove_highlight(layer)
-        canvas.setInteractive(True)
+    def finish_assessment(self, completed):
+        if self.session is None:
+            return
+        session, self.session = self.session, None
+        self.prefetcher.stop()
+        self.iface.mapCanvas().mapCanvasRefreshed.disconnect(self.record_render_time)
+        saved = session.close()
+        self.remove_highlight(self.layer)
+        log_profile(self.profile)
+
+        dock, self.dock = self.dock, None
+        dock.aborted.disconnect()
+        self.iface.removeDockWidget(dock)
+        dock.deleteLater()
+
+        if not saved:
+            QMessageBox.warning(
+                self.iface.mainWindow(), "Ошибка",
+                f"Не удалось записать в слой оценки {session.unsaved_count} точек: {session.write_error}"
+            )
+        elif completed and session.skipped_classes:
+            QMessageBox.information(
+                self.iface.mainWindow(), "Готово",
+                f"Оценка завершена, кроме пропущенных классов: {describe_classes(session.skipped_classes)}. "
+                f"Не оценено точек этих классов: {session.skipped_count}. "
+                f"Чтобы оценить их, запустите оценку снова и верните пропущенные классы."
+            )
+        elif completed:
+            QMessageBox.information(self.iface.mainWindow(), "Готово", "Оценка завершена!")
+        else:
+            QMessageBox.information(
+                self.iface.mainWindow(), "Оценка прервана",
+                f"Оценено точек: {session.assessed_count}. При следующем запуске оценка продолжится с первой неоценённой точки."
+            )
+        self.close()
 
     def highlight_feature(self, layer, feature):
         """Выделяет точку на карте."""
@@ -347,20 +771,6 @@ class PointAssessmentDialog(QDialog):
         layer.removeSelection()
         layer.triggerRepaint()
 
-    def show_custom_dialog(self, raster_value):
-        dialog = QMessageBox(self)
-        dialog.setWindowTitle("Оценка точки")
-        dialog.setText(f"Совпадение точки? (Значение: {raster_value})")
-        dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        dialog.setDefaultButton(QMessageBox.Yes)
-
-        # Смещение окна для удобства
-        screen = self.iface.mainWindow().screen().geometry()
-        dialog.move(screen.width() // 2 + 150, screen.height() // 2 - 100)
-
-        reply = dialog.exec_()
-        return reply
-
 class RasterValueTextMappingDialog(QDialog):
     def __init__(self, iface):
         super().__init__()
@@ -400,16 +810,14 @@ class RasterValueTextMappingDialog(QDialog):
         mappings = self.get_user_mappings(raster_values)
         if mappings:
             self.apply_text_mappings(point_layer, mappings)
-            QMessageBox.information(self, "Готово", "Сопоставление выполнено!")
             self.close()
 
     def get_unique_raster_values(self, layer):
-        raster_values = set()
-        for feature in layer.getFeatures():
-            value = feature['RasterValue']
-            if value is not None:
-                raster_values.add(value)
-        return sorted(raster_values)
+        _, columns = column_cache(layer).columns(['RasterValue'])
+        raster_values = columns.get('RasterValue')
+        if raster_values is None:
+            return []
+        return np.unique(raster_values[~np.isnan(raster_values)]).tolist()
 
     def get_user_mappings(self, raster_values):
         dialog = QDialog(self)
@@ -432,18 +840,9 @@ class RasterValueTextMappingDialog(QDialog):
         return None
 
     def apply_text_mappings(self, layer, mappings):
-        provider = layer.dataProvider()
-
-        if 'RasterText' not in [field.name() for field in provider.fields()]:
-            provider.addAttributes([QgsField('RasterText', QVariant.String)])
-            layer.updateFields()
-
-        with edit(layer):
-            for feature in layer.getFeatures():
-                raster_value = feature['RasterValue']
-                if raster_value in mappings:
-                    feature['RasterText'] = mappings[raster_value]
-                    layer.updateFeature(feature)
+        # Сопоставление выполняется в фоне, поле RasterText и изменения
+        # записываются по завершении
+        start_task(TextMappingTask(layer, mappings), self.iface, "Сопоставление выполнено!")
 
 class AssessmentStatisticsDialog(QDialog):
     def __init__(self, iface):
@@ -453,23 +852,46 @@ class AssessmentStatisticsDialog(QDialog):
         self.layout = QVBoxLayout()
 
         self.layer_combo = QComboBox()
+        self.reference_combo = QComboBox()
+        self.raster_combo = QComboBox()
         self.calculate_button = QPushButton("Рассчитать статистику")
         self.result_label = QLabel("")
+        self.result_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.result_label.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
 
         self.layout.addWidget(QLabel("Выберите точечный слой:"))
         self.layout.addWidget(self.layer_combo)
+        self.layout.addWidget(QLabel("Поле эталонного класса (для полной матрицы ошибок):"))
+        self.layout.addWidget(self.reference_combo)
+        self.layout.addWidget(QLabel("Растр классификации (для оценок с учётом площади):"))
+        self.layout.addWidget(self.raster_combo)
         self.layout.addWidget(self.calculate_button)
         self.layout.addWidget(self.result_label)
         self.setLayout(self.layout)
 
+        self.layer_combo.currentIndexChanged.connect(self.load_reference_fields)
         self.calculate_button.clicked.connect(self.calculate_statistics)
         self.load_layers()
 
     def load_layers(self):
+        self.raster_combo.addItem("Не использовать", None)
         layers = QgsProject.instance().mapLayers().values()
         for layer in layers:
             if isinstance(layer, QgsVectorLayer) and layer.geometryType() == QgsWkbTypes.PointGeometry:
                 self.layer_combo.addItem(layer.name(), layer.id())
+            elif isinstance(layer, QgsRasterLayer):
+                self.raster_combo.addItem(layer.name(), layer.id())
+        self.load_reference_fields()
+
+    def load_reference_fields(self):
+        self.reference_combo.clear()
+        self.reference_combo.addItem("Нет (только совпадение Assessment)", None)
+        layer = QgsProject.instance().mapLayer(self.layer_combo.currentData() or "")
+        if layer is None:
+            return
+        for field in layer.fields():
+            if field.name() not in ('RasterValue', 'RasterText', 'Assessment'):
+                self.reference_combo.addItem(field.name(), field.name())
 
     def calculate_statistics(self):
         layer_id = self.layer_combo.currentData()
@@ -478,49 +900,22 @@ class AssessmentStatisticsDialog(QDialog):
             return
 
         point_layer = QgsProject.instance().mapLayer(layer_id)
-        total_points, matched_points = 0, 0
-        class_stats = {}
-
-        for feature in point_layer.getFeatures():
-            raster_value = feature['RasterText']
-            assessment = feature['Assessment']
-
-            if raster_value is None or assessment is None:
-                continue
-
-            total_points += 1
-            if assessment == 1:
-                matched_points += 1
-
-            if raster_value not in class_stats:
-                class_stats[raster_value] = {"total": 0, "matched": 0}
-
-            class_stats[raster_value]["total"] += 1
-            if assessment == 1:
-                class_stats[raster_value]["matched"] += 1
-
-        if total_points == 0:
-            QMessageBox.warning(self, "Ошибка", "В слое отсутствуют данные для анализа.")
-            return
-
-        overall_percentage = (matched_points / total_points) * 100
-        result_text = f"Общий процент совпадения: {overall_percentage:.2f}%\n\n"
-
-        for raster_value, stats in class_stats.items():
-            percentage = (stats["matched"] / stats["total"]) * 100 if stats["total"] > 0 else 0
-            result_text += f"Значение {raster_value}: {percentage:.2f}% совпадений\n"
-
-        self.result_label.setText(result_text)
-
-
-
-
-
-
-
-
-
-
-
-
-
+        raster_layer = QgsProject.instance().mapLayer(self.raster_combo.currentData() or "")
+        reference_field = self.reference_combo.currentData()
+
+        # Расчёт выполняется в фоне, результат выводится по завершении
+        self.calculate_button.setEnabled(False)
+        self.result_label.setText("Выполняется расчёт...")
+        task = StatisticsTask(point_layer, reference_field, raster_layer)
+        task.reportReady.connect(self.show_report)
+        task.taskTerminated.connect(self.show_error)
+        self.task = start_task(task)
+
+    def show_error(self):
+        self.calculate_button.setEnabled(True)
+        self.result_label.setText("")
+        QMessageBox.warning(self, "Ошибка", self.task.error or "Расчёт отменён.")
+
+    def show_report(self, report):
+        self.calculate_button.setEnabled(True)
+        self.result_label.setText(format_report(report))
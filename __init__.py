@@ -1,5 +1,6 @@
-from .AccuracyAssessment import AccuracyAssessment
-
 def classFactory(iface):
     """Функция для загрузки плагина в QGIS"""
+    # Импорт внутри функции: рабочие процессы параллельного чтения растра
+    # импортируют пакет модуля без QGIS
+    from .AccuracyAssessment import AccuracyAssessment
     return AccuracyAssessment(iface)
\ No newline at end of file
@@ -0,0 +1,280 @@
+import numpy as np
+
+
+class AccuracyReport:
+    """Результаты оценки точности классификации.
+
+    Показатели, которые нельзя вычислить по имеющимся данным (например,
+    точность производителя без эталонных классов), равны None.
+    """
+
+    def __init__(self, classes, sample_counts, correct_counts):
+        self.classes = classes
+        self.sample_counts = sample_counts
+        self.correct_counts = correct_counts
+        self.total = int(sample_counts.sum())
+        self.matrix = None
+
+        self.overall = correct_counts.sum() / self.total if self.total else None
+        self.users = _divide(correct_counts, sample_counts)
+        self.users_se = _binomial_se(self.users, sample_counts)
+        self.producers = None
+        self.producers_se = None
+        self.kappa = None
+
+        self.area_weights = None
+        self.weighted_overall = None
+        self.weighted_overall_se = None
+        self.weighted_producers = None
+        self.weighted_producers_se = None
+        self.area_proportions = None
+        self.area_proportions_se = None
+
+
+class RunningAccuracy:
+    """Накопительные показатели точности, обновляемые с каждой оценкой.
+
+    Для каждого класса карты хранятся число оценённых точек и число
+    совпадений, поэтому запись оценки — O(1), а строки матрицы совпадений
+    (класс карты x совпадает / не совпадает) всегда готовы. Для оценок с
+    учётом площади запоминается соответствие значений растра названиям
+    классов. Точки без класса карты учитываются только в общем числе.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.names = {}
+        self.unlabeled = 0
+
+    @property
+    def total(self):
+        return self.unlabeled + sum(samples for samples, _ in self.counts.values())
+
+    def record(self, label, agreement, raster_value=None):
+        """Учитывает оценку точки класса label (agreement: 1 — совпадает, 0 — нет)."""
+        if label is None:
+            self.unlabeled += 1
+            return
+        counts = self.counts.setdefault(label, [0, 0])
+        counts[0] += 1
+        counts[1] += 1 if agreement == 1 else 0
+        if raster_value is not None:
+            self.names.setdefault(raster_value, label)
+
+    @classmethod
+    def from_columns(cls, labels, checks, raster_values=None):
+        """Показатели по столбцам слоя оценки.
+
+        labels — классы карты, checks — оценки (1 — совпадает, 0 — нет,
+        NaN — точка не оценена), raster_values — значения растра. Пустые
+        классы (None, NaN, пустая строка) учитываются только в общем числе.
+        """
+        running = cls()
+        checks = np.asarray(checks, dtype=np.float64)
+        for i in np.flatnonzero(~np.isnan(checks)).tolist():
+            raster_value = None if raster_values is None else _column_label(raster_values[i])
+            running.record(_column_label(labels[i]), checks[i], raster_value)
+        return running
+
+    def report(self, class_areas=None):
+        """AccuracyReport по накопленным количествам; class_areas — по значениям растра."""
+        classes = sorted(self.counts)
+        report = AccuracyReport(
+            np.array(classes),
+            np.array([self.counts[label][0] for label in classes], dtype=np.int64),
+            np.array([self.counts[label][1] for label in classes], dtype=np.float64),
+        )
+        if class_areas and self.names:
+            # Площади значений растра переносятся на названия классов
+            areas = {}
+            for value, area in class_areas.items():
+                label = self.names.get(value)
+                if label is not None:
+                    areas[label] = areas.get(label, 0) + area
+            class_areas = areas
+        if class_areas:
+            _add_area_weighted_statistics(report, class_areas)
+        return report
+
+    def to_dict(self):
+        return {
+            "counts": [[label, samples, correct] for label, (samples, correct) in self.counts.items()],
+            "names": [[value, label] for value, label in self.names.items()],
+            "unlabeled": self.unlabeled,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        running = cls()
+        running.counts = {label: [samples, correct] for label, samples, correct in data["counts"]}
+        running.names = {value: label for value, label in data["names"]}
+        running.unlabeled = data.get("unlabeled", 0)
+        return running
+
+
+def _column_label(value):
+    """Класс из столбца слоя: строка, float или None для пустых значений."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _divide(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def _binomial_se(proportions, counts):
+    """Стандартная ошибка доли: sqrt(p(1-p)/(n-1))."""
+    return np.sqrt(_divide(proportions * (1 - proportions), np.asarray(counts) - 1))
+
+
+def encode_labels(*label_arrays):
+    """Общий отсортированный список классов и коды классов для каждого массива."""
+    classes = np.unique(np.concatenate([np.asarray(labels) for labels in label_arrays]))
+    return classes, [np.searchsorted(classes, labels) for labels in label_arrays]
+
+
+def confusion_matrix(map_labels, reference_labels):
+    """Матрица ошибок: строки — классы карты, столбцы — эталонные классы."""
+    classes, (map_codes, reference_codes) = encode_labels(map_labels, reference_labels)
+    size = classes.size
+    matrix = np.bincount(map_codes * size + reference_codes, minlength=size * size).reshape(size, size)
+    return classes, matrix
+
+
+def accuracy_statistics(map_labels, agreement=None, reference_labels=None, class_areas=None):
+    """Показатели точности по классам карты и результатам проверки.
+
+    map_labels — класс карты для каждой точки; результаты проверки задаются
+    либо массивом agreement (1 — совпадает, 0 — нет), либо эталонными
+    классами reference_labels. Только с эталонными классами строится полная
+    матрица ошибок, точность производителя и каппа. class_areas — словарь
+    {класс: площадь или число пикселей} для оценок, взвешенных по площади
+    (Olofsson et al., 2014).
+    """
+    map_labels = np.asarray(map_labels)
+    if reference_labels is not None:
+        classes, matrix = confusion_matrix(map_labels, np.asarray(reference_labels))
+        report = AccuracyReport(classes, matrix.sum(axis=1), np.diag(matrix))
+        report.matrix = matrix
+        _add_matrix_statistics(report)
+    else:
+        classes, (codes,) = encode_labels(map_labels)
+        agreement = np.asarray(agreement, dtype=np.float64)
+        report = AccuracyReport(
+            classes,
+            np.bincount(codes, minlength=classes.size),
+            np.bincount(codes, weights=agreement, minlength=classes.size),
+        )
+
+    if class_areas:
+        _add_area_weighted_statistics(report, class_areas)
+    return report
+
+
+def _add_matrix_statistics(report):
+    matrix = report.matrix.astype(np.float64)
+    total = matrix.sum()
+    reference_counts = matrix.sum(axis=0)
+    report.producers = _divide(np.diag(matrix), reference_counts)
+    report.producers_se = _binomial_se(report.producers, reference_counts)
+
+    expected = (matrix.sum(axis=1) * reference_counts).sum() / total ** 2
+    report.kappa = (report.overall - expected) / (1 - expected) if expected < 1 else None
+
+
+def _add_area_weighted_statistics(report, class_areas):
+    """Оценки точности и площадей, взвешенные по площади классов карты.
+
+    Учитываются только классы, в которых есть точки.
+    """
+    sampled = report.sample_counts > 0
+    areas = np.array([float(class_areas.get(value, 0)) for value in report.classes.tolist()])
+    areas[~sampled] = 0
+    if areas.sum() <= 0:
+        return
+    weights = areas / areas.sum()
+    report.area_weights = weights
+
+    users = np.nan_to_num(report.users)
+    counts = report.sample_counts.astype(np.float64)
+    report.weighted_overall = float((weights * users).sum())
+    report.weighted_overall_se = float(np.sqrt(np.nansum(
+        weights ** 2 * _divide(users * (1 - users), counts - 1)
+    )))
+
+    if report.matrix is None:
+        return
+
+    # Оценка долей площади p_ij = W_i * n_ij / n_i.
+    proportions = weights[:, None] * _divide(report.matrix, counts[:, None])
+    proportions = np.nan_to_num(proportions)
+    column_totals = proportions.sum(axis=0)
+    report.area_proportions = column_totals
+    report.area_proportions_se = np.sqrt(np.nansum(
+        _divide(weights[:, None] * proportions - proportions ** 2, counts[:, None] - 1), axis=0
+    ))
+
+    producers = _divide(np.diag(proportions), column_totals)
+    report.weighted_producers = producers
+
+    # Стандартная ошибка точности производителя (формула 7 Olofsson et al., 2014)
+    row_shares = np.nan_to_num(_divide(report.matrix, counts[:, None]))
+    variance_terms = _divide(row_shares * (1 - row_shares), counts[:, None] - 1)
+    variance_terms = np.nan_to_num(variance_terms)
+    estimated_reference = (weights[:, None] * row_shares).sum(axis=0)
+    producers_se = np.full(report.classes.size, np.nan)
+    for j in range(report.classes.size):
+        if estimated_reference[j] <= 0:
+            continue
+        own = weights[j] ** 2 * (1 - producers[j]) ** 2 * np.nan_to_num(
+            users[j] * (1 - users[j]) / (counts[j] - 1) if counts[j] > 1 else np.nan
+        )
+        others = np.delete(weights ** 2 * variance_terms[:, j], j).sum()
+        producers_se[j] = np.sqrt((own + producers[j] ** 2 * others) / estimated_reference[j] ** 2)
+    report.weighted_producers_se = producers_se
+
+
+def format_report(report):
+    """Текстовый отчёт о точности классификации."""
+    result_text = f"Общий процент совпадения: {report.overall * 100:.2f}% (точек: {report.total})\n"
+    if report.kappa is not None:
+        result_text += f"Каппа: {report.kappa:.3f}\n"
+    if report.weighted_overall is not None:
+        result_text += (
+            f"Общая точность с учётом площади: {report.weighted_overall * 100:.2f}% "
+            f"± {report.weighted_overall_se * 100:.2f}%\n"
+        )
+    result_text += "\n"
+
+    for i, raster_value in enumerate(report.classes.tolist()):
+        if not report.sample_counts[i]:
+            continue
+        result_text += (
+            f"Значение {raster_value}: {report.users[i] * 100:.2f}% совпадений "
+            f"± {np.nan_to_num(report.users_se[i]) * 100:.2f}% (точек: {report.sample_counts[i]})"
+        )
+        if report.producers is not None:
+            result_text += f"; точность производителя {np.nan_to_num(report.producers[i]) * 100:.2f}%"
+        if report.weighted_producers is not None:
+            result_text += (
+                f" (с учётом площади {np.nan_to_num(report.weighted_producers[i]) * 100:.2f}% "
+                f"± {np.nan_to_num(report.weighted_producers_se[i]) * 100:.2f}%)"
+            )
+        result_text += "\n"
+
+    if report.matrix is not None:
+        result_text += "\nМатрица ошибок (строки — карта, столбцы — эталон):\n"
+        labels = [str(value) for value in report.classes.tolist()]
+        width = max(len(label) for label in labels + [str(report.matrix.max())]) + 2
+        result_text += " " * width + "".join(label.rjust(width) for label in labels) + "\n"
+        for label, row in zip(labels, report.matrix.tolist()):
+            result_text += label.rjust(width) + "".join(str(count).rjust(width) for count in row) + "\n"
+    return result_text
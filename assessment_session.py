@@ -0,0 +1,184 @@
+import json
+
+import numpy as np
+from qgis.core import QgsFeatureRequest
+from qgis.PyQt.QtCore import QTimer
+
+from .accuracy_statistics import RunningAccuracy
+from .attribute_update import write_attribute_values
+from .layer_columns import ASSESSMENT_COLUMNS, column_cache, is_null
+
+
+ASSESSMENT_FIELD = "Assessment"
+
+# Свойство слоя со списком классов, пропущенных при оценке
+SKIPPED_CLASSES_PROPERTY = "AccuracyAssessment/skipped_classes"
+
+
+def load_skipped_classes(layer):
+    """Классы карты, исключённые из оценки слоя (множество, возможно пустое)."""
+    data = layer.customProperty(SKIPPED_CLASSES_PROPERTY)
+    if not data:
+        return set()
+    try:
+        return {_label(label) for label in json.loads(data)}
+    except (ValueError, TypeError):
+        return set()
+
+
+def describe_classes(labels):
+    """Перечень классов карты для сообщений."""
+    names = []
+    for label in sorted(labels, key=str):
+        if label is None:
+            names.append("Нет данных")
+        elif isinstance(label, float) and label.is_integer():
+            names.append(str(int(label)))
+        else:
+            names.append(str(label))
+    return ", ".join(names)
+
+
+def running_accuracy_from_layer(layer):
+    """Показатели точности по записанным в слой оценкам (из кэша столбцов слоя).
+
+    Показатели всегда считаются по текущим значениям слоя, поэтому ручные
+    правки оценок и удаление точек между сеансами учитываются.
+    """
+    _, columns = column_cache(layer).columns(ASSESSMENT_COLUMNS)
+    checks = columns.get(ASSESSMENT_FIELD)
+    if checks is None:
+        return RunningAccuracy()
+    class_field = 'RasterText' if 'RasterText' in columns else 'RasterValue'
+    labels = columns.get(class_field, np.full(checks.size, None, dtype=object))
+    return RunningAccuracy.from_columns(labels, checks, columns.get('RasterValue'))
+
+
+def _label(value):
+    """Класс карты в виде, принятом в столбцах кэша: строка, float или None."""
+    if is_null(value) or value == "":
+        return None
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class AssessmentSession:
+    """Сеанс оценки точек слоя.
+
+    Результаты оценки накапливаются в памяти и записываются в слой одним
+    вызовом changeAttributeValues() каждые flush_every точек или каждые
+    flush_interval секунд. Неоценённые точки определяются по пустому полю
+    Assessment: записанные оценки и есть сохранённый прогресс, поэтому
+    прерванный сеанс продолжается с первой неоценённой точки.
+
+    Пропущенные классы (skip_class) сохраняются в свойстве слоя, и их
+    точки не предлагаются к оценке и в следующих сеансах, пока список не
+    сброшен (reset_skipped_classes). skipped_count — число неоценённых
+    точек пропущенных классов.
+
+    Показатели точности по классам (RunningAccuracy) в начале сеанса
+    рассчитываются по записанным оценкам из кэша столбцов слоя, а затем
+    обновляются с каждой оценкой. Если запись не удалась, оценки остаются в памяти до следующей попытки, а
+    описание ошибки сохраняется в write_error.
+    """
+
+    def __init__(self, layer, flush_every=25, flush_interval=30):
+        self.layer = layer
+        self.flush_every = flush_every
+        self.field_index = layer.fields().indexOf(ASSESSMENT_FIELD)
+        self.assessed_count = 0
+        self.running = None
+        self.skipped_classes = load_skipped_classes(layer)
+        self.skipped_count = 0
+        self.write_error = None
+        self._buffer = {}
+
+        # Запись по таймеру, пока оператор рассматривает точку
+        self._timer = QTimer()
+        self._timer.setInterval(int(flush_interval * 1000))
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def pending_feature_ids(self):
+        """Идентификаторы неоценённых точек в порядке следования (без чтения геометрии).
+
+        Заодно пересчитывает показатели точности по оценкам, уже записанным в слой.
+        """
+        request = QgsFeatureRequest()
+        request.setFilterExpression(f'"{ASSESSMENT_FIELD}" IS NULL')
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes([self.field_index])
+        pending = sorted(feature.id() for feature in self.layer.getFeatures(request))
+        self.running = running_accuracy_from_layer(self.layer)
+        self.skipped_count = 0
+        if self.skipped_classes:
+            pending = self._without_skipped(pending)
+        return pending
+
+    def skip_class(self, label, feature_ids):
+        """Исключает класс карты из оценки; возвращает feature_ids без точек пропущенных классов."""
+        self.skipped_classes.add(_label(label))
+        self.layer.setCustomProperty(
+            SKIPPED_CLASSES_PROPERTY, json.dumps(sorted(self.skipped_classes, key=str))
+        )
+        return self._without_skipped(feature_ids)
+
+    def reset_skipped_classes(self):
+        """Возвращает в оценку все пропущенные ранее классы."""
+        self.skipped_classes = set()
+        self.skipped_count = 0
+        self.layer.removeCustomProperty(SKIPPED_CLASSES_PROPERTY)
+
+    def _without_skipped(self, feature_ids):
+        fields = self.layer.fields()
+        class_field = 'RasterText' if fields.indexOf('RasterText') >= 0 else 'RasterValue'
+        if fields.indexOf(class_field) < 0:
+            return feature_ids
+        ids, columns = column_cache(self.layer).columns([class_field])
+        labels = dict(zip(ids.tolist(), columns[class_field].tolist()))
+        kept = [
+            feature_id for feature_id in feature_ids
+            if _label(labels.get(feature_id)) not in self.skipped_classes
+        ]
+        self.skipped_count += len(feature_ids) - len(kept)
+        return kept
+
+    def record(self, feature, value):
+        """Запоминает оценку точки; запись в слой — по достижении порога."""
+        fields = self.layer.fields()
+        class_field = 'RasterText' if fields.indexOf('RasterText') >= 0 else 'RasterValue'
+        label = _label(feature[class_field]) if fields.indexOf(class_field) >= 0 else None
+        raster_value = _label(feature['RasterValue']) if fields.indexOf('RasterValue') >= 0 else None
+        if self.running is None:
+            self.running = RunningAccuracy()
+        self.running.record(label, value, raster_value)
+
+        self._buffer[feature.id()] = value
+        self.assessed_count += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    @property
+    def unsaved_count(self):
+        return len(self._buffer)
+
+    def flush(self):
+        """Записывает накопленные оценки в слой; возвращает False, если запись не удалась."""
+        if not self._buffer:
+            return True
+        try:
+            write_attribute_values(self.layer, ASSESSMENT_FIELD, self._buffer)
+        except ValueError as error:
+            self.write_error = str(error)
+            return False
+        self.write_error = None
+        self._buffer = {}
+        self.layer.triggerRepaint()
+        return True
+
+    def close(self):
+        """Завершает сеанс, записывая оставшиеся оценки."""
+        self._timer.stop()
+        return self.flush()
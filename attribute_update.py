@@ -0,0 +1,119 @@
+from qgis.core import QgsDataSourceUri, QgsProviderRegistry
+
+try:
+    from qgis.core import QgsProviderConnectionException
+except ImportError:
+    # Подключения к базам данных через провайдеры появились в QGIS 3.10
+    QgsProviderConnectionException = None
+
+from .layer_columns import column_cache
+
+
+def add_field_if_missing(layer, field):
+    """Добавляет поле в слой через провайдер, если такого поля ещё нет.
+
+    Если источник не позволяет добавить поле, вызывается ValueError.
+    """
+    provider = layer.dataProvider()
+    if provider.fields().indexOf(field.name()) >= 0:
+        return
+    if not provider.addAttributes([field]):
+        raise ValueError(f"Не удалось добавить поле {field.name()} в слой {layer.name()}{_provider_error(provider)}")
+    layer.updateFields()
+
+
+def write_attribute_values(layer, field_name, values):
+    """Записывает значения поля {идентификатор объекта: значение} в слой.
+
+    Если слой редактируется пользователем, значения попадают в его буфер
+    правок, иначе записываются в провайдер одним вызовом
+    changeAttributeValues(). Если записать значения не удалось (например,
+    источник только для чтения), вызывается ValueError.
+    """
+    if not values:
+        return
+    field_index = layer.fields().indexOf(field_name)
+    if field_index < 0:
+        raise ValueError(f"В слое {layer.name()} отсутствует поле {field_name}.")
+    if layer.isEditable():
+        failed = [
+            feature_id for feature_id, value in values.items()
+            if not layer.changeAttributeValue(feature_id, field_index, value)
+        ]
+        if failed:
+            raise ValueError(f"Не удалось изменить значения поля {field_name} у {len(failed)} объектов.")
+        return
+    provider = layer.dataProvider()
+    if not provider.changeAttributeValues(
+        {feature_id: {field_index: value} for feature_id, value in values.items()}
+    ):
+        raise ValueError(f"Не удалось записать значения поля {field_name} в слой {layer.name()}{_provider_error(provider)}")
+    # Запись мимо буфера правок слоя не вызывает его сигналов
+    column_cache(layer).set_values(field_name, list(values), list(values.values()))
+
+
+def _provider_error(provider):
+    """Описание последней ошибки провайдера для сообщения об ошибке."""
+    error = provider.lastError()
+    return f": {error}" if error else " (источник не поддерживает изменение данных)."
+
+
+class DatabaseTable:
+    """Таблица слоя в GeoPackage, SpatiaLite или PostGIS для прямых SQL-запросов."""
+
+    def __init__(self, provider_key, connection_uri, table_name):
+        self.provider_key = provider_key
+        self.connection_uri = connection_uri
+        self.table_name = table_name
+
+    @classmethod
+    def from_layer(cls, layer):
+        """Таблица слоя или None, если запрос в базу данных невозможен.
+
+        Слои с фильтром и слои в режиме редактирования не подходят: запрос
+        изменил бы объекты вне фильтра или в обход буфера правок.
+        """
+        if QgsProviderConnectionException is None or layer.isEditable() or layer.subsetString():
+            return None
+        provider = layer.dataProvider()
+        provider_key = provider.name()
+        uri = provider.dataSourceUri()
+        if provider_key == 'ogr' and provider.storageType() == 'GPKG':
+            parts = QgsProviderRegistry.instance().decodeUri('ogr', uri)
+            if not parts.get('layerName'):
+                return None
+            return cls(provider_key, parts['path'], _quoted_identifier(parts['layerName']))
+        if provider_key in ('spatialite', 'postgres'):
+            data_source = QgsDataSourceUri(uri)
+            table_name = _quoted_identifier(data_source.table())
+            if data_source.schema():
+                table_name = f"{_quoted_identifier(data_source.schema())}.{table_name}"
+            return cls(provider_key, uri, table_name)
+        return None
+
+    def execute(self, sql):
+        metadata = QgsProviderRegistry.instance().providerMetadata(self.provider_key)
+        connection = metadata.createConnection(self.connection_uri, {})
+        connection.executeSql(sql)
+
+    def update_by_mapping(self, target_field, key_field, mapping):
+        """Одним запросом UPDATE ... CASE записывает в target_field значения mapping[key_field]."""
+        key = _quoted_identifier(key_field)
+        cases = " ".join(f"WHEN {_literal(value)} THEN {_literal(text)}" for value, text in mapping.items())
+        keys = ", ".join(_literal(value) for value in mapping)
+        self.execute(
+            f"UPDATE {self.table_name} SET {_quoted_identifier(target_field)} = CASE {key} {cases} END "
+            f"WHERE {key} IN ({keys})"
+        )
+
+
+def _quoted_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
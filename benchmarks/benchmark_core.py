@@ -0,0 +1,240 @@
+"""Замеры производительности вычислительного ядра модуля.
+
+Скрипт строит синтетические классифицированные растры (GDAL MEM или
+GeoTIFF), полигоны и наборы точек и измеряет скорость (точек в секунду)
+генерации точек (в том числе внутри полигонов), чтения значений растра, статистики окрестности, сопоставления
+названий классов и расчёта показателей точности для нескольких размеров
+данных. Нужны только NumPy и GDAL, QGIS не требуется.
+
+Запуск из каталога модуля:
+
+    python benchmarks/benchmark_core.py --sizes 1024 4096 --points 10000 100000 --json results.json
+
+Для сравнения версий сохраняйте результаты в JSON и сравнивайте значения
+points_per_second; случайные данные порождаются с фиксированным seed.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+from osgeo import gdal, ogr, osr
+
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASS_VALUES = (1, 2, 3, 4, 5, 6)
+NODATA_VALUE = 255
+
+
+def load_core(directory):
+    """Импортирует модуль core пакета модуля без загрузки QGIS.
+
+    Пакет должен импортироваться по имени и в рабочих процессах
+    ParallelRasterExtractor, поэтому его каталог добавляется в sys.path;
+    если имя каталога не является именем пакета Python, пакет подключается
+    через символическую ссылку во временном каталоге directory.
+    """
+    package_name = os.path.basename(PLUGIN_DIR)
+    search_path = os.path.dirname(PLUGIN_DIR)
+    if not package_name.isidentifier():
+        package_name = "accuracy_assessment"
+        search_path = directory
+        os.symlink(PLUGIN_DIR, os.path.join(directory, package_name), target_is_directory=True)
+    sys.path.insert(0, search_path)
+    return importlib.import_module(f"{package_name}.core")
+
+
+def create_classified_raster(size, driver="MEM", path="", patch=32, seed=0):
+    """Растр size x size типа Byte с пятнами классов patch x patch пикселей и полосой nodata."""
+    rng = np.random.default_rng(seed)
+    patches = (size + patch - 1) // patch
+    classes = rng.choice(np.array(CLASS_VALUES, dtype=np.uint8), size=(patches, patches), p=_class_shares())
+    data = np.repeat(np.repeat(classes, patch, axis=0), patch, axis=1)[:size, :size]
+    data[:, :max(size // 50, 1)] = NODATA_VALUE
+
+    options = ["TILED=YES", "COMPRESS=DEFLATE"] if driver == "GTiff" else []
+    dataset = gdal.GetDriverByName(driver).Create(path, size, size, 1, gdal.GDT_Byte, options=options)
+    dataset.SetGeoTransform((0.0, 1.0, 0.0, float(size), 0.0, -1.0))
+    spatial_reference = osr.SpatialReference()
+    spatial_reference.ImportFromEPSG(3857)
+    dataset.SetProjection(spatial_reference.ExportToWkt())
+    band = dataset.GetRasterBand(1)
+    band.SetNoDataValue(NODATA_VALUE)
+    band.WriteArray(data)
+    dataset.FlushCache()
+    return dataset
+
+
+def _class_shares():
+    # Неравные доли классов, как в реальных классификациях
+    shares = np.array([0.4, 0.25, 0.15, 0.1, 0.07, 0.03])
+    return shares / shares.sum()
+
+
+def create_polygons(size, count=20, seed=4):
+    """Пересекающиеся многоугольники-круги (по 256 вершин) в пределах растра size x size."""
+    rng = np.random.default_rng(seed)
+    polygons = []
+    centers = rng.uniform(0, size, (count, 2))
+    radii = rng.uniform(size / 20, size / 6, count)
+    for (x, y), radius in zip(centers.tolist(), radii.tolist()):
+        center = ogr.Geometry(ogr.wkbPoint)
+        center.AddPoint_2D(x, y)
+        polygons.append(center.Buffer(radius, 64))
+    return polygons
+
+
+def random_points(size, count, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, size, count), rng.uniform(0, size, count)
+
+
+def measure(function, repeat):
+    """Лучшее время из repeat запусков и результат последнего запуска."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmarks(core, size, point_count, driver, workers, repeat, directory):
+    path = os.path.join(directory, f"classes_{size}.tif") if driver == "GTiff" else ""
+    dataset = create_classified_raster(size, driver, path)
+    source = core.GdalRasterSource(dataset if driver == "MEM" else path)
+    extent = source.extent
+    xs, ys = random_points(size, point_count)
+    results = []
+
+    def record(stage, count, function):
+        elapsed, value = measure(function, repeat)
+        results.append({
+            "stage": stage, "raster_size": size, "driver": driver, "points": int(count),
+            "seconds": elapsed, "points_per_second": count / elapsed if elapsed > 0 else None,
+        })
+        return value
+
+    # Генерация точек
+    record("generation_extent", point_count, lambda: core.random_points_in_extent(extent, point_count))
+    min_distance = size / np.sqrt(point_count) / 4
+    record(
+        "generation_min_distance", point_count,
+        lambda: core.MinimumDistanceSampler(
+            lambda count, feedback=None: core.random_points_in_extent(extent, count), min_distance
+        ).sample(point_count)
+    )
+
+    def stratified():
+        histogram = core.ClassAreaHistogram(core.RasterBlockSampler(source))
+        counts = histogram.compute()
+        return histogram.place_points(core.allocate_proportional(counts, point_count))
+    record("generation_stratified", point_count, stratified)
+
+    # Генерация внутри полигонов (с построением квадродерева) и стратифицированная
+    # выборка по пикселям внутри полигонов (маска растеризуется по блокам)
+    polygons = create_polygons(size)
+    record(
+        "generation_polygons", point_count,
+        lambda: core.PolygonPointSampler(polygons, seed=0).sample(point_count)
+    )
+
+    def stratified_polygons():
+        sampler = core.RasterBlockSampler(source)
+        histogram = core.ClassAreaHistogram(sampler, mask=core.PolygonRasterMask(polygons, sampler))
+        counts = histogram.compute()
+        return histogram.place_points(core.allocate_proportional(counts, point_count))
+    record("generation_stratified_polygons", point_count, stratified_polygons)
+
+    # Чтение значений растра
+    values, valid = record(
+        "extraction_blocks", point_count, lambda: core.RasterBlockSampler(source).sample(xs, ys)
+    )
+    if driver == "GTiff" and workers > 1:
+        record(
+            f"extraction_processes_{workers}", point_count,
+            lambda: core.ParallelRasterExtractor(path, workers=workers).sample(xs, ys)
+        )
+    record(
+        "window_statistics_3x3", point_count,
+        lambda: core.window_statistics(core.RasterBlockSampler(source), xs, ys, 3)
+    )
+
+    # Сопоставление названий классов
+    feature_ids = np.arange(point_count, dtype=np.int64)
+    mappings = {float(value): f"Класс {value}" for value in CLASS_VALUES}
+    record("text_mapping", point_count, lambda: core.mapped_values(feature_ids, values, mappings))
+
+    # Показатели точности: случайные оценки с точностью около 85 %
+    labels = values[valid]
+    agreement = np.random.default_rng(2).random(labels.size) < 0.85
+    class_areas = core.ClassAreaHistogram(core.RasterBlockSampler(source)).compute()
+    record(
+        "statistics", labels.size,
+        lambda: core.accuracy_statistics(labels, agreement=agreement, class_areas=class_areas)
+    )
+    reference = np.where(agreement, labels, np.random.default_rng(3).choice(CLASS_VALUES, labels.size))
+    record(
+        "statistics_confusion_matrix", labels.size,
+        lambda: core.accuracy_statistics(labels, reference_labels=reference, class_areas=class_areas)
+    )
+
+    def running_accuracy():
+        running = core.RunningAccuracy()
+        for label, answer in zip(labels.tolist(), agreement.tolist()):
+            running.record(label, int(answer), label)
+        return running.report(class_areas)
+    record("statistics_running", labels.size, running_accuracy)
+
+    dataset = None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности вычислительного ядра модуля.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096], help="размеры растров, пикселей")
+    parser.add_argument("--points", type=int, nargs="+", default=[10000, 100000], help="числа точек")
+    parser.add_argument("--driver", choices=["MEM", "GTiff"], default="GTiff", help="формат синтетического растра")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4), help="процессов чтения растра")
+    parser.add_argument("--repeat", type=int, default=3, help="число повторов (берётся лучшее время)")
+    parser.add_argument("--json", help="файл для сохранения результатов")
+    arguments = parser.parse_args()
+
+    gdal.UseExceptions()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        core = load_core(directory)
+        for size in arguments.sizes:
+            for point_count in arguments.points:
+                results += run_benchmarks(
+                    core, size, point_count, arguments.driver, arguments.workers, arguments.repeat, directory
+                )
+
+    print(f"{'Этап':<30}{'Растр':>8}{'Точек':>10}{'Секунд':>10}{'Точек/с':>14}")
+    for result in results:
+        print(
+            f"{result['stage']:<30}{result['raster_size']:>8}{result['points']:>10}"
+            f"{result['seconds']:>10.3f}{result['points_per_second'] or 0:>14,.0f}"
+        )
+
+    if arguments.json:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "gdal": gdal.__version__,
+            "machine": platform.platform(),
+            "results": results,
+        }
+        with open(arguments.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
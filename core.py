@@ -0,0 +1,30 @@
+# Вычислительное ядро модуля без зависимости от QGIS и Qt.
+# Импортируется с одними NumPy и GDAL: выборка точек, чтение растров,
+# статистика окрестности, сопоставление значений и показатели точности.
+# Растры читаются через GdalRasterSource; интерфейс QGIS (диалоги, задачи,
+# алгоритмы Processing) использует те же функции с источником QgisRasterSource.
+from .accuracy_statistics import AccuracyReport, RunningAccuracy, accuracy_statistics, confusion_matrix, format_report
+from .gdal_raster_source import GdalRasterSource
+from .parallel_extraction import ParallelRasterExtractor
+from .point_generation import GENERATION_MODES, MinimumDistanceSampler, random_points_in_extent
+from .polygon_mask import PolygonRasterMask
+from .polygon_sampling import PolygonPointSampler
+from .progress import OperationCanceled, ProgressStep
+from .raster_sampling import Extent, RasterBlockCache, RasterBlockSampler, sample_rasters
+from .spatial_hash import SpatialHash
+from .stratified_sampling import (
+    ALLOCATION_EQUAL, ALLOCATION_METHODS, ALLOCATION_OLOFSSON, ALLOCATION_PROPORTIONAL, ClassAreaHistogram,
+    allocate_equal, allocate_olofsson, allocate_proportional
+)
+from .value_mapping import mapped_values
+from .window_statistics import HOMOGENEITY_ACTIONS, WindowFilter, collect_homogeneous, window_modes, window_statistics
+
+__all__ = [
+    "AccuracyReport", "RunningAccuracy", "accuracy_statistics", "confusion_matrix", "format_report",
+    "GdalRasterSource", "ParallelRasterExtractor", "GENERATION_MODES", "MinimumDistanceSampler",
+    "random_points_in_extent", "PolygonRasterMask", "PolygonPointSampler", "OperationCanceled", "ProgressStep", "Extent",
+    "RasterBlockCache", "RasterBlockSampler", "sample_rasters", "SpatialHash", "ALLOCATION_EQUAL",
+    "ALLOCATION_METHODS", "ALLOCATION_OLOFSSON", "ALLOCATION_PROPORTIONAL", "ClassAreaHistogram",
+    "allocate_equal", "allocate_olofsson", "allocate_proportional", "mapped_values", "HOMOGENEITY_ACTIONS",
+    "WindowFilter", "collect_homogeneous", "window_modes", "window_statistics",
+]
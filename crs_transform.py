@@ -0,0 +1,119 @@
+import numpy as np
+from osgeo import osr
+from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsCsException, QgsPointXY
+
+try:
+    from pyproj import Transformer
+except ImportError:
+    Transformer = None
+
+
+def _crs_definition(crs):
+    """Описание СК, понятное PROJ/GDAL."""
+    if crs.authid().upper().startswith("EPSG:"):
+        return crs.authid()
+    if hasattr(QgsCoordinateReferenceSystem, "WKT_PREFERRED"):
+        return crs.toWkt(QgsCoordinateReferenceSystem.WKT_PREFERRED)
+    return crs.toWkt()
+
+
+class _PyprojTransform:
+    def __init__(self, source_crs, destination_crs):
+        self.transformer = Transformer.from_crs(
+            _crs_definition(source_crs), _crs_definition(destination_crs), always_xy=True
+        )
+
+    def __call__(self, xs, ys):
+        xs, ys = self.transformer.transform(xs, ys)
+        return np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+
+
+class _OsrTransform:
+    def __init__(self, source_crs, destination_crs):
+        self.transformation = osr.CoordinateTransformation(
+            self._spatial_reference(source_crs), self._spatial_reference(destination_crs)
+        )
+
+    @staticmethod
+    def _spatial_reference(crs):
+        spatial_reference = osr.SpatialReference()
+        spatial_reference.SetFromUserInput(_crs_definition(crs))
+        # Порядок осей x/y (долгота/широта), как в QGIS
+        if hasattr(osr, "OAMS_TRADITIONAL_GIS_ORDER"):
+            spatial_reference.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        return spatial_reference
+
+    def __call__(self, xs, ys):
+        points = np.array(self.transformation.TransformPoints(np.column_stack([xs, ys]).tolist()))
+        return points[:, 0], points[:, 1]
+
+
+class _QgisTransform:
+    """Поточечное преобразование QgsCoordinateTransform с операцией из контекста проекта."""
+
+    def __init__(self, source_crs, destination_crs, context):
+        self.transform = QgsCoordinateTransform(source_crs, destination_crs, context)
+
+    def __call__(self, xs, ys):
+        result_xs = np.full(xs.shape, np.inf)
+        result_ys = np.full(ys.shape, np.inf)
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            try:
+                point = self.transform.transform(QgsPointXY(x, y))
+            except QgsCsException:
+                continue
+            result_xs[i], result_ys[i] = point.x(), point.y()
+        return result_xs, result_ys
+
+
+def _has_context_operation(context, source_crs, destination_crs):
+    """Задана ли в контексте преобразований своя операция для пары СК (в любом направлении)."""
+    if hasattr(context, "calculateCoordinateOperation"):
+        return bool(
+            context.calculateCoordinateOperation(source_crs, destination_crs)
+            or context.calculateCoordinateOperation(destination_crs, source_crs)
+        )
+    # QGIS до 3.8: преобразования датумов по идентификаторам
+    pair = context.calculateDatumTransforms(source_crs, destination_crs)
+    return pair.sourceTransformId != -1 or pair.destinationTransformId != -1
+
+
+class TransformRegistry:
+    """Кэш преобразований координат для пар систем координат.
+
+    Преобразования применяются сразу к массивам координат одним вызовом
+    PROJ (через pyproj, если он установлен, иначе через GDAL OSR), без
+    поточечных вызовов QgsCoordinateTransform. Экземпляр не следует
+    использовать одновременно из нескольких потоков.
+
+    Если в контексте преобразований проекта (context, например
+    QgsProject.instance().transformContext()) для пары СК выбрана своя
+    операция, используется QgsCoordinateTransform с этим контекстом,
+    чтобы результат совпадал с преобразованием в QGIS.
+    """
+
+    def __init__(self, context=None):
+        self.context = context
+        self._transforms = {}
+
+    def transformer(self, source_crs, destination_crs):
+        """Функция преобразования массивов (xs, ys) из source_crs в destination_crs."""
+        key = (source_crs.toWkt(), destination_crs.toWkt())
+        transform = self._transforms.get(key)
+        if transform is None:
+            if self.context is not None and _has_context_operation(self.context, source_crs, destination_crs):
+                transform = _QgisTransform(source_crs, destination_crs, self.context)
+            elif Transformer is not None:
+                transform = _PyprojTransform(source_crs, destination_crs)
+            else:
+                transform = _OsrTransform(source_crs, destination_crs)
+            self._transforms[key] = transform
+        return transform
+
+    def transform(self, source_crs, destination_crs, xs, ys):
+        """Преобразует массивы координат; недопустимые точки получают inf/NaN."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if xs.size == 0 or source_crs == destination_crs or not source_crs.isValid() or not destination_crs.isValid():
+            return xs.copy(), ys.copy()
+        return self.transformer(source_crs, destination_crs)(xs, ys)
@@ -0,0 +1,189 @@
+import os
+
+from qgis.core import QgsCoordinateTransformContext, QgsFeature, QgsFields, QgsVectorFileWriter, QgsVectorLayer, QgsWkbTypes
+
+
+class FeatureWriteError(Exception):
+    """Ошибка записи объектов в слой."""
+
+
+# Форматы файлов для записи точек по расширению
+OUTPUT_DRIVERS = {'.gpkg': 'GPKG', '.fgb': 'FlatGeobuf'}
+
+# Фильтр форматов для диалога выбора файла
+OUTPUT_FILE_FILTER = "GeoPackage (*.gpkg);;FlatGeobuf (*.fgb)"
+
+
+def create_memory_point_layer(name, crs, fields):
+    """Создаёт временный точечный слой с заданными полями."""
+    layer = QgsVectorLayer(f"Point?crs={crs.authid()}", name, "memory")
+    layer.dataProvider().addAttributes(fields)
+    layer.updateFields()
+    return layer
+
+
+class BatchFeatureWriter:
+    """Пакетная запись объектов в слой.
+
+    Объекты накапливаются в буфере и передаются провайдеру порциями через
+    addFeatures(); экстент слоя обновляется один раз при закрытии.
+    """
+
+    def __init__(self, layer, chunk_size=10000):
+        self.layer = layer
+        self.provider = layer.dataProvider()
+        self.fields = layer.fields()
+        self.chunk_size = chunk_size
+        self.written_count = 0
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._buffer = []
+        return False
+
+    def add(self, geometry, attributes):
+        """Добавляет объект с заданной геометрией и атрибутами."""
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(geometry)
+        feature.setAttributes(attributes)
+        self.add_feature(feature)
+
+    def add_feature(self, feature):
+        self._buffer.append(feature)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленную порцию объектов в провайдер."""
+        if not self._buffer:
+            return
+        ok, _ = self.provider.addFeatures(self._buffer)
+        if not ok:
+            raise FeatureWriteError(self.provider.lastError() or "Не удалось записать объекты в слой.")
+        self.written_count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Записывает остаток буфера и обновляет экстент слоя."""
+        self.flush()
+        self.layer.updateExtents()
+        return self.layer
+
+
+class FileFeatureWriter:
+    """Потоковая запись точек в файл GeoPackage или FlatGeobuf.
+
+    Объекты передаются в QgsVectorFileWriter порциями и не накапливаются
+    в памяти. В GeoPackage каждая порция дописывается в таблицу отдельным
+    сеансом записи, то есть отдельной транзакцией, поэтому при сбое уже
+    записанные точки сохраняются; пространственный индекс строится один раз
+    после записи всех точек. FlatGeobuf пишется одним проходом, его индекс
+    строится драйвером при закрытии файла. Результат — слой на основе файла.
+    """
+
+    def __init__(self, path, name, crs, fields, chunk_size=50000):
+        if not hasattr(QgsVectorFileWriter, "create"):
+            raise FeatureWriteError("Запись в файл поддерживается начиная с QGIS 3.10.")
+        self.driver = OUTPUT_DRIVERS.get(os.path.splitext(path)[1].lower())
+        if self.driver is None:
+            raise FeatureWriteError(f"Неподдерживаемый формат файла: {path}")
+        self.path = path
+        self.name = name
+        self.table_name = os.path.splitext(os.path.basename(path))[0]
+        self.crs = crs
+        self.fields = QgsFields()
+        for field in fields:
+            self.fields.append(field)
+        self.chunk_size = chunk_size
+        self.written_count = 0
+        self.layer = None
+        self._buffer = []
+
+        self._writer = self._open_writer(QgsVectorFileWriter.CreateOrOverwriteFile)
+        if self.driver == 'GPKG':
+            # Таблица создана, порции будут дописываться в неё
+            self._close_writer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._buffer = []
+            self._close_writer()
+        return False
+
+    def _open_writer(self, action):
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = self.driver
+        options.layerName = self.table_name
+        options.fileEncoding = "UTF-8"
+        options.actionOnExistingFile = action
+        # Индекс GeoPackage, обновляемый при каждой вставке, замедляет запись
+        options.layerOptions = ["SPATIAL_INDEX=NO"] if self.driver == 'GPKG' else ["SPATIAL_INDEX=YES"]
+        writer = QgsVectorFileWriter.create(
+            self.path, self.fields, QgsWkbTypes.Point, self.crs, QgsCoordinateTransformContext(), options
+        )
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            raise FeatureWriteError(writer.errorMessage())
+        return writer
+
+    def _close_writer(self):
+        # Файл закрывается (и транзакция фиксируется) при удалении объекта записи
+        writer, self._writer = self._writer, None
+        del writer
+
+    def add(self, geometry, attributes):
+        """Добавляет объект с заданной геометрией и атрибутами."""
+        feature = QgsFeature(self.fields)
+        feature.setGeometry(geometry)
+        feature.setAttributes(attributes)
+        self.add_feature(feature)
+
+    def add_feature(self, feature):
+        self._buffer.append(feature)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленную порцию объектов в файл."""
+        if not self._buffer:
+            return
+        if self._writer is not None:
+            self._add_features(self._writer)
+        else:
+            # Отдельный сеанс дозаписи — отдельная транзакция GeoPackage
+            self._writer = self._open_writer(QgsVectorFileWriter.AppendToLayerNoNewFields)
+            try:
+                self._add_features(self._writer)
+            finally:
+                self._close_writer()
+        self.written_count += len(self._buffer)
+        self._buffer = []
+
+    def _add_features(self, writer):
+        if not writer.addFeatures(self._buffer):
+            raise FeatureWriteError(writer.errorMessage() or "Не удалось записать объекты в файл.")
+
+    def close(self):
+        """Записывает остаток буфера, закрывает файл и открывает его как слой."""
+        self.flush()
+        self._close_writer()
+        if self.driver == 'GPKG':
+            layer = QgsVectorLayer(f"{self.path}|layername={self.table_name}", self.name, "ogr")
+            if layer.isValid():
+                layer.dataProvider().createSpatialIndex()
+        else:
+            layer = QgsVectorLayer(self.path, self.name, "ogr")
+        if not layer.isValid():
+            raise FeatureWriteError(f"Не удалось открыть записанный файл: {self.path}")
+        self.layer = layer
+        return layer
@@ -0,0 +1,69 @@
+# Чтение растра напрямую через GDAL.
+# Модуль не зависит от QGIS: вместе с raster_sampling и другими модулями
+# ядра он позволяет выполнять выборку вне QGIS (например, в замерах
+# производительности).
+import numpy as np
+from osgeo import gdal, gdal_array
+
+from .raster_sampling import Extent, RasterBlock
+
+
+class GdalRasterSource:
+    """Источник блоков растра для RasterBlockSampler на основе набора данных GDAL.
+
+    Принимает путь к файлу или открытый набор данных (например, растр
+    драйвера MEM). Поддерживаются растры без поворота; nodata, масштаб и
+    смещение каналов берутся из набора данных.
+    """
+
+    def __init__(self, dataset):
+        if isinstance(dataset, str):
+            path, dataset = dataset, gdal.Open(dataset, gdal.GA_ReadOnly)
+            if dataset is None:
+                raise RuntimeError(f"Не удалось открыть растр {path}")
+        x_origin, pixel_width, row_rotation, y_origin, col_rotation, pixel_height = dataset.GetGeoTransform()
+        if row_rotation or col_rotation:
+            raise ValueError("Повёрнутые растры не поддерживаются.")
+        self.dataset = dataset
+        self.uri = dataset.GetDescription() or str(id(dataset))
+        self.crs_wkt = dataset.GetProjection()
+        self.width = dataset.RasterXSize
+        self.height = dataset.RasterYSize
+        self.extent = Extent(
+            x_origin, y_origin + pixel_height * self.height, x_origin + pixel_width * self.width, y_origin
+        )
+
+    def numpy_dtype(self, band):
+        raster_band = self.dataset.GetRasterBand(band)
+        if self._scaled(raster_band):
+            return np.float64
+        dtype = gdal_array.GDALTypeCodeToNumericTypeCode(raster_band.DataType)
+        # Комплексные типы читаются поточечно, как и в провайдере QGIS
+        if dtype is None or np.dtype(dtype).kind == 'c':
+            return None
+        return dtype
+
+    def read_block(self, band, row0, col0, rows, cols):
+        raster_band = self.dataset.GetRasterBand(band)
+        data = raster_band.ReadAsArray(col0, row0, cols, rows)
+        nodata_value = raster_band.GetNoDataValue()
+        nodata_mask = None
+        if nodata_value is not None:
+            nodata_mask = np.isnan(data) if np.isnan(nodata_value) else data == nodata_value
+        if self._scaled(raster_band):
+            data = data * (raster_band.GetScale() or 1.0) + (raster_band.GetOffset() or 0.0)
+        return RasterBlock(data, nodata_mask, None)
+
+    def sample_point(self, x, y, band):
+        col = int(np.floor((x - self.extent.x_min) / (self.extent.width() / self.width)))
+        row = int(np.floor((self.extent.y_max - y) / (self.extent.height() / self.height)))
+        if not (0 <= col < self.width and 0 <= row < self.height):
+            return np.nan, False
+        block = self.read_block(band, row, col, 1, 1)
+        value = complex(block.data[0, 0]).real if np.iscomplexobj(block.data) else float(block.data[0, 0])
+        ok = not np.isnan(value) and (block.nodata_mask is None or not block.nodata_mask[0, 0])
+        return value, ok
+
+    @staticmethod
+    def _scaled(raster_band):
+        return (raster_band.GetScale() or 1.0) != 1.0 or (raster_band.GetOffset() or 0.0) != 0.0
@@ -0,0 +1,201 @@
+# Необязательные замеры производительности этапов обработки.
+# Модуль не зависит от QGIS: замеры включаются set_enabled(True), а пока
+# они выключены, start_profile() возвращает пустой профиль без накладных
+# расходов. Замеры памяти (tracemalloc) включаются отдельно
+# set_memory_tracing(True): трассировка замедляет весь процесс и искажает
+# время этапов.
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+# Сколько последних завершённых профилей хранится в памяти
+MAX_PROFILES = 100
+
+_enabled = False
+_profiles = deque(maxlen=MAX_PROFILES)
+
+# Учёт одновременно выполняемых этапов: пик tracemalloc общий для процесса,
+# поэтому он приписывается этапу, только если другие этапы в это время не шли
+_memory_lock = threading.Lock()
+_active_stages = 0
+_stage_serial = 0
+
+
+def set_enabled(enabled):
+    """Включает или выключает замеры времени, числа объектов и кэшей."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_memory_tracing(enabled):
+    """Включает или выключает замеры пиковой памяти этапов (tracemalloc)."""
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_memory_tracing():
+    return tracemalloc.is_tracing()
+
+
+def start_profile(operation):
+    """Профиль операции или пустой профиль, если замеры выключены."""
+    return OperationProfile(operation) if _enabled else _NullProfile()
+
+
+def recorded_profiles():
+    """Завершённые профили в виде словарей, от ранних к поздним."""
+    return [profile.to_dict() for profile in _profiles]
+
+
+def clear_profiles():
+    _profiles.clear()
+
+
+def export_json(path):
+    """Сохраняет завершённые профили в файл JSON."""
+    with open(path, "w", encoding="utf-8") as export_file:
+        json.dump({"profiles": recorded_profiles()}, export_file, ensure_ascii=False, indent=2)
+
+
+class OperationProfile:
+    """Замеры одной операции: время, число объектов и пиковая память по этапам.
+
+    Этапы с одинаковым именем (например, повторные выборки) суммируются.
+    Пиковая память этапа — наибольший прирост памяти Python и NumPy
+    (tracemalloc) за время этапа; она записывается, только если включена
+    трассировка памяти и этап выполнялся один, без этапов других операций
+    или вложенных этапов. Для кэшей блоков растра (RasterBlockCache)
+    учитываются попадания и промахи за время операции.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.stages = {}
+        self.caches = []
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.cache_hits = None
+        self.cache_misses = None
+
+    @contextmanager
+    def stage(self, name, items=None):
+        """Замеряет этап; число объектов можно задать и внутри блока: record["items"] = n."""
+        record = {"items": items}
+        memory = _start_memory_stage()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self.add_stage(name, seconds, record["items"], _finish_memory_stage(memory))
+
+    def add_stage(self, name, seconds, items=None, peak_memory=None):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "items": None, "calls": 0, "peak_memory": None})
+        stage["seconds"] += seconds
+        stage["calls"] += 1
+        if items is not None:
+            stage["items"] = (stage["items"] or 0) + int(items)
+        if peak_memory is not None:
+            stage["peak_memory"] = max(stage["peak_memory"] or 0, peak_memory)
+
+    def count_cache(self, cache):
+        """Учитывает попадания и промахи кэша блоков, начиная с текущего момента."""
+        self.caches.append((cache, cache.hits, cache.misses))
+
+    def finish(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+            self.cache_hits = sum(cache.hits - hits for cache, hits, _ in self.caches)
+            self.cache_misses = sum(cache.misses - misses for cache, _, misses in self.caches)
+            _profiles.append(self)
+        return self
+
+    def to_dict(self):
+        stages = []
+        for name, stage in self.stages.items():
+            throughput = None
+            if stage["items"] is not None and stage["seconds"] > 0:
+                throughput = stage["items"] / stage["seconds"]
+            stages.append(dict(stage, stage=name, items_per_second=throughput))
+        return {
+            "operation": self.operation,
+            "seconds": self.seconds,
+            "stages": stages,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def summary(self):
+        """Текстовая сводка для журнала сообщений."""
+        data = self.to_dict()
+        lines = [f"{self.operation}: {data['seconds']:.3f} с"]
+        for stage in data["stages"]:
+            line = f"  {stage['stage']}: {stage['seconds']:.3f} с"
+            if stage["items"] is not None:
+                line += f", объектов {stage['items']}"
+            if stage["items_per_second"] is not None:
+                line += f" ({stage['items_per_second']:,.0f}/с)"
+            if stage["peak_memory"] is not None:
+                line += f", пик памяти +{stage['peak_memory'] / 2 ** 20:.1f} МБ"
+            lines.append(line)
+        if self.caches:
+            lines.append(f"  кэш блоков растра: попаданий {data['cache_hits']}, промахов {data['cache_misses']}")
+        return "\n".join(lines)
+
+
+def _start_memory_stage():
+    """Начинает учёт памяти этапа; возвращает его состояние или None без трассировки."""
+    global _active_stages, _stage_serial
+    if not tracemalloc.is_tracing():
+        return None
+    with _memory_lock:
+        _stage_serial += 1
+        alone = _active_stages == 0
+        _active_stages += 1
+        start_memory = None
+        # Пик сбрасывается, только если никакой другой этап его не использует
+        if alone and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        return _stage_serial, start_memory
+
+
+def _finish_memory_stage(memory):
+    """Прирост памяти за этап или None, если пик нельзя отнести к этапу."""
+    global _active_stages
+    if memory is None:
+        return None
+    serial, start_memory = memory
+    with _memory_lock:
+        _active_stages -= 1
+        # Пока шёл этап, начинались другие этапы — пик общий для них
+        if start_memory is None or serial != _stage_serial or not tracemalloc.is_tracing():
+            return None
+        return max(tracemalloc.get_traced_memory()[1] - start_memory, 0)
+
+
+class _NullProfile:
+    """Профиль при выключенных замерах: этапы выполняются без учёта."""
+
+    @contextmanager
+    def stage(self, name, items=None):
+        yield {"items": items}
+
+    def add_stage(self, name, seconds, items=None, peak_memory=None):
+        pass
+
+    def count_cache(self, cache):
+        pass
+
+    def finish(self):
+        return None
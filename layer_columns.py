@@ -0,0 +1,226 @@
+import numpy as np
+from qgis.core import QgsFeatureRequest, QgsVectorLayerFeatureSource
+from qgis.PyQt.QtCore import QVariant
+
+
+ASSESSMENT_COLUMNS = ('RasterValue', 'RasterText', 'Assessment')
+
+
+def is_null(value):
+    """Проверяет значение атрибута на NULL (None или пустой QVariant)."""
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+def read_columns(source, fields, field_names, feature_ids=None):
+    """Читает столбцы атрибутов одним запросом без геометрии.
+
+    source — слой или источник объектов, fields — его поля; feature_ids
+    ограничивает чтение заданными объектами. Возвращает
+    массив идентификаторов объектов и словарь {имя поля: массив}: числовые
+    поля — float64 с NaN вместо NULL, остальные — object с None вместо NULL.
+    Отсутствующие в слое поля пропускаются.
+    """
+    names = [name for name in field_names if fields.indexOf(name) >= 0]
+    indexes = [fields.indexOf(name) for name in names]
+
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes(indexes)
+    if feature_ids is not None:
+        request.setFilterFids(list(feature_ids))
+
+    read_ids = []
+    rows = []
+    for feature in source.getFeatures(request):
+        read_ids.append(feature.id())
+        attributes = feature.attributes()
+        rows.append([None if is_null(attributes[index]) else attributes[index] for index in indexes])
+
+    columns = {}
+    for position, (name, index) in enumerate(zip(names, indexes)):
+        columns[name] = _to_array([row[position] for row in rows], fields.at(index).isNumeric())
+    return np.array(read_ids, dtype=np.int64), columns
+
+
+def _to_array(values, numeric):
+    if numeric:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    # Одинаковые строки хранятся одним объектом — в массиве остаются только ссылки
+    strings = {}
+    return np.array(
+        [None if value is None else strings.setdefault(str(value), str(value)) for value in values],
+        dtype=object
+    )
+
+
+class ColumnSnapshot:
+    """Столбцы слоя для фоновой задачи.
+
+    Создаётся в основном потоке: если столбцы уже есть в кэше слоя, берутся
+    их копии, иначе сохраняется источник объектов слоя (с учётом буфера
+    правок), а сами столбцы читаются методом read() в фоновом потоке.
+    """
+
+    def __init__(self, layer, field_names):
+        self.field_names = list(field_names)
+        self.result = column_cache(layer).cached_columns(self.field_names)
+        self.source = None
+        self.fields = layer.fields()
+        if self.result is None:
+            self.source = QgsVectorLayerFeatureSource(layer)
+
+    def read(self):
+        """Идентификаторы объектов и словарь столбцов, как у ColumnCache.columns()."""
+        if self.result is None:
+            self.result = read_columns(self.source, self.fields, self.field_names)
+            self.source = None
+        return self.result
+
+
+# Кэши столбцов по идентификаторам слоёв
+_caches = {}
+
+
+def column_cache(layer):
+    """Общий для всех диалогов кэш столбцов слоя."""
+    cache = _caches.get(layer.id())
+    if cache is None:
+        cache = ColumnCache(layer)
+        _caches[layer.id()] = cache
+    return cache
+
+
+class ColumnCache:
+    """Столбцы атрибутов слоя в памяти в виде массивов NumPy.
+
+    Столбцы читаются один раз запросом без геометрии и затем обновляются
+    по сигналам слоя: изменённые значения записываются на место, удалённые
+    объекты помечаются, а добавленные дочитываются одним запросом при
+    следующем обращении. Изменения, записанные напрямую в провайдер (мимо
+    буфера правок слоя), передаются в кэш через set_values().
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self._feature_ids = None
+        self._columns = {}
+        self._rows = {}
+        self._deleted = None
+        self._added = set()
+
+        layer.attributeValueChanged.connect(self._attribute_changed)
+        layer.featureAdded.connect(self._feature_added)
+        layer.featureDeleted.connect(self._feature_deleted)
+        # Изменение набора полей, откат и сохранение правок (временные
+        # идентификаторы новых объектов заменяются постоянными) сбрасывают кэш
+        layer.updatedFields.connect(self.invalidate)
+        layer.afterRollBack.connect(self.invalidate)
+        layer.afterCommitChanges.connect(self.invalidate)
+        layer.subsetStringChanged.connect(self.invalidate)
+        layer.willBeDeleted.connect(self._layer_deleted)
+
+    def columns(self, field_names=ASSESSMENT_COLUMNS):
+        """Идентификаторы объектов и копии запрошенных столбцов (отсутствующие поля пропускаются)."""
+        fields = self.layer.fields()
+        names = [name for name in field_names if fields.indexOf(name) >= 0]
+        if self._feature_ids is None:
+            self._load(names)
+        else:
+            if self._added:
+                self._append_added()
+            missing = [name for name in names if name not in self._columns]
+            if missing:
+                self._load_missing(missing)
+
+        return self._live_columns(names)
+
+    def cached_columns(self, field_names=ASSESSMENT_COLUMNS):
+        """Столбцы из кэша или None, если для них пришлось бы читать слой."""
+        fields = self.layer.fields()
+        names = [name for name in field_names if fields.indexOf(name) >= 0]
+        if self._feature_ids is None or self._added or any(name not in self._columns for name in names):
+            return None
+        return self._live_columns(names)
+
+    def _live_columns(self, names):
+        live = ~self._deleted
+        return self._feature_ids[live], {name: self._columns[name][live] for name in names}
+
+    def set_values(self, field_name, feature_ids, values):
+        """Записывает в кэш значения, изменённые напрямую в провайдере."""
+        column = self._columns.get(field_name)
+        if column is None:
+            return
+        for feature_id, value in zip(feature_ids, values):
+            row = self._rows.get(feature_id)
+            if row is not None:
+                column[row] = self._cell(column, value)
+
+    def invalidate(self):
+        self._feature_ids = None
+        self._columns = {}
+        self._rows = {}
+        self._deleted = None
+        self._added = set()
+
+    def _load(self, names):
+        feature_ids, columns = read_columns(self.layer, self.layer.fields(), names)
+        self._feature_ids = feature_ids
+        self._columns = columns
+        self._rows = {feature_id: row for row, feature_id in enumerate(feature_ids.tolist())}
+        self._deleted = np.zeros(feature_ids.size, dtype=bool)
+        self._added = set()
+
+    def _load_missing(self, names):
+        feature_ids, columns = read_columns(self.layer, self.layer.fields(), names)
+        rows = [self._rows.get(feature_id) for feature_id in feature_ids.tolist()]
+        if len(rows) != int((~self._deleted).sum()) or None in rows:
+            # Кэш разошёлся со слоем — перечитываем все столбцы
+            self._load(list(self._columns) + names)
+            return
+        rows = np.array(rows, dtype=np.int64)
+        for name, values in columns.items():
+            column = np.full(self._feature_ids.size, np.nan) if values.dtype != object \
+                else np.full(self._feature_ids.size, None, dtype=object)
+            column[rows] = values
+            self._columns[name] = column
+
+    def _append_added(self):
+        added, self._added = self._added, set()
+        feature_ids, columns = read_columns(self.layer, self.layer.fields(), list(self._columns), added)
+        start = self._feature_ids.size
+        self._feature_ids = np.concatenate([self._feature_ids, feature_ids])
+        self._deleted = np.concatenate([self._deleted, np.zeros(feature_ids.size, dtype=bool)])
+        for name in self._columns:
+            self._columns[name] = np.concatenate([self._columns[name], columns[name]])
+        for offset, feature_id in enumerate(feature_ids.tolist()):
+            self._rows[feature_id] = start + offset
+
+    @staticmethod
+    def _cell(column, value):
+        if column.dtype == object:
+            return None if is_null(value) else str(value)
+        return np.nan if is_null(value) else value
+
+    def _attribute_changed(self, feature_id, field_index, value):
+        if self._feature_ids is None:
+            return
+        name = self.layer.fields().at(field_index).name()
+        self.set_values(name, [feature_id], [value])
+
+    def _feature_added(self, feature_id):
+        if self._feature_ids is not None:
+            self._added.add(feature_id)
+
+    def _feature_deleted(self, feature_id):
+        if self._feature_ids is None:
+            return
+        self._added.discard(feature_id)
+        row = self._rows.pop(feature_id, None)
+        if row is not None:
+            self._deleted[row] = True
+
+    def _layer_deleted(self):
+        _caches.pop(self.layer.id(), None)
+        self.invalidate()
+
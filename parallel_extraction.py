@@ -0,0 +1,185 @@
+# Параллельное чтение значений растра пулом процессов.
+# Модуль не зависит от QGIS: рабочие процессы импортируют только GDAL и
+# NumPy, открывают собственный дескриптор растра и читают свои окна.
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from osgeo import gdal
+
+from .progress import OperationCanceled, report_progress
+
+
+# Открытые дескрипторы растров внутри рабочего процесса
+_datasets = {}
+
+
+def _open_dataset(path):
+    dataset = _datasets.get(path)
+    if dataset is None:
+        dataset = gdal.Open(path, gdal.GA_ReadOnly)
+        if dataset is None:
+            raise RuntimeError(f"Не удалось открыть растр {path}")
+        _datasets[path] = dataset
+    return dataset
+
+
+def _sample_tiles(path, band_numbers, tiles, nodata):
+    """Читает окна растра и возвращает значения в точках (выполняется в рабочем процессе).
+
+    tiles — список (col0, row0, width, height, rows, cols, indices), где
+    rows/cols — индексы пикселей точек внутри окна, indices — номера точек.
+    nodata — пары (значение nodata или None, диапазоны nodata) для каждого
+    канала. Каналы окна читаются подряд и берутся из кэша блоков GDAL.
+    """
+    dataset = _open_dataset(path)
+    bands = [dataset.GetRasterBand(band_number) for band_number in band_numbers]
+    results = []
+    for col0, row0, width, height, rows, cols, indices in tiles:
+        values = np.empty((len(bands), indices.size))
+        valid = np.empty((len(bands), indices.size), dtype=bool)
+        for position, (band, (nodata_value, nodata_ranges)) in enumerate(zip(bands, nodata)):
+            raw = band.ReadAsArray(col0, row0, width, height)[rows, cols].astype(np.float64)
+            band_valid = ~np.isnan(raw)
+            if nodata_value is not None:
+                band_valid &= raw != nodata_value
+            for range_min, range_max in nodata_ranges:
+                band_valid &= ~((raw >= range_min) & (raw <= range_max))
+            values[position] = raw * (band.GetScale() or 1.0) + (band.GetOffset() or 0.0)
+            valid[position] = band_valid
+        results.append((indices, values, valid))
+    return results
+
+
+def _python_executable():
+    """Интерпретатор Python для дочерних процессов.
+
+    Внутри QGIS sys.executable указывает на исполняемый файл QGIS, поэтому
+    ищем python рядом с используемой установкой Python.
+    """
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return sys.executable
+    for name in ("python.exe", "pythonw.exe", os.path.join("bin", "python3"), os.path.join("bin", "python")):
+        candidate = os.path.join(sys.exec_prefix, name)
+        if os.path.exists(candidate):
+            return candidate
+    return sys.executable
+
+
+class ParallelRasterExtractor:
+    """Чтение значений каналов растра в точках пулом процессов.
+
+    Точки группируются по тайлам растра, тайлы распределяются между
+    процессами, а результаты раскладываются обратно по исходным номерам
+    точек. Значение каждой точки зависит только от её пикселя, поэтому
+    результат не зависит от числа процессов и порядка их завершения.
+    Все каналы читаются за один проход по тайлам.
+
+    nodata — пары (значение nodata или None, диапазоны nodata) для
+    каждого канала из bands.
+    """
+
+    def __init__(self, path, bands=(1,), workers=None, tile_size=1024, nodata=None):
+        self.path = path
+        self.bands = list(bands)
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_size = tile_size
+        if nodata is None:
+            nodata = [(None, ())] * len(self.bands)
+        self.nodata = [
+            (nodata_value, [tuple(nodata_range) for nodata_range in nodata_ranges])
+            for nodata_value, nodata_ranges in nodata
+        ]
+
+        dataset = gdal.Open(path, gdal.GA_ReadOnly)
+        if dataset is None:
+            raise RuntimeError(f"Не удалось открыть растр {path}")
+        self.width = dataset.RasterXSize
+        self.height = dataset.RasterYSize
+        inverse_transform = gdal.InvGeoTransform(dataset.GetGeoTransform())
+        # GDAL 2 возвращает пару (успех, преобразование)
+        if len(inverse_transform) == 2:
+            inverse_transform = inverse_transform[1]
+        self.inverse_transform = inverse_transform
+
+    @classmethod
+    def from_provider(cls, provider, bands=(1,), **kwargs):
+        """Создаёт экстрактор по GDAL-провайдеру QGIS с его настройками nodata."""
+        nodata = []
+        for band in bands:
+            nodata_value = None
+            if provider.sourceHasNoDataValue(band) and provider.useSourceNoDataValue(band):
+                nodata_value = provider.sourceNoDataValue(band)
+            nodata_ranges = [(value_range.min(), value_range.max()) for value_range in provider.userNoDataValues(band)]
+            nodata.append((nodata_value, nodata_ranges))
+        path = provider.dataSourceUri().split("|")[0]
+        return cls(path, bands, nodata=nodata, **kwargs)
+
+    def sample(self, xs, ys, feedback=None):
+        """Значения каналов и маска успешного чтения для массивов координат.
+
+        Возвращает массивы формы (число каналов, число точек).
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        values = np.full((len(self.bands), xs.size), np.nan)
+        valid = np.zeros((len(self.bands), xs.size), dtype=bool)
+
+        jobs = self._partition(xs, ys)
+        if not jobs:
+            return values, valid
+
+        context = multiprocessing.get_context("spawn")
+        context.set_executable(_python_executable())
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)), mp_context=context) as executor:
+            futures = [
+                executor.submit(_sample_tiles, self.path, self.bands, job, self.nodata)
+                for job in jobs
+            ]
+            try:
+                for done, future in enumerate(as_completed(futures)):
+                    report_progress(feedback, done, len(futures))
+                    for indices, tile_values, tile_valid in future.result():
+                        values[:, indices] = tile_values
+                        valid[:, indices] = tile_valid
+            except OperationCanceled:
+                for future in futures:
+                    future.cancel()
+                raise
+        return values, valid
+
+    def _partition(self, xs, ys):
+        """Разбивает точки по тайлам и объединяет тайлы в задания для процессов."""
+        inverse = self.inverse_transform
+        cols = np.floor(inverse[0] + inverse[1] * xs + inverse[2] * ys).astype(np.int64)
+        rows = np.floor(inverse[3] + inverse[4] * xs + inverse[5] * ys).astype(np.int64)
+        # Точки, которые не удалось преобразовать (inf/NaN), считаются вне растра
+        inside = np.isfinite(xs) & np.isfinite(ys)
+        inside = np.flatnonzero(inside & (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height))
+        if inside.size == 0:
+            return []
+
+        rows, cols = rows[inside], cols[inside]
+        tiles_per_row = (self.width + self.tile_size - 1) // self.tile_size
+        tile_keys = (rows // self.tile_size) * tiles_per_row + cols // self.tile_size
+        order = np.argsort(tile_keys, kind='stable')
+        tile_keys = tile_keys[order]
+        starts = np.flatnonzero(np.r_[True, tile_keys[1:] != tile_keys[:-1]])
+        ends = np.r_[starts[1:], tile_keys.size]
+
+        tiles = []
+        for start, end in zip(starts, ends):
+            tile_row, tile_col = divmod(int(tile_keys[start]), tiles_per_row)
+            row0, col0 = tile_row * self.tile_size, tile_col * self.tile_size
+            selection = order[start:end]
+            tiles.append((
+                col0, row0,
+                min(self.tile_size, self.width - col0), min(self.tile_size, self.height - row0),
+                rows[selection] - row0, cols[selection] - col0, inside[selection],
+            ))
+
+        # Несколько заданий на процесс выравнивают нагрузку между ними
+        job_size = -(-len(tiles) // (self.workers * 4))
+        return [tiles[i:i + job_size] for i in range(0, len(tiles), job_size)]
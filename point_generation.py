@@ -0,0 +1,70 @@
+import numpy as np
+
+from .progress import report_progress
+from .spatial_hash import SpatialHash
+
+
+# Области размещения случайных точек и их названия в интерфейсе
+GENERATION_MODES = [
+    ("polygons", "Внутри полигонов"),
+    ("extent", "В экстенте векторного слоя"),
+    ("stratified", "Стратифицированная по классам растра"),
+]
+
+
+def random_points_in_extent(extent, point_count, rng=None):
+    """Равномерно распределённые точки в прямоугольном экстенте."""
+    rng = rng if rng is not None else np.random.default_rng()
+    xs = rng.uniform(extent.xMinimum(), extent.xMaximum(), point_count)
+    ys = rng.uniform(extent.yMinimum(), extent.yMaximum(), point_count)
+    return xs, ys
+
+
+class MinimumDistanceSampler:
+    """Выборка с минимальным расстоянием между точками (Poisson-disk).
+
+    Кандидаты берутся пакетами из равномерного генератора draw_candidates(n)
+    (например, random_points_in_extent или PolygonPointSampler.sample) и
+    принимаются, если ближе min_distance нет ранее принятых точек. Соседи
+    ищутся по равномерной сетке (SpatialHash), поэтому общая сложность
+    близка к O(N log N). Внутри пакета из двух конфликтующих кандидатов
+    отбрасывается более поздний.
+
+    Принятые точки сохраняются между вызовами sample(), поэтому
+    последующие выборки соблюдают расстояние до всех выданных точек.
+    """
+
+    def __init__(self, draw_candidates, min_distance):
+        if min_distance <= 0:
+            raise ValueError("Минимальное расстояние должно быть положительным.")
+        self.draw_candidates = draw_candidates
+        self.min_distance = min_distance
+        self._grid = SpatialHash(min_distance)
+
+    def sample(self, point_count, batch_size=100000, feedback=None, max_failed_batches=3):
+        """Возвращает до point_count новых точек (массивы x и y).
+
+        Если область заполнена и новые кандидаты почти не принимаются,
+        возвращается меньше точек.
+        """
+        xs_parts, ys_parts = [], []
+        remaining = point_count
+        failed_batches = 0
+        while remaining > 0 and failed_batches < max_failed_batches:
+            report_progress(feedback, point_count - remaining, point_count)
+            candidate_count = min(batch_size, 2 * remaining + 1000)
+            xs, ys = self.draw_candidates(candidate_count)
+            # Принимаются не больше remaining первых подходящих кандидатов
+            keep = self._grid.insert(xs, ys, limit=remaining)
+            xs, ys = xs[keep], ys[keep]
+            if xs.size < max(candidate_count // 1000, 1):
+                failed_batches += 1
+            else:
+                failed_batches = 0
+            xs_parts.append(xs)
+            ys_parts.append(ys)
+            remaining -= xs.size
+
+        if not xs_parts:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(xs_parts), np.concatenate(ys_parts)
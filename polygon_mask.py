@@ -0,0 +1,52 @@
+# Маска пикселей растра, лежащих внутри полигонов.
+# Модуль не зависит от QGIS: полигоны задаются геометриями OGR.
+import numpy as np
+from osgeo import gdal, ogr
+
+
+class PolygonRasterMask:
+    """Маска пикселей растра, центры которых лежат внутри полигонов.
+
+    Полигоны (геометрии OGR в системе координат растра) один раз
+    записываются во временный слой OGR в памяти, а маска блока строится
+    растеризацией этого слоя (gdal.RasterizeLayer) в блок MEM того же
+    размера, без поточечных проверок в Python. Для блоков вне охвата
+    полигонов растеризация не выполняется. Используется как mask для
+    ClassAreaHistogram; sampler задаёт сетку пикселей растра.
+    """
+
+    def __init__(self, geometries, sampler):
+        self.sampler = sampler
+        self._source = ogr.GetDriverByName("Memory").CreateDataSource("")
+        self._layer = self._source.CreateLayer("area", geom_type=ogr.wkbUnknown)
+        self.envelope = None
+        for geometry in geometries:
+            if geometry is None or geometry.IsEmpty():
+                continue
+            feature = ogr.Feature(self._layer.GetLayerDefn())
+            feature.SetGeometry(geometry)
+            self._layer.CreateFeature(feature)
+            x_min, x_max, y_min, y_max = geometry.GetEnvelope()
+            if self.envelope is not None:
+                x_min, x_max = min(x_min, self.envelope[0]), max(x_max, self.envelope[1])
+                y_min, y_max = min(y_min, self.envelope[2]), max(y_max, self.envelope[3])
+            self.envelope = (x_min, x_max, y_min, y_max)
+
+    def __call__(self, row0, col0, rows, cols):
+        """Маска блока rows x cols пикселей с левым верхним пикселем (row0, col0)."""
+        pixel_width, pixel_height = self.sampler.pixel_width, self.sampler.pixel_height
+        x_min = self.sampler.extent.xMinimum() + col0 * pixel_width
+        y_max = self.sampler.extent.yMaximum() - row0 * pixel_height
+        x_max, y_min = x_min + cols * pixel_width, y_max - rows * pixel_height
+        envelope = self.envelope
+        if envelope is None or x_max < envelope[0] or x_min > envelope[1] \
+                or y_max < envelope[2] or y_min > envelope[3]:
+            return np.zeros((rows, cols), dtype=bool)
+
+        dataset = gdal.GetDriverByName("MEM").Create("", cols, rows, 1, gdal.GDT_Byte)
+        dataset.SetGeoTransform((x_min, pixel_width, 0.0, y_max, 0.0, -pixel_height))
+        # Пиксель попадает в маску, если его центр лежит внутри полигона
+        self._layer.SetSpatialFilterRect(x_min, y_min, x_max, y_max)
+        gdal.RasterizeLayer(dataset, [1], self._layer, burn_values=[1])
+        self._layer.SetSpatialFilter(None)
+        return dataset.GetRasterBand(1).ReadAsArray() > 0
@@ -0,0 +1,196 @@
+# Генерация случайных точек внутри полигонов.
+# Модуль не зависит от QGIS: полигоны задаются геометриями OGR.
+import numpy as np
+from osgeo import ogr
+
+from .progress import report_progress
+
+
+class PolygonPointSampler:
+    """Равномерная генерация точек внутри объединения полигонов.
+
+    Объединение полигонов (геометрии OGR) разбивается квадродеревом на
+    ячейки: ячейки, целиком лежащие внутри полигонов, принимают точки без
+    проверок, а для граничных ячеек хранятся рёбра их части полигона, по
+    которым принадлежность точек проверяется векторно (правило чётности
+    пересечений). Кандидаты генерируются пакетами NumPy только в непустых
+    ячейках, поэтому почти все точки попадают в полигоны с первой попытки.
+    """
+
+    def __init__(self, geometries, max_depth=8, max_vertices=256, seed=None):
+        self.max_depth = max_depth
+        self.max_vertices = max_vertices
+        self.rng = np.random.default_rng(seed)
+
+        self._bounds = []
+        self._edges = []
+
+        union = _polygon_union(geometries)
+        self.area = union.GetArea() if union is not None else 0.0
+        if self.area > 0:
+            x_min, x_max, y_min, y_max = union.GetEnvelope()
+            self._subdivide(union, (x_min, y_min, x_max, y_max), 0)
+
+        bounds = np.array(self._bounds, dtype=np.float64).reshape(-1, 4)
+        self._x_min = bounds[:, 0]
+        self._y_min = bounds[:, 1]
+        self._widths = bounds[:, 2] - bounds[:, 0]
+        self._heights = bounds[:, 3] - bounds[:, 1]
+        cell_areas = self._widths * self._heights
+        self._weights = cell_areas / cell_areas.sum() if cell_areas.size else cell_areas
+        self._needs_test = np.array([edges is not None for edges in self._edges], dtype=bool)
+        # Ожидаемая доля принятых кандидатов — для подбора размера пакета
+        self.acceptance = self.area / cell_areas.sum() if cell_areas.size else 0.0
+
+    def _subdivide(self, geometry, rectangle, depth):
+        x_min, y_min, x_max, y_max = rectangle
+        cell_area = (x_max - x_min) * (y_max - y_min)
+        area = geometry.GetArea()
+        if cell_area <= 0 or area <= 0:
+            return
+
+        fraction = area / cell_area
+        if fraction >= 1 - 1e-9:
+            # Ячейка целиком внутри полигонов
+            self._add_cell(rectangle, None)
+            return
+
+        edges = _polygon_edges(geometry)
+        if depth >= self.max_depth or (fraction >= 0.5 and len(edges) <= self.max_vertices):
+            self._add_cell(rectangle, edges)
+            return
+
+        x_center, y_center = (x_min + x_max) / 2, (y_min + y_max) / 2
+        quadrants = (
+            (x_min, y_min, x_center, y_center),
+            (x_center, y_min, x_max, y_center),
+            (x_min, y_center, x_center, y_max),
+            (x_center, y_center, x_max, y_max),
+        )
+        for quadrant in quadrants:
+            clipped = geometry.Intersection(_rectangle_geometry(quadrant))
+            if clipped is not None and not clipped.IsEmpty():
+                self._subdivide(clipped, quadrant, depth + 1)
+
+    def _add_cell(self, rectangle, edges):
+        self._bounds.append(rectangle)
+        self._edges.append(edges)
+
+    def sample(self, point_count, batch_size=100000, feedback=None):
+        """Возвращает ровно point_count точек (массивы x и y) внутри полигонов."""
+        if point_count > 0 and not self._bounds:
+            raise ValueError("Полигоны не содержат площади для размещения точек.")
+
+        xs_parts, ys_parts = [], []
+        remaining = point_count
+        while remaining > 0:
+            report_progress(feedback, point_count - remaining, point_count)
+            candidate_count = min(batch_size, int(remaining / self.acceptance * 1.1) + 16)
+            cells, xs, ys = self._draw_candidates(candidate_count)
+            keep = self._contains(cells, xs, ys)
+            xs, ys = xs[keep][:remaining], ys[keep][:remaining]
+            xs_parts.append(xs)
+            ys_parts.append(ys)
+            remaining -= xs.size
+
+        if not xs_parts:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(xs_parts), np.concatenate(ys_parts)
+
+    def _draw_candidates(self, count):
+        # Ячейки выбираются пропорционально площади, поэтому плотность точек равномерна
+        cells = self.rng.choice(self._weights.size, size=count, p=self._weights)
+        xs = self._x_min[cells] + self.rng.random(count) * self._widths[cells]
+        ys = self._y_min[cells] + self.rng.random(count) * self._heights[cells]
+        return cells, xs, ys
+
+    def _contains(self, cells, xs, ys):
+        keep = np.ones(xs.size, dtype=bool)
+        # Точную проверку проходят только кандидаты из граничных ячеек,
+        # сгруппированные по ячейкам
+        tested = np.flatnonzero(self._needs_test[cells])
+        if not tested.size:
+            return keep
+        tested = tested[np.argsort(cells[tested], kind='stable')]
+        tested_cells = cells[tested]
+        starts = np.flatnonzero(np.r_[True, tested_cells[1:] != tested_cells[:-1]])
+        ends = np.r_[starts[1:], tested.size]
+        for start, end in zip(starts, ends):
+            group = tested[start:end]
+            keep[group] = points_in_polygon(self._edges[cells[group[0]]], xs[group], ys[group])
+        return keep
+
+
+def points_in_polygon(edges, xs, ys, chunk_size=1 << 22):
+    """Маска точек внутри полигона, заданного рёбрами (массив N x 4: x1, y1, x2, y2).
+
+    Используется правило чётности пересечений луча с рёбрами всех колец,
+    поэтому дырки и несколько частей полигона учитываются без различения
+    внешних и внутренних колец.
+    """
+    x1, y1, x2, y2 = (edges[:, i, None] for i in range(4))
+    inside = np.zeros(xs.size, dtype=bool)
+    # Память на промежуточные массивы ограничена chunk_size элементами
+    step = max(chunk_size // max(len(edges), 1), 1)
+    for start in range(0, xs.size, step):
+        px, py = xs[start:start + step], ys[start:start + step]
+        crosses = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside[start:start + step] = np.count_nonzero(crosses & (px < x_cross), axis=0) % 2 == 1
+    return inside
+
+
+def _polygon_union(geometries):
+    """Объединение полигональных частей геометрий OGR или None."""
+    collection = ogr.Geometry(ogr.wkbMultiPolygon)
+    for geometry in geometries:
+        for polygon in _polygons(geometry):
+            collection.AddGeometry(polygon)
+    if collection.IsEmpty():
+        return None
+    union = collection.UnionCascaded()
+    if union is None:
+        # Некорректные полигоны (самопересечения) исправляются нулевым буфером
+        union = collection.Buffer(0)
+    return union
+
+
+def _polygons(geometry):
+    """Полигоны (без Z и M), из которых состоит геометрия OGR."""
+    if geometry is None or geometry.IsEmpty():
+        return []
+    geometry_type = ogr.GT_Flatten(geometry.GetGeometryType())
+    if geometry_type == ogr.wkbPolygon:
+        polygon = geometry.Clone()
+        polygon.FlattenTo2D()
+        return [polygon]
+    if geometry_type in (ogr.wkbMultiPolygon, ogr.wkbGeometryCollection):
+        polygons = []
+        for i in range(geometry.GetGeometryCount()):
+            polygons.extend(_polygons(geometry.GetGeometryRef(i)))
+        return polygons
+    if geometry_type in (ogr.wkbCurvePolygon, ogr.wkbMultiSurface):
+        return _polygons(geometry.GetLinearGeometry())
+    return []
+
+
+def _polygon_edges(geometry):
+    """Рёбра всех колец полигональных частей геометрии (массив N x 4)."""
+    parts = []
+    for polygon in _polygons(geometry):
+        for i in range(polygon.GetGeometryCount()):
+            points = np.array(polygon.GetGeometryRef(i).GetPoints(), dtype=np.float64)[:, :2]
+            if len(points) > 1:
+                parts.append(np.hstack([points[:-1], points[1:]]))
+    return np.vstack(parts) if parts else np.empty((0, 4))
+
+
+def _rectangle_geometry(rectangle):
+    x_min, y_min, x_max, y_max = rectangle
+    ring = ogr.Geometry(ogr.wkbLinearRing)
+    for x, y in ((x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max), (x_min, y_min)):
+        ring.AddPoint_2D(x, y)
+    polygon = ogr.Geometry(ogr.wkbPolygon)
+    polygon.AddGeometry(ring)
+    return polygon
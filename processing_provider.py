@@ -0,0 +1,375 @@
+import os
+
+from qgis.core import (
+    QgsProcessing, QgsProcessingAlgorithm, QgsProcessingException, QgsProcessingOutputNumber,
+    QgsProcessingOutputVectorLayer, QgsProcessingParameterCrs, QgsProcessingParameterEnum,
+    QgsProcessingParameterField, QgsProcessingParameterFileDestination, QgsProcessingParameterMatrix,
+    QgsProcessingParameterMultipleLayers, QgsProcessingParameterNumber, QgsProcessingParameterRasterLayer,
+    QgsProcessingParameterString, QgsProcessingParameterVectorDestination, QgsProcessingParameterVectorLayer,
+    QgsProcessingProvider
+)
+from qgis.PyQt.QtGui import QIcon
+
+from .accuracy_statistics import format_report
+from .feature_writer import OUTPUT_DRIVERS
+from .point_generation import GENERATION_MODES
+from .progress import OperationCanceled
+from .stratified_sampling import ALLOCATION_METHODS
+from .tasks import GeneratePointsTask, MergeLayersTask, StatisticsTask, TextMappingTask, log_profile
+from .window_statistics import HOMOGENEITY_ACTIONS, WindowFilter
+
+
+class AccuracyAssessmentProvider(QgsProcessingProvider):
+    """Алгоритмы модуля в панели инструментов Processing и в qgis_process."""
+
+    def id(self):
+        return "accuracyassessment"
+
+    def name(self):
+        return "Accuracy Assessment Assistant"
+
+    def icon(self):
+        return QIcon(os.path.join(os.path.dirname(__file__), "Icon.png"))
+
+    def loadAlgorithms(self):
+        for algorithm in (
+            GenerateRandomPointsAlgorithm(), ExtractRasterValuesAlgorithm(),
+            MapClassNamesAlgorithm(), AccuracyStatisticsAlgorithm(),
+        ):
+            self.addAlgorithm(algorithm)
+
+    def supportedOutputVectorLayerExtensions(self):
+        return [extension.lstrip(".") for extension in OUTPUT_DRIVERS]
+
+
+class AssessmentAlgorithm(QgsProcessingAlgorithm):
+    """Алгоритм Processing, выполняющий задачу модуля (AssessmentTask).
+
+    Задача создаётся в prepareAlgorithm() — в основном потоке, где
+    доступны слои, — выполняется в processAlgorithm() с обратной связью
+    Processing (прогресс и отмена), а изменения слоёв применяются в
+    postProcessAlgorithm(), снова в основном потоке.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.task = None
+        self.results = {}
+
+    def createInstance(self):
+        return type(self)()
+
+    def prepareAlgorithm(self, parameters, context, feedback):
+        try:
+            self.task = self.create_task(parameters, context)
+        except ValueError as error:
+            raise QgsProcessingException(str(error))
+        return True
+
+    def processAlgorithm(self, parameters, context, feedback):
+        try:
+            self.task.execute(feedback)
+        except OperationCanceled:
+            return {}
+        except ValueError as error:
+            raise QgsProcessingException(str(error))
+        self.results = self.task_results(parameters, context, feedback)
+        return self.results
+
+    def postProcessAlgorithm(self, context, feedback):
+        if feedback.isCanceled():
+            return {}
+        try:
+            self.apply_results(context, feedback)
+        except ValueError as error:
+            raise QgsProcessingException(str(error))
+        # finished() задачи при запуске через Processing не вызывается
+        log_profile(self.task.profile)
+        return self.results
+
+    def create_task(self, parameters, context):
+        raise NotImplementedError
+
+    def task_results(self, parameters, context, feedback):
+        return {}
+
+    def apply_results(self, context, feedback):
+        pass
+
+
+class PointLayerAlgorithm(AssessmentAlgorithm):
+    """Алгоритм, записывающий точки в файл GeoPackage или FlatGeobuf."""
+
+    def add_point_parameters(self, allow_replace):
+        self.addParameter(QgsProcessingParameterNumber(
+            "WINDOW_SIZE", "Окно окрестности, пикселей (1 — без статистики окрестности)",
+            QgsProcessingParameterNumber.Integer, 1, minValue=1, maxValue=25
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "MIN_PURITY", "Минимальная доля преобладающего класса, %",
+            QgsProcessingParameterNumber.Double, 0, minValue=0, maxValue=100
+        ))
+        actions = HOMOGENEITY_ACTIONS if allow_replace else HOMOGENEITY_ACTIONS[:2]
+        self.addParameter(QgsProcessingParameterEnum(
+            "HOMOGENEITY", "Неоднородные точки", [label for _, label in actions], defaultValue=0
+        ))
+        self.addParameter(QgsProcessingParameterCrs(
+            "TARGET_CRS", "Система координат результата (по умолчанию — СК входного слоя)", optional=True
+        ))
+        self.addParameter(QgsProcessingParameterVectorDestination(
+            "OUTPUT", "Точки", QgsProcessing.TypeVectorPoint
+        ))
+
+    def window_filter(self, parameters, context):
+        """WindowFilter или None, если окрестность не используется."""
+        window_size = self.parameterAsInt(parameters, "WINDOW_SIZE", context)
+        if window_size <= 1:
+            return None
+        # Чётное окно не имеет центрального пикселя — расширяем до нечётного
+        if window_size % 2 == 0:
+            window_size += 1
+        action = HOMOGENEITY_ACTIONS[self.parameterAsEnum(parameters, "HOMOGENEITY", context)][0]
+        return WindowFilter(window_size, self.parameterAsDouble(parameters, "MIN_PURITY", context) / 100.0, action)
+
+    def configure_output(self, task, parameters, context, default_crs):
+        """Задаёт файл и систему координат результата задачи."""
+        output_path = self.parameterAsOutputLayer(parameters, "OUTPUT", context)
+        if os.path.splitext(output_path)[1].lower() not in OUTPUT_DRIVERS:
+            raise ValueError("Файл результата должен иметь расширение .gpkg или .fgb.")
+        task.output_path = output_path
+        crs = self.parameterAsCrs(parameters, "TARGET_CRS", context)
+        task.crs = crs if crs.isValid() else default_crs
+        return task
+
+    def task_results(self, parameters, context, feedback):
+        return {"OUTPUT": self.task.output_path}
+
+
+class GenerateRandomPointsAlgorithm(PointLayerAlgorithm):
+    """Генерация случайных точек со значениями растра."""
+
+    def name(self):
+        return "generaterandompoints"
+
+    def displayName(self):
+        return "Генерация случайных точек"
+
+    def shortHelpString(self):
+        return (
+            "Размещает случайные точки внутри полигонов, в экстенте векторного слоя или "
+            "стратифицированно по классам растра (по пикселям внутри полигонов) и записывает в них "
+            "значения растра."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterVectorLayer(
+            "INPUT", "Векторный слой", [QgsProcessing.TypeVectorPolygon]
+        ))
+        self.addParameter(QgsProcessingParameterRasterLayer("RASTER", "Растровый слой"))
+        self.addParameter(QgsProcessingParameterEnum(
+            "MODE", "Область размещения точек", [label for _, label in GENERATION_MODES], defaultValue=0
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "POINT_COUNT", "Количество точек", QgsProcessingParameterNumber.Integer, 100, minValue=1
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "MIN_DISTANCE", "Минимальное расстояние между точками (в единицах СК векторного слоя)",
+            QgsProcessingParameterNumber.Double, 0, minValue=0
+        ))
+        self.addParameter(QgsProcessingParameterEnum(
+            "ALLOCATION", "Распределение точек по классам", [label for _, label in ALLOCATION_METHODS],
+            defaultValue=0
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "TARGET_STANDARD_ERROR", "Целевая стандартная ошибка", QgsProcessingParameterNumber.Double,
+            0.01, minValue=0.0001, maxValue=1
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "EXPECTED_ACCURACY", "Ожидаемая точность классов", QgsProcessingParameterNumber.Double,
+            0.8, minValue=0, maxValue=1
+        ))
+        self.add_point_parameters(allow_replace=True)
+
+    def create_task(self, parameters, context):
+        vector_layer = self.parameterAsVectorLayer(parameters, "INPUT", context)
+        raster_layer = self.parameterAsRasterLayer(parameters, "RASTER", context)
+        if vector_layer is None or raster_layer is None:
+            raise ValueError("Выберите векторный и растровый слои.")
+        mode = GENERATION_MODES[self.parameterAsEnum(parameters, "MODE", context)][0]
+        allocation_method = ALLOCATION_METHODS[self.parameterAsEnum(parameters, "ALLOCATION", context)][0]
+        task = GeneratePointsTask(
+            vector_layer, raster_layer, mode, self.parameterAsInt(parameters, "POINT_COUNT", context),
+            allocation_method=allocation_method,
+            target_standard_error=self.parameterAsDouble(parameters, "TARGET_STANDARD_ERROR", context),
+            expected_accuracy=self.parameterAsDouble(parameters, "EXPECTED_ACCURACY", context),
+            window=self.window_filter(parameters, context),
+            min_distance=self.parameterAsDouble(parameters, "MIN_DISTANCE", context) if mode != "stratified" else 0,
+        )
+        return self.configure_output(task, parameters, context, vector_layer.crs())
+
+
+class ExtractRasterValuesAlgorithm(PointLayerAlgorithm):
+    """Объединение точечных слоёв и запись значений растров."""
+
+    def name(self):
+        return "extractrastervalues"
+
+    def displayName(self):
+        return "Запись значений из растра"
+
+    def shortHelpString(self):
+        return (
+            "Объединяет точечные слои и записывает в точки значения каналов растров: первый канал "
+            "первого растра — в RasterValue, остальные — в столбцы <растр>_<канал>."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterMultipleLayers(
+            "INPUT", "Точечные слои", QgsProcessing.TypeVectorPoint
+        ))
+        self.addParameter(QgsProcessingParameterMultipleLayers(
+            "RASTERS", "Растровые слои", QgsProcessing.TypeRaster
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            "BANDS", "Номера каналов каждого растра через запятую", "1"
+        ))
+        self.addParameter(QgsProcessingParameterString(
+            "CARRIED_FIELDS", "Переносимые поля исходных слоёв через запятую", optional=True
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "TOLERANCE", "Допуск совпадения точек (в единицах СК результата, 0 — без удаления дубликатов)",
+            QgsProcessingParameterNumber.Double, 0, minValue=0
+        ))
+        self.addParameter(QgsProcessingParameterNumber(
+            "WORKERS", "Число процессов для чтения растра", QgsProcessingParameterNumber.Integer,
+            1, minValue=1, maxValue=os.cpu_count() or 1
+        ))
+        self.add_point_parameters(allow_replace=False)
+
+    def create_task(self, parameters, context):
+        point_layers = self.parameterAsLayerList(parameters, "INPUT", context)
+        raster_layers = self.parameterAsLayerList(parameters, "RASTERS", context)
+        if not point_layers or not raster_layers:
+            raise ValueError("Выберите точечные слои и растры.")
+        try:
+            bands = [int(band) for band in self.parameterAsString(parameters, "BANDS", context).split(",")]
+        except ValueError:
+            raise ValueError("Номера каналов должны быть целыми числами.")
+        raster_bands = []
+        for raster_layer in raster_layers:
+            for band in bands:
+                if not 1 <= band <= raster_layer.bandCount():
+                    raise ValueError(f"В растре {raster_layer.name()} нет канала {band}.")
+                raster_bands.append((raster_layer, band))
+        carried_fields = [
+            name.strip() for name in self.parameterAsString(parameters, "CARRIED_FIELDS", context).split(",")
+            if name.strip()
+        ]
+        task = MergeLayersTask(
+            point_layers, raster_bands, self.parameterAsInt(parameters, "WORKERS", context),
+            window=self.window_filter(parameters, context),
+            tolerance=self.parameterAsDouble(parameters, "TOLERANCE", context),
+            carried_fields=carried_fields,
+        )
+        return self.configure_output(task, parameters, context, point_layers[0].crs())
+
+
+class MapClassNamesAlgorithm(AssessmentAlgorithm):
+    """Запись названий классов в поле RasterText по значениям RasterValue."""
+
+    def name(self):
+        return "mapclassnames"
+
+    def displayName(self):
+        return "Добавление названий классов"
+
+    def shortHelpString(self):
+        return (
+            "Записывает в поле RasterText входного слоя названия классов по таблице "
+            "«значение RasterValue — название». Слой изменяется на месте."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterVectorLayer(
+            "INPUT", "Точечный слой", [QgsProcessing.TypeVectorPoint]
+        ))
+        self.addParameter(QgsProcessingParameterMatrix(
+            "MAPPING", "Названия классов", headers=["RasterValue", "RasterText"]
+        ))
+        self.addOutput(QgsProcessingOutputVectorLayer("OUTPUT", "Слой с названиями классов"))
+
+    def create_task(self, parameters, context):
+        layer = self.parameterAsVectorLayer(parameters, "INPUT", context)
+        if layer is None:
+            raise ValueError("Выберите точечный слой.")
+        table = self.parameterAsMatrix(parameters, "MAPPING", context)
+        try:
+            mappings = {float(value): str(text) for value, text in zip(table[::2], table[1::2])}
+        except ValueError:
+            raise ValueError("Значения RasterValue в таблице должны быть числами.")
+        return TextMappingTask(layer, mappings)
+
+    def apply_results(self, context, feedback):
+        self.task.apply_result()
+        self.results = {"OUTPUT": self.task.layer.id()}
+
+
+class AccuracyStatisticsAlgorithm(AssessmentAlgorithm):
+    """Показатели точности классификации по слою оценки."""
+
+    def name(self):
+        return "accuracystatistics"
+
+    def displayName(self):
+        return "Статистика оценки точности"
+
+    def shortHelpString(self):
+        return (
+            "Рассчитывает общую точность и точность по классам по полю Assessment или по полю "
+            "эталонного класса (с матрицей ошибок и каппой). С растром классификации — также "
+            "оценки с учётом площади классов."
+        )
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(QgsProcessingParameterVectorLayer(
+            "INPUT", "Точечный слой", [QgsProcessing.TypeVectorPoint]
+        ))
+        self.addParameter(QgsProcessingParameterField(
+            "REFERENCE_FIELD", "Поле эталонного класса (для полной матрицы ошибок)",
+            parentLayerParameterName="INPUT", optional=True
+        ))
+        self.addParameter(QgsProcessingParameterRasterLayer(
+            "RASTER", "Растр классификации (для оценок с учётом площади)", optional=True
+        ))
+        self.addParameter(QgsProcessingParameterFileDestination(
+            "OUTPUT_REPORT", "Отчёт", "Текстовые файлы (*.txt)", optional=True
+        ))
+        self.addOutput(QgsProcessingOutputNumber("OVERALL_ACCURACY", "Общая точность"))
+        self.addOutput(QgsProcessingOutputNumber("WEIGHTED_OVERALL_ACCURACY", "Общая точность с учётом площади"))
+        self.addOutput(QgsProcessingOutputNumber("KAPPA", "Каппа"))
+        self.addOutput(QgsProcessingOutputNumber("TOTAL_POINTS", "Число точек"))
+
+    def create_task(self, parameters, context):
+        layer = self.parameterAsVectorLayer(parameters, "INPUT", context)
+        if layer is None:
+            raise ValueError("Выберите точечный слой.")
+        reference_field = self.parameterAsString(parameters, "REFERENCE_FIELD", context) or None
+        raster_layer = self.parameterAsRasterLayer(parameters, "RASTER", context)
+        return StatisticsTask(layer, reference_field, raster_layer)
+
+    def task_results(self, parameters, context, feedback):
+        report = self.task.report
+        text = format_report(report)
+        feedback.pushInfo(text)
+        results = {
+            "OVERALL_ACCURACY": report.overall,
+            "WEIGHTED_OVERALL_ACCURACY": report.weighted_overall,
+            "KAPPA": report.kappa,
+            "TOTAL_POINTS": report.total,
+        }
+        report_path = self.parameterAsFileOutput(parameters, "OUTPUT_REPORT", context)
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                report_file.write(text)
+            results["OUTPUT_REPORT"] = report_path
+        return results
@@ -0,0 +1,32 @@
+class OperationCanceled(Exception):
+    """Операция отменена пользователем."""
+
+
+class ProgressStep:
+    """Часть общего прогресса операции.
+
+    Переводит прогресс этапа (0-100) в диапазон [start, end] родительского
+    объекта обратной связи (QgsTask, QgsFeedback и т. п.).
+    """
+
+    def __init__(self, feedback, start, end):
+        self.feedback = feedback
+        self.start = start
+        self.end = end
+
+    def isCanceled(self):
+        return self.feedback is not None and self.feedback.isCanceled()
+
+    def setProgress(self, progress):
+        if self.feedback is not None:
+            self.feedback.setProgress(self.start + (self.end - self.start) * progress / 100.0)
+
+
+def report_progress(feedback, done, total):
+    """Сообщает о прогрессе и прерывает операцию, если она отменена."""
+    if feedback is None:
+        return
+    if feedback.isCanceled():
+        raise OperationCanceled()
+    if total:
+        feedback.setProgress(100.0 * done / total)
@@ -0,0 +1,106 @@
+import numpy as np
+from osgeo import gdal
+from qgis.core import Qgis, QgsPointXY, QgsRasterRange, QgsRectangle
+
+from .raster_sampling import RasterBlock
+
+
+# Соответствие типов данных растра типам NumPy
+_NUMPY_DTYPES = {
+    Qgis.Byte: np.uint8,
+    Qgis.UInt16: np.uint16,
+    Qgis.Int16: np.int16,
+    Qgis.UInt32: np.uint32,
+    Qgis.Int32: np.int32,
+    Qgis.Float32: np.float32,
+    Qgis.Float64: np.float64,
+}
+if hasattr(Qgis, 'Int8'):
+    _NUMPY_DTYPES[Qgis.Int8] = np.int8
+
+
+class QgisRasterSource:
+    """Источник блоков растра для RasterBlockSampler на основе провайдера QGIS.
+
+    Блоки читаются через QgsRasterDataProvider.block(), поэтому
+    учитываются настройки nodata слоя. Для работы в фоновом потоке
+    передавайте копию провайдера (raster_layer.dataProvider().clone()).
+
+    Если nodata блока задан битовой картой, маска для растров GDAL
+    строится целиком по пользовательским диапазонам nodata и маске
+    канала GDAL; поточечная проверка остаётся только для других провайдеров.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.uri = provider.dataSourceUri()
+        self.crs_wkt = provider.crs().toWkt()
+        self.extent = provider.extent()
+        self.width = provider.xSize()
+        self.height = provider.ySize()
+        self._dataset = None
+        if provider.name() == "gdal":
+            self._dataset = gdal.Open(self.uri.split("|")[0], gdal.GA_ReadOnly)
+
+    def numpy_dtype(self, band):
+        return _NUMPY_DTYPES.get(self.provider.dataType(band))
+
+    def read_block(self, band, row0, col0, rows, cols):
+        x_min = self.extent.xMinimum() + col0 * self.extent.width() / self.width
+        y_max = self.extent.yMaximum() - row0 * self.extent.height() / self.height
+        rectangle = QgsRectangle(
+            x_min, y_max - rows * self.extent.height() / self.height,
+            x_min + cols * self.extent.width() / self.width, y_max
+        )
+        raster_block = self.provider.block(band, rectangle, cols, rows)
+        data = np.frombuffer(bytes(raster_block.data()), dtype=self.numpy_dtype(band))
+        data = data.reshape(rows, cols)
+
+        if raster_block.hasNoDataValue():
+            nodata_value = raster_block.noDataValue()
+            if np.isnan(nodata_value):
+                nodata_mask = np.isnan(data)
+            else:
+                nodata_mask = data == nodata_value
+            return RasterBlock(data, nodata_mask, None)
+        if raster_block.hasNoData():
+            nodata_mask = self._nodata_mask(band, data, row0, col0)
+            if nodata_mask is None:
+                # nodata задан битовой картой — проверяем только нужные пиксели
+                return RasterBlock(data, None, raster_block)
+            return RasterBlock(data, nodata_mask, None)
+        return RasterBlock(data, None, None)
+
+    def sample_point(self, x, y, band):
+        return self.provider.sample(QgsPointXY(x, y), band)
+
+    def _nodata_mask(self, band, data, row0, col0):
+        """Маска nodata блока без значения nodata или None, если её нельзя восстановить."""
+        if self._dataset is None:
+            return None
+        nodata_mask = _range_mask(data, self.provider.userNoDataValues(band))
+        mask_band = self._dataset.GetRasterBand(band).GetMaskBand()
+        # Маска по значению nodata уже учтена провайдером (или отключена в слое)
+        if not mask_band.GetMaskFlags() & (gdal.GMF_ALL_VALID | gdal.GMF_NODATA):
+            rows, cols = data.shape
+            nodata_mask |= mask_band.ReadAsArray(col0, row0, cols, rows) == 0
+        return nodata_mask
+
+
+def _range_mask(data, ranges):
+    """Маска значений, попадающих в диапазоны nodata QgsRasterRange."""
+    nodata_mask = np.zeros(data.shape, dtype=bool)
+    for value_range in ranges:
+        include_min = include_max = True
+        # В QGIS до 3.2 границы диапазона всегда включаются
+        if hasattr(value_range, 'bounds'):
+            bounds = value_range.bounds()
+            include_min = bounds in (QgsRasterRange.IncludeMinAndMax, QgsRasterRange.IncludeMin)
+            include_max = bounds in (QgsRasterRange.IncludeMinAndMax, QgsRasterRange.IncludeMax)
+        in_range = np.ones(data.shape, dtype=bool)
+        if not np.isnan(value_range.min()):
+            in_range &= data >= value_range.min() if include_min else data > value_range.min()
+        if not np.isnan(value_range.max()):
+            in_range &= data <= value_range.max() if include_max else data < value_range.max()
+        nodata_mask |= in_range
+    return nodata_mask
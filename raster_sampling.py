@@ -0,0 +1,316 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from .progress import ProgressStep, report_progress
+
+
+# Прочитанный блок: массив значений, маска nodata (или None) и исходный
+# блок с методом isNoData(row, col), если nodata задан битовой картой
+RasterBlock = namedtuple('RasterBlock', ['data', 'nodata_mask', 'source_block'])
+
+
+class Extent(namedtuple('Extent', ['x_min', 'y_min', 'x_max', 'y_max'])):
+    """Прямоугольный экстент с методами доступа как у QgsRectangle."""
+
+    def xMinimum(self):
+        return self.x_min
+
+    def yMinimum(self):
+        return self.y_min
+
+    def xMaximum(self):
+        return self.x_max
+
+    def yMaximum(self):
+        return self.y_max
+
+    def width(self):
+        return self.x_max - self.x_min
+
+    def height(self):
+        return self.y_max - self.y_min
+
+
+class RasterBlockCache:
+    """LRU-кэш прочитанных блоков растра, ограниченный по объёму памяти."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._size = 0
+
+    def get(self, key, loader):
+        """Возвращает блок по ключу, при отсутствии читает его через loader()."""
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+        self.misses += 1
+        block = loader()
+        self._blocks[key] = block
+        self._size += self._block_size(block)
+
+        # Вытесняем давно не используемые блоки, но всегда оставляем последний
+        while self._size > self.max_bytes and len(self._blocks) > 1:
+            _, evicted = self._blocks.popitem(last=False)
+            self._size -= self._block_size(evicted)
+        return block
+
+    def clear(self):
+        self._blocks.clear()
+        self._size = 0
+
+    @staticmethod
+    def _block_size(block):
+        size = block.data.nbytes
+        if block.nodata_mask is not None:
+            size += block.nodata_mask.nbytes
+        return size
+
+
+class RasterBlockSampler:
+    """Пакетное чтение значений растра в точках.
+
+    Точки группируются по тайлам растра, каждый нужный тайл читается
+    один раз, а значения извлекаются векторной индексацией NumPy.
+
+    source — источник блоков растра: QgisRasterSource (провайдер QGIS)
+    или GdalRasterSource (файл GDAL, без QGIS). Источник задаёт uri,
+    crs_wkt, extent, width и height и методы numpy_dtype(band),
+    read_block(band, row0, col0, rows, cols) и sample_point(x, y, band).
+    """
+
+    def __init__(self, source, band=1, tile_size=512, cache=None):
+        self.source = source
+        self.band = band
+        self.tile_size = tile_size
+        self.cache = cache if cache is not None else RasterBlockCache()
+
+        self.extent = source.extent
+        self.width = source.width
+        self.height = source.height
+        self.dtype = source.numpy_dtype(band)
+        if not self.width or not self.height:
+            # Провайдер без фиксированного размера (например, WMS) — поточечное чтение
+            self.dtype = None
+        else:
+            self.pixel_width = self.extent.width() / self.width
+            self.pixel_height = self.extent.height() / self.height
+
+    def sample(self, xs, ys, feedback=None):
+        """Возвращает значения растра и маску успешного чтения для массивов координат.
+
+        Координаты должны быть заданы в системе координат растра.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        values = np.full(xs.shape, np.nan)
+        valid = np.zeros(xs.shape, dtype=bool)
+        if xs.size == 0:
+            return values, valid
+
+        if self.dtype is None:
+            # Неподдерживаемый тип данных (например, комплексный)
+            return self._sample_per_point(xs, ys, feedback)
+
+        for tile_row, tile_col, target, local_rows, local_cols in self.tile_groups(xs, ys, feedback):
+            values[target], valid[target] = self.extract(self.read_tile(tile_row, tile_col), local_rows, local_cols)
+        return values, valid
+
+    def grid_key(self):
+        """Ключ сетки растра: у растров с одинаковым ключом совпадают пиксели и тайлы.
+
+        None, если растр читается поточечно.
+        """
+        if self.dtype is None:
+            return None
+        return (
+            self.source.crs_wkt, self.width, self.height, self.tile_size,
+            tuple(round(value, 9) for value in (
+                self.extent.xMinimum(), self.extent.yMinimum(), self.extent.xMaximum(), self.extent.yMaximum()
+            )),
+        )
+
+    def tile_groups(self, xs, ys, feedback=None):
+        """Группирует точки по тайлам растра.
+
+        Для каждого тайла с точками возвращает (tile_row, tile_col, target,
+        local_rows, local_cols), где target — номера точек, а local_rows и
+        local_cols — их пиксели внутри тайла. Тайлы перебираются по порядку.
+        """
+        cols = np.floor((xs - self.extent.xMinimum()) / self.pixel_width).astype(np.int64)
+        rows = np.floor((self.extent.yMaximum() - ys) / self.pixel_height).astype(np.int64)
+        inside = np.isfinite(xs) & np.isfinite(ys)
+        inside &= (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+        indices = np.nonzero(inside)[0]
+        if indices.size == 0:
+            return
+
+        rows = rows[indices]
+        cols = cols[indices]
+        tiles_per_row = (self.width + self.tile_size - 1) // self.tile_size
+        tile_keys = (rows // self.tile_size) * tiles_per_row + cols // self.tile_size
+
+        # Сортировка по тайлу: каждый тайл читается ровно один раз
+        order = np.argsort(tile_keys, kind='stable')
+        tile_keys = tile_keys[order]
+        starts = np.flatnonzero(np.r_[True, tile_keys[1:] != tile_keys[:-1]])
+        ends = np.r_[starts[1:], tile_keys.size]
+
+        for tile_index, (start, end) in enumerate(zip(starts, ends)):
+            report_progress(feedback, tile_index, starts.size)
+            tile_row, tile_col = divmod(int(tile_keys[start]), tiles_per_row)
+            selection = order[start:end]
+            yield (
+                tile_row, tile_col, indices[selection],
+                rows[selection] - tile_row * self.tile_size, cols[selection] - tile_col * self.tile_size,
+            )
+
+    def extract(self, block, local_rows, local_cols):
+        """Значения блока в пикселях и маска пикселей с данными."""
+        tile_values = block.data[local_rows, local_cols].astype(np.float64)
+        return tile_values, self._valid_mask(block, tile_values, local_rows, local_cols)
+
+    def read_tile(self, tile_row, tile_col):
+        """Читает тайл растра (через кэш) и возвращает RasterBlock."""
+        key = (self.source.uri, self.band, self.tile_size, tile_row, tile_col)
+        return self.cache.get(key, lambda: self.read_block(tile_row, tile_col))
+
+    def tile_count(self):
+        """Количество тайлов по строкам и столбцам."""
+        return (
+            (self.height + self.tile_size - 1) // self.tile_size,
+            (self.width + self.tile_size - 1) // self.tile_size,
+        )
+
+    def pixel_window(self, extent):
+        """Диапазоны строк и столбцов растра (row0, row1, col0, col1), покрывающие экстент."""
+        col0 = int(np.floor((extent.xMinimum() - self.extent.xMinimum()) / self.pixel_width))
+        col1 = int(np.ceil((extent.xMaximum() - self.extent.xMinimum()) / self.pixel_width))
+        row0 = int(np.floor((self.extent.yMaximum() - extent.yMaximum()) / self.pixel_height))
+        row1 = int(np.ceil((self.extent.yMaximum() - extent.yMinimum()) / self.pixel_height))
+        return (
+            min(max(row0, 0), self.height), min(max(row1, 0), self.height),
+            min(max(col0, 0), self.width), min(max(col1, 0), self.width),
+        )
+
+    def pixel_to_map(self, rows, cols):
+        """Координаты левого верхнего угла пикселей с заданными индексами."""
+        xs = self.extent.xMinimum() + np.asarray(cols, dtype=np.float64) * self.pixel_width
+        ys = self.extent.yMaximum() - np.asarray(rows, dtype=np.float64) * self.pixel_height
+        return xs, ys
+
+    def read_pixels(self, row0, row1, col0, col1):
+        """Значения прямоугольника пикселей, собранные из тайлов кэша.
+
+        Пиксели без данных и за пределами растра получают NaN.
+        """
+        result = np.full((row1 - row0, col1 - col0), np.nan)
+        top, bottom = max(row0, 0), min(row1, self.height)
+        left, right = max(col0, 0), min(col1, self.width)
+        if top >= bottom or left >= right:
+            return result
+        for tile_row in range(top // self.tile_size, (bottom - 1) // self.tile_size + 1):
+            for tile_col in range(left // self.tile_size, (right - 1) // self.tile_size + 1):
+                tile_top, tile_left = tile_row * self.tile_size, tile_col * self.tile_size
+                block = self.read_tile(tile_row, tile_col)
+                # Часть тайла, попадающая в прямоугольник
+                r0, r1 = max(top, tile_top), min(bottom, tile_top + block.data.shape[0])
+                c0, c1 = max(left, tile_left), min(right, tile_left + block.data.shape[1])
+                rows, cols = np.mgrid[r0 - tile_top:r1 - tile_top, c0 - tile_left:c1 - tile_left]
+                values, valid = self.extract(block, rows.ravel(), cols.ravel())
+                values[~valid] = np.nan
+                result[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = values.reshape(r1 - r0, c1 - c0)
+        return result
+
+    def read_block(self, tile_row, tile_col):
+        """Читает тайл растра без использования кэша."""
+        row0 = tile_row * self.tile_size
+        col0 = tile_col * self.tile_size
+        block_width = min(self.tile_size, self.width - col0)
+        block_height = min(self.tile_size, self.height - row0)
+        return self.source.read_block(self.band, row0, col0, block_height, block_width)
+
+    @staticmethod
+    def block_valid_mask(block):
+        """Маска пикселей блока, содержащих данные.
+
+        Для блоков, где nodata известен только по битовой карте провайдера
+        (source_block), пиксели проверяются по одному.
+        """
+        valid = np.ones(block.data.shape, dtype=bool)
+        if block.data.dtype.kind == 'f':
+            valid &= ~np.isnan(block.data)
+        if block.nodata_mask is not None:
+            valid &= ~block.nodata_mask
+        elif block.source_block is not None:
+            rows, cols = np.nonzero(valid)
+            is_nodata = block.source_block.isNoData
+            valid[rows, cols] = ~np.array([
+                is_nodata(int(row), int(col)) for row, col in zip(rows, cols)
+            ], dtype=bool)
+        return valid
+
+    @staticmethod
+    def _valid_mask(block, tile_values, local_rows, local_cols):
+        valid = ~np.isnan(tile_values)
+        if block.nodata_mask is not None:
+            valid &= ~block.nodata_mask[local_rows, local_cols]
+        elif block.source_block is not None:
+            is_nodata = block.source_block.isNoData
+            valid &= ~np.array([
+                is_nodata(int(row), int(col)) for row, col in zip(local_rows, local_cols)
+            ], dtype=bool)
+        return valid
+
+    def _sample_per_point(self, xs, ys, feedback):
+        values = np.full(xs.shape, np.nan)
+        valid = np.zeros(xs.shape, dtype=bool)
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            if i % 1000 == 0:
+                report_progress(feedback, i, xs.size)
+            value, ok = self.source.sample_point(float(x), float(y), self.band)
+            values[i] = value
+            valid[i] = ok
+        return values, valid
+
+
+def sample_rasters(samplers, coordinates, feedback=None):
+    """Значения нескольких растров и каналов в точках за один проход.
+
+    coordinates — пары массивов (xs, ys) в системе координат растра каждого
+    сэмплера. Сэмплеры с одинаковой сеткой (см. grid_key()) разбивают точки
+    по тайлам один раз: для каждого тайла подряд читаются блоки всех их
+    каналов, поэтому каналы одного файла берутся из только что прочитанных
+    GDAL блоков. nodata каждого растра и канала учитывается отдельно.
+    Возвращает список пар (values, valid) в порядке сэмплеров.
+    """
+    groups = OrderedDict()
+    for index, sampler in enumerate(samplers):
+        key = sampler.grid_key()
+        groups.setdefault(index if key is None else key, []).append(index)
+
+    results = [None] * len(samplers)
+    for group_index, members in enumerate(groups.values()):
+        step = ProgressStep(feedback, 100.0 * group_index / len(groups), 100.0 * (group_index + 1) / len(groups))
+        first = samplers[members[0]]
+        xs, ys = (np.asarray(values, dtype=np.float64) for values in coordinates[members[0]])
+        if first.dtype is None or xs.size == 0:
+            results[members[0]] = first.sample(xs, ys, step)
+            continue
+
+        for index in members:
+            results[index] = (np.full(xs.shape, np.nan), np.zeros(xs.shape, dtype=bool))
+        for tile_row, tile_col, target, local_rows, local_cols in first.tile_groups(xs, ys, step):
+            for index in members:
+                sampler = samplers[index]
+                values, valid = results[index]
+                values[target], valid[target] = sampler.extract(
+                    sampler.read_tile(tile_row, tile_col), local_rows, local_cols
+                )
+    return results
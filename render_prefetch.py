@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+from qgis.core import QgsMapRendererParallelJob, QgsMapSettings, QgsRectangle
+
+
+class RenderPrefetcher:
+    """Фоновая отрисовка видов карты для следующих точек оценки.
+
+    Для каждой из ближайших точек в фоне запускается
+    QgsMapRendererParallelJob с теми же настройками, что и у холста, но с
+    экстентом вокруг точки. Отрисовка заранее загружает тайлы подложек
+    (кэш сети QGIS) и блоки растров (кэш GDAL), поэтому при переходе к
+    точке холст отрисовывается из кэшей, а не ждёт загрузки. Задания
+    выполняются по одному, чтобы не мешать отрисовке текущей точки.
+    """
+
+    def __init__(self, canvas, depth=3, remembered=256):
+        self.canvas = canvas
+        self.depth = depth
+        self.remembered = remembered
+        self._queue = []
+        self._job = None
+        self._job_key = None
+        # Завершённое задание удерживается до следующего, чтобы не удалять
+        # его во время обработки собственного сигнала finished
+        self._finished_job = None
+        self._rendered = OrderedDict()
+
+    def prefetch(self, centers):
+        """Ставит в очередь отрисовку видов вокруг следующих точек (QgsPointXY)."""
+        # Вид вокруг точки имеет тот же размер, что и текущий экстент холста
+        extent = self.canvas.extent()
+        width, height = extent.width(), extent.height()
+        self._queue = []
+        for center in centers[:self.depth]:
+            rectangle = QgsRectangle(
+                center.x() - width / 2, center.y() - height / 2,
+                center.x() + width / 2, center.y() + height / 2
+            )
+            if self._key(rectangle) not in self._rendered and self._key(rectangle) != self._job_key:
+                self._queue.append(rectangle)
+        self._start_next()
+
+    def stop(self):
+        self._queue = []
+        if self._job is not None:
+            self._job.cancelWithoutBlocking()
+            self._finished_job = self._job
+            self._job = None
+            self._job_key = None
+
+    @staticmethod
+    def _key(rectangle):
+        return tuple(round(value, 6) for value in (
+            rectangle.xMinimum(), rectangle.yMinimum(), rectangle.xMaximum(), rectangle.yMaximum()
+        ))
+
+    def _start_next(self):
+        if self._job is not None or not self._queue:
+            return
+        rectangle = self._queue.pop(0)
+        settings = QgsMapSettings(self.canvas.mapSettings())
+        settings.setExtent(rectangle)
+
+        self._job = QgsMapRendererParallelJob(settings)
+        self._job_key = self._key(rectangle)
+        self._job.finished.connect(lambda job=self._job: self._job_finished(job))
+        self._job.start()
+
+    def _job_finished(self, job):
+        # Разрываем связь задания с обработчиком, чтобы задание могло быть удалено
+        job.finished.disconnect()
+        if job is not self._job:
+            # Сигнал от отменённого задания
+            return
+        self._rendered[self._job_key] = True
+        while len(self._rendered) > self.remembered:
+            self._rendered.popitem(last=False)
+        self._finished_job = self._job
+        self._job = None
+        self._job_key = None
+        self._start_next()
@@ -0,0 +1,150 @@
+import numpy as np
+
+
+class SpatialHash:
+    """Равномерная сетка точек для отбора точек, удалённых друг от друга.
+
+    Ячейка сетки — radius / sqrt(2): в ячейке хранится не больше одной
+    точки, а точки ближе radius лежат не дальше двух ячеек. Поэтому
+    проверка пакета точек — 25 векторных поисков в отсортированном массиве
+    кодов ячеек; попарно сравниваются только точки пакета из соседних ячеек.
+    """
+
+    # Число ячеек в строке сетки; коды строк и столбцов отсчитываются от
+    # первой точки и не переходят через край строки
+    _COLUMNS = 1 << 31
+    _CENTER = 1 << 30
+
+    def __init__(self, radius):
+        if radius <= 0:
+            raise ValueError("Радиус должен быть положительным.")
+        self.radius = radius
+        self.cell_size = radius / np.sqrt(2)
+        self._origin = None
+        offsets = np.arange(-2, 3, dtype=np.int64)
+        self._neighbour_offsets = (offsets[:, None] * self._COLUMNS + offsets[None, :]).ravel()
+
+        self._codes = np.empty(0, dtype=np.int64)
+        self._xs = np.empty(0)
+        self._ys = np.empty(0)
+
+    def __len__(self):
+        return self._codes.size
+
+    def insert(self, xs, ys, limit=None):
+        """Добавляет точки, удалённые от уже добавленных; возвращает маску добавленных.
+
+        Точки отбираются жадно в порядке следования: точка добавляется, если
+        ближе radius нет ни одной добавленной ранее точки, в том числе из
+        этого же пакета, поэтому результат не зависит от разбиения точек на
+        пакеты. limit ограничивает число добавляемых точек первыми подходящими. Точки с недопустимыми
+        координатами (inf/NaN) не проверяются и не хранятся, но считаются
+        добавленными.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        keep = np.ones(xs.size, dtype=bool)
+        finite = np.flatnonzero(np.isfinite(xs) & np.isfinite(ys))
+        if finite.size == 0:
+            return keep
+        if self._origin is None:
+            self._origin = (xs[finite[0]], ys[finite[0]])
+
+        accepted = self._accept(xs[finite], ys[finite])
+        keep[finite] = accepted
+        if limit is not None:
+            keep[np.flatnonzero(keep)[limit:]] = False
+            accepted = keep[finite]
+        self._add(xs[finite][accepted], ys[finite][accepted])
+        return keep
+
+    def _cell_codes(self, xs, ys):
+        cols = np.floor((xs - self._origin[0]) / self.cell_size).astype(np.int64) + self._CENTER
+        rows = np.floor((ys - self._origin[1]) / self.cell_size).astype(np.int64) + self._CENTER
+        return rows * self._COLUMNS + cols
+
+    def _accept(self, xs, ys):
+        codes = self._cell_codes(xs, ys)
+        keep = np.ones(xs.size, dtype=bool)
+
+        # Конфликты с ранее добавленными точками (в ячейке не больше одной точки)
+        if self._codes.size:
+            for offset in self._neighbour_offsets:
+                positions = np.minimum(np.searchsorted(self._codes, codes + offset), self._codes.size - 1)
+                found = self._codes[positions] == codes + offset
+                distances = (self._xs[positions] - xs) ** 2 + (self._ys[positions] - ys) ** 2
+                keep &= ~(found & (distances < self.radius ** 2))
+
+        # Конфликты внутри пакета разрешаются жадно в порядке следования точек
+        candidates = np.flatnonzero(keep)
+        if candidates.size > 1:
+            later, earlier = self._batch_conflicts(xs[candidates], ys[candidates], codes[candidates])
+            keep[candidates] = _greedy_accept(candidates.size, later, earlier)
+        return keep
+
+    def _batch_conflicts(self, xs, ys, codes):
+        """Пары точек пакета ближе radius: номера более поздних и более ранних точек пары."""
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        later_parts, earlier_parts = [], []
+        for offset in self._neighbour_offsets:
+            # В ячейке пакета может быть несколько точек — перебираются все;
+            # искомые коды упорядочены, что заметно ускоряет searchsorted
+            starts = np.searchsorted(sorted_codes, sorted_codes + offset, side='left')
+            counts = np.searchsorted(sorted_codes, sorted_codes + offset, side='right') - starts
+            total = int(counts.sum())
+            if not total:
+                continue
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            later = np.repeat(order, counts)
+            earlier = order[np.repeat(starts, counts) + np.arange(total) - first]
+            distances = (xs[earlier] - xs[later]) ** 2 + (ys[earlier] - ys[later]) ** 2
+            close = (earlier < later) & (distances < self.radius ** 2)
+            later_parts.append(later[close])
+            earlier_parts.append(earlier[close])
+        if not later_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(later_parts), np.concatenate(earlier_parts)
+
+    def _add(self, xs, ys):
+        codes = np.concatenate([self._codes, self._cell_codes(xs, ys)])
+        order = np.argsort(codes, kind='stable')
+        self._codes = codes[order]
+        self._xs = np.concatenate([self._xs, xs])[order]
+        self._ys = np.concatenate([self._ys, ys])[order]
+
+
+def _greedy_accept(count, later, earlier, max_rounds=16):
+    """Жадный отбор точек в порядке номеров по парам конфликтов (later, earlier).
+
+    Точка принимается, если не принята ни одна более ранняя точка, с
+    которой она конфликтует. Решения принимаются векторными раундами:
+    точка отклоняется, как только принят её ранний сосед, и принимается,
+    когда все её ранние соседи отклонены. Длинные цепочки конфликтов,
+    оставшиеся после max_rounds раундов, дорешиваются последовательно.
+    """
+    accepted = np.zeros(count, dtype=bool)
+    decided = np.ones(count, dtype=bool)
+    decided[later] = False
+    accepted[decided] = True
+    for _ in range(max_rounds):
+        if decided.all():
+            return accepted
+        rejected = np.zeros(count, dtype=bool)
+        rejected[later[accepted[earlier]]] = True
+        blocked = np.zeros(count, dtype=bool)
+        blocked[later[accepted[earlier] | ~decided[earlier]]] = True
+        newly_accepted = ~decided & ~blocked
+        accepted |= newly_accepted
+        decided |= newly_accepted | rejected
+
+    remaining = np.flatnonzero(~decided)
+    if remaining.size:
+        pending = ~decided[later]
+        order = np.argsort(later[pending], kind='stable')
+        pending_later, pending_earlier = later[pending][order], earlier[pending][order]
+        starts = np.searchsorted(pending_later, remaining, side='left').tolist()
+        ends = np.searchsorted(pending_later, remaining, side='right').tolist()
+        for point, start, end in zip(remaining.tolist(), starts, ends):
+            accepted[point] = not accepted[pending_earlier[start:end]].any()
+    return accepted
@@ -0,0 +1,195 @@
+import math
+
+import numpy as np
+
+from .progress import report_progress
+
+
+ALLOCATION_PROPORTIONAL = "proportional"
+ALLOCATION_EQUAL = "equal"
+ALLOCATION_OLOFSSON = "olofsson"
+
+# Способы распределения точек по классам и их названия в интерфейсе
+ALLOCATION_METHODS = [
+    (ALLOCATION_PROPORTIONAL, "Пропорционально площади классов"),
+    (ALLOCATION_EQUAL, "Поровну между классами"),
+    (ALLOCATION_OLOFSSON, "По целевой стандартной ошибке (Olofsson)"),
+]
+
+
+class ClassAreaHistogram:
+    """Площади классов растра, подсчитанные потоково по блокам.
+
+    Растр читается тайл за тайлом без кэширования, поэтому в памяти
+    одновременно находится только один блок. Помимо общих количеств
+    пикселей сохраняются количества по каждому блоку — они позволяют
+    затем размещать точки, читая только нужные блоки.
+
+    mask — необязательная функция mask(row0, col0, rows, cols), возвращающая
+    булеву маску блока пикселей растра; учитываются только пиксели, для
+    которых она истинна (например, PolygonRasterMask — пиксели внутри
+    полигонов области оценки). Маска строится один раз на блок и
+    сохраняется в упакованном виде для place_points.
+    """
+
+    def __init__(self, sampler, extent=None, mask=None):
+        if sampler.dtype is None:
+            raise ValueError("Растр не поддерживает поблочное чтение.")
+        self.sampler = sampler
+        if extent is None:
+            self.window = (0, sampler.height, 0, sampler.width)
+        else:
+            self.window = sampler.pixel_window(extent)
+        self.mask = mask
+        self._block_masks = {}
+        self.counts = {}
+        self.block_counts = []
+
+    def compute(self, feedback=None):
+        row0, row1, col0, col1 = self.window
+        tile_size = self.sampler.tile_size
+        tile_rows = range(row0 // tile_size, (row1 + tile_size - 1) // tile_size)
+        tile_cols = range(col0 // tile_size, (col1 + tile_size - 1) // tile_size)
+        for row_index, tile_row in enumerate(tile_rows):
+            report_progress(feedback, row_index, len(tile_rows))
+            for tile_col in tile_cols:
+                values, counts = np.unique(self._tile_values(tile_row, tile_col)[0], return_counts=True)
+                if not values.size:
+                    continue
+                tile_counts = dict(zip(values.tolist(), counts.tolist()))
+                self.block_counts.append((tile_row, tile_col, tile_counts))
+                for value, count in tile_counts.items():
+                    self.counts[value] = self.counts.get(value, 0) + count
+        return self.counts
+
+    def _tile_values(self, tile_row, tile_col):
+        """Значения и индексы пикселей тайла, лежащих в окне и содержащих данные."""
+        block = self.sampler.read_block(tile_row, tile_col)
+        valid = self.sampler.block_valid_mask(block)
+
+        # Обрезаем блок по окну экстента
+        row0, row1, col0, col1 = self.window
+        tile_size = self.sampler.tile_size
+        block_row0, block_col0 = tile_row * tile_size, tile_col * tile_size
+        valid[:max(row0 - block_row0, 0), :] = False
+        valid[max(row1 - block_row0, 0):, :] = False
+        valid[:, :max(col0 - block_col0, 0)] = False
+        valid[:, max(col1 - block_col0, 0):] = False
+        if self.mask is not None and valid.any():
+            valid &= self._block_mask(tile_row, tile_col, block_row0, block_col0, valid.shape)
+
+        rows, cols = np.nonzero(valid)
+        return block.data[rows, cols], rows + block_row0, cols + block_col0
+
+    def _block_mask(self, tile_row, tile_col, row0, col0, shape):
+        """Маска блока; однородные маски хранятся одним значением, остальные — битами."""
+        key = (tile_row, tile_col)
+        stored = self._block_masks.get(key)
+        if stored is None:
+            mask = np.asarray(self.mask(row0, col0, *shape), dtype=bool)
+            if mask.all() or not mask.any():
+                self._block_masks[key] = bool(mask.flat[0])
+            else:
+                self._block_masks[key] = np.packbits(mask, axis=None)
+            return mask
+        if isinstance(stored, bool):
+            return np.full(shape, stored)
+        return np.unpackbits(stored, count=shape[0] * shape[1]).astype(bool).reshape(shape)
+
+    def place_points(self, allocation, rng=None, feedback=None):
+        """Размещает точки по классам согласно распределению {класс: число точек}.
+
+        Для каждого класса выбираются случайные пиксели без повторений
+        (по их порядковым номерам среди пикселей класса), затем читаются
+        только блоки, содержащие выбранные пиксели. Точка ставится в
+        случайное место внутри пикселя.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        selected = {}
+        for value, point_count in allocation.items():
+            pixel_count = self.counts.get(value, 0)
+            point_count = min(point_count, pixel_count)
+            if point_count > 0:
+                selected[value] = np.sort(rng.choice(pixel_count, size=point_count, replace=False))
+
+        xs_parts, ys_parts, value_parts = [], [], []
+        offsets = dict.fromkeys(selected, 0)
+        for block_index, (tile_row, tile_col, tile_counts) in enumerate(self.block_counts):
+            report_progress(feedback, block_index, len(self.block_counts))
+            wanted = {}
+            for value, ranks in selected.items():
+                count = tile_counts.get(value, 0)
+                if not count:
+                    continue
+                offset = offsets[value]
+                start, end = np.searchsorted(ranks, [offset, offset + count])
+                if end > start:
+                    wanted[value] = ranks[start:end] - offset
+                offsets[value] = offset + count
+            if not wanted:
+                continue
+
+            values, rows, cols = self._tile_values(tile_row, tile_col)
+            for value, local_ranks in wanted.items():
+                positions = np.flatnonzero(values == value)[local_ranks]
+                xs, ys = self.sampler.pixel_to_map(rows[positions], cols[positions])
+                xs_parts.append(xs + rng.random(positions.size) * self.sampler.pixel_width)
+                ys_parts.append(ys - rng.random(positions.size) * self.sampler.pixel_height)
+                value_parts.append(np.full(positions.size, value, dtype=np.float64))
+
+        if not xs_parts:
+            return np.empty(0), np.empty(0), np.empty(0)
+        return np.concatenate(xs_parts), np.concatenate(ys_parts), np.concatenate(value_parts)
+
+
+def _round_allocation(shares, total):
+    """Округляет доли до целых методом наибольшего остатка, сохраняя сумму."""
+    raw = np.asarray(shares, dtype=np.float64) * total
+    result = np.floor(raw).astype(np.int64)
+    remainder = int(total - result.sum())
+    if remainder > 0:
+        result[np.argsort(-(raw - result), kind='stable')[:remainder]] += 1
+    return result
+
+
+def allocate_proportional(counts, point_count):
+    """Число точек в классе пропорционально его площади."""
+    classes = sorted(counts)
+    areas = np.array([counts[value] for value in classes], dtype=np.float64)
+    return dict(zip(classes, _round_allocation(areas / areas.sum(), point_count).tolist()))
+
+
+def allocate_equal(counts, point_count):
+    """Одинаковое число точек в каждом классе."""
+    classes = sorted(counts)
+    shares = np.full(len(classes), 1.0 / len(classes))
+    return dict(zip(classes, _round_allocation(shares, point_count).tolist()))
+
+
+def allocate_olofsson(counts, target_standard_error=0.01, expected_accuracy=0.8, min_per_class=50):
+    """Объём выборки по Кокрану для заданной стандартной ошибки общей точности.
+
+    n = (sum W_i * S_i / S(O))^2, где W_i — доля площади класса,
+    S_i = sqrt(U_i * (1 - U_i)), U_i — ожидаемая точность пользователя
+    (Olofsson et al., 2014). Точки распределяются по Нейману
+    (пропорционально W_i * S_i), но не менее min_per_class на класс.
+    expected_accuracy может быть числом или словарём {класс: U_i}.
+    """
+    if not target_standard_error > 0:
+        raise ValueError("Целевая стандартная ошибка должна быть больше нуля.")
+    classes = sorted(counts)
+    areas = np.array([counts[value] for value in classes], dtype=np.float64)
+    weights = areas / areas.sum()
+    if isinstance(expected_accuracy, dict):
+        accuracies = np.array([expected_accuracy.get(value, 0.8) for value in classes], dtype=np.float64)
+    else:
+        accuracies = np.full(len(classes), float(expected_accuracy))
+    if not ((accuracies >= 0) & (accuracies <= 1)).all():
+        raise ValueError("Ожидаемая точность должна быть в диапазоне от 0 до 1.")
+    deviations = np.sqrt(accuracies * (1 - accuracies))
+
+    weighted = weights * deviations
+    total = int(math.ceil((weighted.sum() / target_standard_error) ** 2))
+    shares = weighted / weighted.sum() if weighted.sum() > 0 else weights
+    allocation = np.maximum(_round_allocation(shares, total), min_per_class)
+    return dict(zip(classes, allocation.tolist()))
@@ -0,0 +1,759 @@
+from qgis.core import (
+    Qgis, QgsApplication, QgsCoordinateTransform, QgsCsException, QgsFeatureRequest, QgsField, QgsGeometry,
+    QgsMessageLog, QgsPointXY, QgsProject, QgsTask, QgsVectorLayerFeatureSource
+)
+from qgis.PyQt.QtCore import QVariant, pyqtSignal
+import re
+
+import numpy as np
+from osgeo import ogr
+
+from .accuracy_statistics import accuracy_statistics
+from .attribute_update import (
+    DatabaseTable, QgsProviderConnectionException, add_field_if_missing, write_attribute_values
+)
+from .crs_transform import TransformRegistry
+from .feature_writer import BatchFeatureWriter, FileFeatureWriter, create_memory_point_layer
+from .instrumentation import start_profile
+from .layer_columns import ASSESSMENT_COLUMNS, ColumnSnapshot, column_cache
+from .point_generation import MinimumDistanceSampler, random_points_in_extent
+from .polygon_mask import PolygonRasterMask
+from .polygon_sampling import PolygonPointSampler
+from .parallel_extraction import ParallelRasterExtractor
+from .progress import OperationCanceled, ProgressStep, report_progress
+from .spatial_hash import SpatialHash
+from .qgis_raster_source import QgisRasterSource
+from .raster_sampling import RasterBlockCache, RasterBlockSampler, sample_rasters
+from .stratified_sampling import (
+    ALLOCATION_EQUAL, ALLOCATION_PROPORTIONAL, ClassAreaHistogram,
+    allocate_equal, allocate_olofsson, allocate_proportional
+)
+from .value_mapping import mapped_values
+from .window_statistics import (
+    HOMOGENEITY_KEEP, WINDOW_FIELDS, PointSample, collect_homogeneous, window_statistics
+)
+
+
+MESSAGE_TAG = "Accuracy Assessment Assistant"
+
+# Поля происхождения точек в объединённом слое
+PROVENANCE_FIELDS = ("SourceLayer", "SourceFid")
+
+
+class AssessmentTask(QgsTask):
+    """Базовая фоновая задача модуля.
+
+    run() выполняется в фоновом потоке и не должен изменять слои проекта;
+    все изменения проекта выполняются в finished(), в основном потоке.
+    Прогресс и отмена передаются через self.feedback — саму задачу или,
+    при запуске через execute(), внешний объект обратной связи.
+    Если замеры производительности включены, этапы задачи замеряются в
+    self.profile под именем operation.
+    """
+
+    operation = None
+
+    def __init__(self, description):
+        super().__init__(description, QgsTask.CanCancel)
+        self.error = None
+        self.feedback = self
+        self.profile = start_profile(self.operation or description)
+
+    def run(self):
+        try:
+            self.process()
+            return True
+        except OperationCanceled:
+            return False
+        except Exception as error:
+            self.error = str(error)
+            return False
+
+    def execute(self, feedback):
+        """Выполняет задачу в текущем потоке (например, в алгоритме Processing)."""
+        self.feedback = feedback
+        self.process()
+
+    def process(self):
+        raise NotImplementedError
+
+    def finished(self, result):
+        if result:
+            try:
+                self.apply_result()
+            except ValueError as error:
+                self.error = str(error)
+                QgsMessageLog.logMessage(f"{self.description()}: {self.error}", MESSAGE_TAG, Qgis.Critical)
+        elif self.error:
+            QgsMessageLog.logMessage(f"{self.description()}: {self.error}", MESSAGE_TAG, Qgis.Critical)
+        log_profile(self.profile)
+
+    def apply_result(self):
+        pass
+
+
+class PointLayerTask(AssessmentTask):
+    """Задача, создающая новый точечный слой и добавляющая его в проект.
+
+    Если задан output_path (.gpkg или .fgb), точки записываются в файл,
+    иначе — во временный слой в памяти.
+    """
+
+    layerCreated = pyqtSignal(object)
+
+    def __init__(self, description, output_path=None):
+        super().__init__(description)
+        self.output_path = output_path
+        self.layer = None
+        self.crs = QgsProject.instance().crs()
+        self.transforms = TransformRegistry(QgsProject.instance().transformContext())
+
+    def write_points(self, name, crs, fields, geometries, attributes, feedback=None):
+        """Записывает точки в новый слой и передаёт его основному потоку."""
+        if self.output_path:
+            writer = FileFeatureWriter(self.output_path, name, crs, fields)
+        else:
+            writer = BatchFeatureWriter(create_memory_point_layer(name, crs, fields))
+        with self.profile.stage("feature_write", len(attributes)), writer:
+            for i, (geometry, values) in enumerate(zip(geometries, attributes)):
+                if i % writer.chunk_size == 0:
+                    report_progress(feedback, i, len(attributes))
+                writer.add(geometry, values)
+        layer = writer.layer
+        layer.moveToThread(QgsApplication.instance().thread())
+        self.layer = layer
+
+    @staticmethod
+    def finite_points(xs, ys):
+        """Номера точек, координаты которых удалось преобразовать; об остальных пишется в журнал."""
+        kept = np.flatnonzero(np.isfinite(xs) & np.isfinite(ys))
+        if kept.size < xs.size:
+            QgsMessageLog.logMessage(
+                f"Не удалось преобразовать координаты {xs.size - kept.size} точек "
+                f"в систему координат проекта; они пропущены.", MESSAGE_TAG, Qgis.Warning
+            )
+        return kept
+
+    def apply_result(self):
+        QgsProject.instance().addMapLayer(self.layer)
+        self.layerCreated.emit(self.layer)
+
+
+class GeneratePointsTask(PointLayerTask):
+    """Генерация случайных точек и чтение значений растра в них.
+
+    Если задан window (WindowFilter), для каждой точки записывается
+    статистика окрестности, а неоднородные точки удаляются или заменяются.
+    min_distance > 0 задаёт минимальное расстояние между точками (в единицах
+    системы координат векторного слоя) для режимов без стратификации.
+    """
+
+    operation = "generate_random_points"
+
+    def __init__(self, vector_layer, raster_layer, mode, point_count=None,
+                 allocation_method=ALLOCATION_PROPORTIONAL, target_standard_error=0.01,
+                 expected_accuracy=0.8, output_path=None, window=None, min_distance=0):
+        super().__init__("Генерация случайных точек", output_path)
+        # Источник объектов и копия провайдера безопасны для чтения в фоновом потоке
+        self.vector_source = QgsVectorLayerFeatureSource(vector_layer)
+        self.vector_extent = vector_layer.extent()
+        self.vector_crs = vector_layer.crs()
+        self.raster_provider = raster_layer.dataProvider().clone() if raster_layer.isValid() else None
+        self.raster_crs = raster_layer.crs()
+        self.raster_extent = self.vector_extent
+        self.to_raster = QgsCoordinateTransform(self.vector_crs, self.raster_crs, QgsProject.instance())
+        try:
+            self.raster_extent = self.to_raster.transformBoundingBox(self.vector_extent)
+        except QgsCsException:
+            pass
+        self.mode = mode
+        self.point_count = point_count
+        self.allocation_method = allocation_method
+        self.target_standard_error = target_standard_error
+        self.expected_accuracy = expected_accuracy
+        self.window = window
+        self.min_distance = min_distance
+        # Общий кэш блоков для значений и окрестностей точек
+        self.raster_sampler = None
+        if self.raster_provider is not None:
+            self.raster_sampler = RasterBlockSampler(QgisRasterSource(self.raster_provider))
+            self.profile.count_cache(self.raster_sampler.cache)
+
+    def process(self):
+        if self.mode == "stratified":
+            # Точки размещаются по пикселям растра, в его системе координат
+            sample = self.generate_stratified_points()
+            source_crs = self.raster_crs
+        else:
+            sample = self.generate_points()
+            source_crs = self.vector_crs
+        with self.profile.stage("crs_transform", sample.xs.size):
+            xs, ys = self.transforms.transform(source_crs, self.crs, sample.xs, sample.ys)
+        if self.mode != "stratified":
+            if sample.xs.size < self.point_count:
+                QgsMessageLog.logMessage(
+                    f"Удалось разместить {sample.xs.size} точек из {self.point_count}: "
+                    f"область заполнена при заданных ограничениях.", MESSAGE_TAG, Qgis.Warning
+                )
+        kept = self.finite_points(xs, ys)
+        if kept.size < xs.size:
+            xs, ys = xs[kept], ys[kept]
+            sample = PointSample(*(np.asarray(column)[kept] for column in sample))
+
+        fields = [QgsField("ID", QVariant.Int), QgsField("RasterValue", QVariant.Double)]
+        columns = [range(1, sample.xs.size + 1), sample.values.tolist()]
+        if self.window is not None:
+            fields += window_fields()
+            columns += window_columns(sample)
+        geometries = (QgsGeometry.fromPointXY(QgsPointXY(x, y)) for x, y in zip(xs.tolist(), ys.tolist()))
+        self.write_points(
+            "Случайные точки", self.crs, fields, geometries, [list(row) for row in zip(*columns)],
+            ProgressStep(self.feedback, 70, 100)
+        )
+
+    def generate_points(self):
+        """Точки внутри полигонов или в экстенте векторного слоя (в его системе координат)."""
+        if self.mode == "polygons":
+            with self.profile.stage("polygon_index"):
+                geometries = [ogr_geometry(feature.geometry()) for feature in self.vector_source.getFeatures()]
+                draw_points = PolygonPointSampler(geometries).sample
+        else:
+            def draw_points(point_count, feedback=None):
+                return random_points_in_extent(self.vector_extent, point_count)
+        if self.min_distance > 0:
+            # Кандидаты прежнего генератора прореживаются по минимальному расстоянию
+            draw_points = MinimumDistanceSampler(draw_points, self.min_distance).sample
+        steps = iter([(ProgressStep(self.feedback, 0, 40), ProgressStep(self.feedback, 40, 70))])
+
+        def draw(allocation):
+            # Повторные выборки для замены точек идут без отдельного прогресса
+            points_step, raster_step = next(
+                steps, (ProgressStep(self.feedback, 70, 70), ProgressStep(self.feedback, 70, 70))
+            )
+            with self.profile.stage("point_generation") as stage:
+                xs, ys = draw_points(allocation[None], feedback=points_step)
+                stage["items"] = xs.size
+            # Значения растра читаются одним пакетом для всех точек
+            with self.profile.stage("crs_transform", xs.size):
+                raster_xs, raster_ys = self.transforms.transform(self.vector_crs, self.raster_crs, xs, ys)
+            return self.sample_raster(xs, ys, raster_xs, raster_ys, raster_step)
+
+        return collect_homogeneous(draw, {None: self.point_count}, self.window)
+
+    def sample_raster(self, xs, ys, raster_xs, raster_ys, feedback, values=None):
+        """Значения растра (если не известны) и статистика окрестности точек."""
+        if values is None:
+            if self.raster_sampler is None:
+                values = np.full(xs.shape, np.nan)
+            else:
+                with self.profile.stage("raster_sampling", xs.size):
+                    values, valid = self.raster_sampler.sample(raster_xs, raster_ys, ProgressStep(feedback, 0, 50))
+                # Как и provider.sample(), для nodata и точек вне растра записывается NaN
+                values[~valid] = np.nan
+        if self.window is None:
+            majority, purity, distinct = np.full(xs.shape, np.nan), np.full(xs.shape, np.nan), np.zeros(xs.shape)
+        elif self.raster_sampler is None:
+            raise ValueError("Для статистики окрестности нужен растровый слой.")
+        else:
+            with self.profile.stage("window_statistics", xs.size):
+                majority, purity, distinct = window_statistics(
+                    self.raster_sampler, raster_xs, raster_ys, self.window.window_size,
+                    ProgressStep(feedback, 50, 100)
+                )
+        return PointSample(xs, ys, values, majority, purity, distinct)
+
+    def generate_stratified_points(self):
+        """Стратифицированная выборка по классам растра в пределах полигонов векторного слоя.
+
+        Учитываются пиксели, центры которых лежат внутри полигонов.
+        """
+        if self.raster_provider is None:
+            raise ValueError("Растровый слой недоступен.")
+        with self.profile.stage("polygon_index"):
+            mask = PolygonRasterMask(self.raster_geometries(), self.raster_sampler)
+        histogram = ClassAreaHistogram(self.raster_sampler, self.raster_extent, mask=mask)
+        with self.profile.stage("class_histogram"):
+            counts = histogram.compute(ProgressStep(self.feedback, 0, 50))
+        if not counts:
+            raise ValueError("В пределах векторного слоя нет пикселей растра с данными.")
+
+        if self.allocation_method == ALLOCATION_PROPORTIONAL:
+            allocation = allocate_proportional(counts, self.point_count)
+        elif self.allocation_method == ALLOCATION_EQUAL:
+            allocation = allocate_equal(counts, self.point_count)
+        else:
+            allocation = allocate_olofsson(
+                counts,
+                target_standard_error=self.target_standard_error,
+                expected_accuracy=self.expected_accuracy,
+            )
+        steps = iter([(ProgressStep(self.feedback, 50, 60), ProgressStep(self.feedback, 60, 70))])
+
+        def draw(allocation):
+            placement_step, window_step = next(
+                steps, (ProgressStep(self.feedback, 70, 70), ProgressStep(self.feedback, 70, 70))
+            )
+            # Значения классов известны из гистограммы, повторно растр не читается
+            with self.profile.stage("point_placement") as stage:
+                xs, ys, values = histogram.place_points(allocation, feedback=placement_step)
+                stage["items"] = xs.size
+            return self.sample_raster(xs, ys, xs, ys, window_step, values)
+
+        return collect_homogeneous(draw, allocation, self.window, stratified=True)
+
+    def raster_geometries(self):
+        """Полигоны векторного слоя в системе координат растра (геометрии OGR)."""
+        geometries = []
+        for feature in self.vector_source.getFeatures():
+            geometry = QgsGeometry(feature.geometry())
+            if self.vector_crs != self.raster_crs:
+                try:
+                    geometry.transform(self.to_raster)
+                except QgsCsException:
+                    raise ValueError("Не удалось преобразовать полигоны в систему координат растра.")
+            geometries.append(ogr_geometry(geometry))
+        return geometries
+
+
+class MergeLayersTask(PointLayerTask):
+    """Объединение точечных слоёв и запись значений растров.
+
+    raster_bands — список пар (растровый слой, номер канала); значения
+    каждой пары записываются в отдельный столбец, первой — в RasterValue.
+    Все растры и каналы читаются за один проход по точкам. При workers > 1
+    растры GDAL читаются пулом процессов. Если задан window (WindowFilter),
+    статистика окрестности считается по первой паре, а неоднородные точки
+    можно удалить (замена существующих точек не предусмотрена).
+
+    Для каждой точки записываются имя исходного слоя и идентификатор
+    объекта в нём, а также значения полей carried_fields исходных слоёв.
+    При tolerance > 0 точки ближе tolerance (в единицах СК проекта) к уже
+    принятым отбрасываются по мере чтения слоёв: остаётся точка из слоя,
+    выбранного раньше.
+    """
+
+    operation = "merge_layers"
+
+    def __init__(self, point_layers, raster_bands, workers=1, output_path=None, window=None,
+                 tolerance=0, carried_fields=()):
+        super().__init__("Запись значений из растра", output_path)
+        self.workers = workers
+        self.window = window
+        self.tolerance = tolerance
+        self.duplicate_count = 0
+        self.carried_fields = self.source_fields(point_layers, carried_fields)
+        # Каждый слой читается в своей системе координат, только с нужными полями
+        self.point_sources = [
+            (
+                QgsVectorLayerFeatureSource(layer), layer.crs(), layer.name(),
+                [layer.fields().indexOf(field.name()) for field in self.carried_fields],
+            )
+            for layer in point_layers
+        ]
+        # Одна копия провайдера на все каналы растра
+        providers = {}
+        self.raster_bands = []
+        for raster_layer, band in raster_bands:
+            if raster_layer.id() not in providers:
+                providers[raster_layer.id()] = raster_layer.dataProvider().clone() if raster_layer.isValid() else None
+            self.raster_bands.append((providers[raster_layer.id()], raster_layer.crs(), band))
+        self.field_names = self.raster_field_names(raster_bands)
+        # Переносимые поля не должны совпадать с полями значений растров
+        for field in self.carried_fields:
+            while field.name() in self.field_names + list(PROVENANCE_FIELDS) + list(WINDOW_FIELDS):
+                field.setName(f"src_{field.name()}")
+
+    @staticmethod
+    def source_fields(point_layers, names):
+        """Описания переносимых полей (по первому слою, в котором поле есть)."""
+        fields = []
+        for name in names:
+            for layer in point_layers:
+                index = layer.fields().indexOf(name)
+                if index >= 0:
+                    fields.append(QgsField(layer.fields().at(index)))
+                    break
+        return fields
+
+    @staticmethod
+    def raster_field_names(raster_bands):
+        """Имена столбцов: RasterValue для первой пары, <растр>_<канал> для остальных."""
+        names = ["RasterValue"]
+        for raster_layer, band in raster_bands[1:]:
+            base = re.sub(r"\W+", "_", raster_layer.name()).strip("_")[:50] or "Raster"
+            name = f"{base}_{band}"
+            suffix = 1
+            while name in names:
+                suffix += 1
+                name = f"{base}_{band}_{suffix}"
+            names.append(name)
+        return names
+
+    def process(self):
+        with self.profile.stage("read_sources") as stage:
+            coordinates, provenance = self.read_sources()
+            stage["items"] = len(provenance[0])
+        if self.duplicate_count:
+            QgsMessageLog.logMessage(f"Удалено совпадающих точек: {self.duplicate_count}", MESSAGE_TAG, Qgis.Info)
+
+        # Координаты слоёв преобразуются целиком: в СК проекта и в СК каждого растра
+        with self.profile.stage("crs_transform", len(provenance[0])):
+            xs, ys = self.transform_points(coordinates, self.crs)
+            kept = self.finite_points(xs, ys)
+            if kept.size < xs.size:
+                xs, ys = xs[kept], ys[kept]
+                provenance = [[column[i] for i in kept.tolist()] for column in provenance]
+            raster_coordinates = {}
+            for _, raster_crs, _ in self.raster_bands:
+                if raster_crs.toWkt() not in raster_coordinates:
+                    raster_xs, raster_ys = self.transform_points(coordinates, raster_crs)
+                    raster_coordinates[raster_crs.toWkt()] = (raster_xs[kept], raster_ys[kept])
+
+        # Значения всех растров читаются одним пакетом для всех слоёв; окрестности
+        # точек затем извлекаются из тех же блоков общего кэша
+        cache = RasterBlockCache()
+        self.profile.count_cache(cache)
+        with self.profile.stage("raster_sampling", xs.size * len(self.raster_bands)):
+            columns = self.get_raster_values(raster_coordinates, cache, ProgressStep(self.feedback, 33, 60))
+        columns += provenance
+        fields = [QgsField(name, QVariant.Double) for name in self.field_names] + provenance_fields()
+        fields += self.carried_fields
+        if self.window is not None:
+            provider, raster_crs, band = self.raster_bands[0]
+            if provider is None:
+                raise ValueError("Для статистики окрестности нужен растровый слой.")
+            raster_xs, raster_ys = raster_coordinates[raster_crs.toWkt()]
+            sampler = RasterBlockSampler(QgisRasterSource(provider), band, cache=cache)
+            with self.profile.stage("window_statistics", xs.size):
+                sample = PointSample(xs, ys, None, *window_statistics(
+                    sampler, raster_xs, raster_ys, self.window.window_size, ProgressStep(self.feedback, 60, 70)
+                ))
+            fields += window_fields()
+            columns += window_columns(sample)
+            if self.window.action != HOMOGENEITY_KEEP:
+                kept = np.flatnonzero(self.window.accepted(sample.purity))
+                xs, ys = xs[kept], ys[kept]
+                columns = [[column[i] for i in kept.tolist()] for column in columns]
+
+        geometries = (QgsGeometry.fromPointXY(QgsPointXY(x, y)) for x, y in zip(xs.tolist(), ys.tolist()))
+        self.write_points(
+            "Объединенные точки", self.crs, fields,
+            geometries, [list(row) for row in zip(*columns)], ProgressStep(self.feedback, 70, 100)
+        )
+
+    def read_sources(self):
+        """Читает точки всех слоёв за один проход, отбрасывая совпадающие.
+
+        Возвращает список пар (координаты в СК слоя, СК слоя) и столбцы
+        происхождения точек: имя слоя, идентификатор объекта и переносимые поля.
+        """
+        grid = SpatialHash(self.tolerance) if self.tolerance > 0 else None
+        coordinates = []
+        layer_names, feature_ids = [], []
+        carried = [[] for _ in self.carried_fields]
+        for source_index, (source, source_crs, layer_name, indexes) in enumerate(self.point_sources):
+            report_progress(self.feedback, source_index, len(self.point_sources) * 3)
+            request = QgsFeatureRequest().setSubsetOfAttributes([index for index in indexes if index >= 0])
+            points, ids, values = [], [], []
+            for feature in source.getFeatures(request):
+                point_geom = feature.geometry().asPoint()
+                points.append((point_geom.x(), point_geom.y()))
+                ids.append(feature.id())
+                attributes = feature.attributes()
+                values.append([attributes[index] if index >= 0 else None for index in indexes])
+            points = np.array(points, dtype=np.float64).reshape(-1, 2)
+
+            if grid is not None:
+                # Совпадения ищутся в СК проекта, общей для всех слоёв
+                xs, ys = self.transforms.transform(source_crs, self.crs, points[:, 0], points[:, 1])
+                kept = np.flatnonzero(grid.insert(xs, ys))
+                self.duplicate_count += points.shape[0] - kept.size
+                points = points[kept]
+                ids = [ids[i] for i in kept.tolist()]
+                values = [values[i] for i in kept.tolist()]
+
+            coordinates.append((points, source_crs))
+            layer_names.extend([layer_name] * len(ids))
+            feature_ids.extend(ids)
+            for position, column in enumerate(carried):
+                column.extend(row[position] for row in values)
+        return coordinates, [layer_names, feature_ids] + carried
+
+    def transform_points(self, coordinates, destination_crs):
+        xs_parts, ys_parts = [], []
+        for points, source_crs in coordinates:
+            xs, ys = self.transforms.transform(source_crs, destination_crs, points[:, 0], points[:, 1])
+            xs_parts.append(xs)
+            ys_parts.append(ys)
+        return np.concatenate(xs_parts), np.concatenate(ys_parts)
+
+    def get_raster_values(self, raster_coordinates, cache, feedback):
+        """Столбцы значений для каждой пары (растр, канал); блоки читаются через cache."""
+        point_count = next(iter(raster_coordinates.values()))[0].size if raster_coordinates else 0
+        results = [None] * len(self.raster_bands)
+
+        # Каналы одного растра GDAL читаются общим пулом процессов
+        parallel = {}
+        if self.workers > 1:
+            for index, (provider, _, _) in enumerate(self.raster_bands):
+                if provider is not None and provider.name() == "gdal":
+                    parallel.setdefault(id(provider), []).append(index)
+        steps = len(parallel) + 1
+        for step, indices in enumerate(parallel.values()):
+            provider, raster_crs, _ = self.raster_bands[indices[0]]
+            bands = [self.raster_bands[index][2] for index in indices]
+            try:
+                extractor = ParallelRasterExtractor.from_provider(provider, bands, workers=self.workers)
+            except RuntimeError:
+                # Источник не открывается GDAL напрямую — читаем в текущем процессе
+                continue
+            xs, ys = raster_coordinates[raster_crs.toWkt()]
+            values, valid = extractor.sample(xs, ys, ProgressStep(feedback, 100 * step / steps, 100 * (step + 1) / steps))
+            for position, index in enumerate(indices):
+                results[index] = (values[position], valid[position])
+
+        # Остальные каналы — в текущем процессе, с общим кэшем блоков
+        pending = [
+            index for index, (provider, _, _) in enumerate(self.raster_bands)
+            if results[index] is None and provider is not None
+        ]
+        samplers = [
+            RasterBlockSampler(QgisRasterSource(self.raster_bands[index][0]), self.raster_bands[index][2], cache=cache)
+            for index in pending
+        ]
+        sampled = sample_rasters(
+            samplers, [raster_coordinates[self.raster_bands[index][1].toWkt()] for index in pending],
+            ProgressStep(feedback, 100 * (steps - 1) / steps, 100)
+        )
+        for index, result in zip(pending, sampled):
+            results[index] = result
+
+        # Для точек, где чтение не удалось (nodata или вне растра), пишем NULL
+        columns = []
+        for result in results:
+            if result is None:
+                columns.append([None] * point_count)
+            else:
+                values, valid = result
+                columns.append([float(value) if ok else None for value, ok in zip(values.tolist(), valid.tolist())])
+        return columns
+
+
+class TextMappingTask(AssessmentTask):
+    """Запись названий классов в поле RasterText по значениям RasterValue.
+
+    Для слоёв GeoPackage, SpatiaLite и PostGIS сопоставление выполняется
+    в базе данных одним запросом UPDATE ... CASE. В остальных случаях
+    (или если запрос не удался) идентификаторы объектов группируются по
+    значениям RasterValue, и изменения записываются одним вызовом
+    changeAttributeValues() после завершения задачи. Столбец RasterValue
+    берётся из кэша столбцов слоя или читается в фоне (ColumnSnapshot).
+    Поле RasterText, если его нет, добавляется в слой при записи результата
+    (в основном потоке).
+    """
+
+    operation = "apply_text_mappings"
+
+    def __init__(self, layer, mappings):
+        super().__init__("Добавление названий классов")
+        self.layer = layer
+        self.mappings = mappings
+        self.database_table = DatabaseTable.from_layer(layer)
+        self.updated_in_database = False
+        self.snapshot = ColumnSnapshot(layer, ['RasterValue'])
+        self.feature_ids = self.raster_values = None
+        self.changes = {}
+
+    def process(self):
+        if self.snapshot.fields.indexOf('RasterValue') < 0:
+            raise ValueError("В слое отсутствует столбец RasterValue.")
+        # Запрос к базе данных возможен, только если поле RasterText уже есть
+        has_text_field = self.snapshot.fields.indexOf('RasterText') >= 0
+        if self.database_table is not None and self.mappings and has_text_field:
+            try:
+                with self.profile.stage("database_update"):
+                    self.database_table.update_by_mapping('RasterText', 'RasterValue', self.mappings)
+                self.updated_in_database = True
+                return
+            except QgsProviderConnectionException as error:
+                QgsMessageLog.logMessage(
+                    f"Запрос к базе данных не выполнен, значения будут записаны через QGIS: {error}",
+                    MESSAGE_TAG, Qgis.Warning
+                )
+
+        report_progress(self.feedback, 0, 1)
+        with self.profile.stage("column_snapshot") as stage:
+            self.feature_ids, columns = self.snapshot.read()
+            self.raster_values = columns['RasterValue']
+            stage["items"] = len(self.feature_ids)
+        with self.profile.stage("group_ids", len(self.feature_ids)):
+            self.changes = mapped_values(self.feature_ids, self.raster_values, self.mappings)
+
+    def apply_result(self):
+        if self.updated_in_database:
+            # Данные изменены в обход слоя — перечитываем их
+            self.layer.reload()
+            column_cache(self.layer).invalidate()
+        else:
+            add_field_if_missing(self.layer, QgsField('RasterText', QVariant.String))
+            with self.profile.stage("attribute_write", len(self.changes)):
+                write_attribute_values(self.layer, 'RasterText', self.changes)
+        self.layer.triggerRepaint()
+
+
+class StatisticsTask(AssessmentTask):
+    """Расчёт показателей точности по столбцам слоя оценки.
+
+    Столбцы классов и оценок берутся из кэша столбцов слоя (после сеанса
+    оценки он уже заполнен, и слой повторно не читается) или читаются
+    в фоне (ColumnSnapshot). Если задан растр классификации, площади классов
+    подсчитываются по нему потоково для оценок, взвешенных по площади.
+    """
+
+    operation = "calculate_statistics"
+    reportReady = pyqtSignal(object)
+
+    def __init__(self, layer, reference_field=None, raster_layer=None):
+        super().__init__("Статистика оценки точности")
+        self.reference_field = reference_field
+        names = list(ASSESSMENT_COLUMNS)
+        if reference_field:
+            names.append(reference_field)
+        # Столбцы, которых нет в кэше, читаются в фоне из снимка слоя
+        self.snapshot = ColumnSnapshot(layer, names)
+        self.raster_provider = None
+        if raster_layer is not None and raster_layer.isValid():
+            self.raster_provider = raster_layer.dataProvider().clone()
+        self.report = None
+
+    def process(self):
+        with self.profile.stage("column_snapshot") as stage:
+            feature_ids, columns = self.snapshot.read()
+            stage["items"] = feature_ids.size
+        report_progress(self.feedback, 20, 100)
+
+        class_field = 'RasterText' if 'RasterText' in columns else 'RasterValue'
+        if class_field not in columns:
+            raise ValueError("В слое отсутствует столбец RasterText или RasterValue.")
+        map_labels = columns[class_field]
+        check_field = self.reference_field or 'Assessment'
+        if check_field not in columns:
+            raise ValueError(f"В слое отсутствует столбец {check_field}.")
+        checks = columns[check_field]
+
+        valid = ~self._null_mask(map_labels) & ~self._null_mask(checks)
+        if not valid.any():
+            raise ValueError("В слое отсутствуют данные для анализа.")
+        map_labels, checks = map_labels[valid], checks[valid]
+
+        text_labels = map_labels.dtype == object or bool(self.reference_field and checks.dtype == object)
+        if text_labels:
+            map_labels = map_labels.astype(str)
+
+        class_areas = None
+        if self.raster_provider is not None:
+            with self.profile.stage("class_areas"):
+                class_areas = self.class_areas(columns, class_field, valid, ProgressStep(self.feedback, 20, 90))
+
+        with self.profile.stage("statistics", map_labels.size):
+            if self.reference_field:
+                reference_labels = checks.astype(str) if text_labels else checks
+                self.report = accuracy_statistics(
+                    map_labels, reference_labels=reference_labels, class_areas=class_areas
+                )
+            else:
+                self.report = accuracy_statistics(map_labels, agreement=checks == 1, class_areas=class_areas)
+
+    def class_areas(self, columns, class_field, valid, feedback):
+        """Число пикселей растра по классам карты (для названий классов — по сопоставлению значений)."""
+        sampler = RasterBlockSampler(QgisRasterSource(self.raster_provider))
+        self.profile.count_cache(sampler.cache)
+        counts = ClassAreaHistogram(sampler).compute(feedback)
+        if class_field == 'RasterValue':
+            return counts
+
+        # Соответствие значений растра названиям классов берётся из самого слоя
+        names = {}
+        if 'RasterValue' in columns:
+            for value, name in zip(columns['RasterValue'][valid].tolist(), columns[class_field][valid].tolist()):
+                if not np.isnan(value):
+                    names.setdefault(value, str(name))
+        areas = {}
+        for value, count in counts.items():
+            name = names.get(value)
+            if name is not None:
+                areas[name] = areas.get(name, 0) + count
+        return areas
+
+    @staticmethod
+    def _null_mask(values):
+        if values.dtype == object:
+            return np.array([value is None for value in values.tolist()], dtype=bool)
+        return np.isnan(values)
+
+    def apply_result(self):
+        self.reportReady.emit(self.report)
+
+
+def ogr_geometry(geometry):
+    """Копия QgsGeometry в виде геометрии OGR (для модулей ядра без QGIS)."""
+    if geometry is None or geometry.isEmpty():
+        return None
+    return ogr.CreateGeometryFromWkb(bytes(geometry.asWkb()))
+
+
+def provenance_fields():
+    """Поля происхождения точки: исходный слой и идентификатор объекта в нём."""
+    layer_name, feature_id = PROVENANCE_FIELDS
+    return [QgsField(layer_name, QVariant.String), QgsField(feature_id, QVariant.LongLong)]
+
+
+def window_fields():
+    """Поля статистики окрестности точек."""
+    majority, purity, distinct = WINDOW_FIELDS
+    return [QgsField(majority, QVariant.Double), QgsField(purity, QVariant.Double), QgsField(distinct, QVariant.Int)]
+
+
+def window_columns(sample):
+    """Столбцы статистики окрестности; NaN записывается как NULL."""
+    return [
+        [None if np.isnan(value) else value for value in sample.majority.tolist()],
+        [None if np.isnan(value) else value for value in sample.purity.tolist()],
+        sample.distinct.tolist(),
+    ]
+
+
+def log_profile(profile):
+    """Завершает профиль операции и записывает сводку в журнал сообщений QGIS."""
+    profile = profile.finish()
+    if profile is not None:
+        QgsMessageLog.logMessage(profile.summary(), MESSAGE_TAG, Qgis.Info)
+
+
+# Ссылки на запущенные задачи, чтобы Python-объекты не были удалены сборщиком мусора
+_running_tasks = set()
+
+
+def start_task(task, iface=None, success_message=None):
+    """Запускает задачу через диспетчер задач QGIS и сообщает о результате."""
+    _running_tasks.add(task)
+
+    def on_completed():
+        _running_tasks.discard(task)
+        if iface is None:
+            return
+        if task.error:
+            # Результат не удалось применить к проекту (см. finished())
+            iface.messageBar().pushWarning(task.description(), task.error)
+        elif success_message:
+            iface.messageBar().pushSuccess(task.description(), success_message)
+
+    def on_terminated():
+        _running_tasks.discard(task)
+        if iface is not None:
+            iface.messageBar().pushWarning(task.description(), task.error or "Операция отменена.")
+
+    task.taskCompleted.connect(on_completed)
+    task.taskTerminated.connect(on_terminated)
+    QgsApplication.taskManager().addTask(task)
+    return task
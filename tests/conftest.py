@@ -0,0 +1,21 @@
+# Тесты вычислительного ядра модуля: нужны только NumPy и pytest, без QGIS.
+# Тесты выборки по полигонам (геометрии OGR) пропускаются, если GDAL не установлен.
+#
+#     python -m pytest tests
+import importlib.util
+import os
+import sys
+
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "accuracy_assessment"
+
+# Пакет модуля подключается под постоянным именем, каким бы ни был его каталог;
+# __init__.py модуля не импортирует QGIS до вызова classFactory()
+if PACKAGE_NAME not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(PLUGIN_DIR, "__init__.py"), submodule_search_locations=[PLUGIN_DIR]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from accuracy_assessment.accuracy_statistics import RunningAccuracy, accuracy_statistics, confusion_matrix
+
+
+# Пример Olofsson et al. (2014), табл. 8: матрица ошибок выборки (строки — карта,
+# столбцы — эталон) и площади классов карты в пикселях
+OLOFSSON_MATRIX = np.array([
+    [66, 0, 5, 4],
+    [0, 55, 8, 12],
+    [1, 0, 153, 11],
+    [2, 1, 9, 313],
+])
+OLOFSSON_AREAS = {1: 200000, 2: 150000, 3: 3200000, 4: 6450000}
+
+
+def labels_from_matrix(matrix):
+    """Классы карты и эталона для точек, дающих заданную матрицу ошибок."""
+    map_labels, reference_labels = [], []
+    for row, counts in enumerate(matrix.tolist(), start=1):
+        for column, count in enumerate(counts, start=1):
+            map_labels += [row] * count
+            reference_labels += [column] * count
+    return np.array(map_labels), np.array(reference_labels)
+
+
+def test_confusion_matrix():
+    map_labels, reference_labels = labels_from_matrix(OLOFSSON_MATRIX)
+    classes, matrix = confusion_matrix(map_labels, reference_labels)
+    assert classes.tolist() == [1, 2, 3, 4]
+    np.testing.assert_array_equal(matrix, OLOFSSON_MATRIX)
+
+
+def test_olofsson_example():
+    map_labels, reference_labels = labels_from_matrix(OLOFSSON_MATRIX)
+    report = accuracy_statistics(map_labels, reference_labels=reference_labels, class_areas=OLOFSSON_AREAS)
+
+    assert report.weighted_overall == pytest.approx(0.947, abs=5e-4)
+    assert report.weighted_overall_se == pytest.approx(0.0094, abs=5e-5)
+    np.testing.assert_allclose(report.users, [0.88, 0.73, 0.93, 0.96], atol=5e-3)
+    np.testing.assert_allclose(report.weighted_producers, [0.75, 0.85, 0.93, 0.96], atol=5e-3)
+    # Площадь обезлесения: 21 158 ± 6 158 га (95 %) при площади карты 900 000 га
+    assert report.area_proportions[0] * 900000 == pytest.approx(21158, abs=5)
+    assert 1.96 * report.area_proportions_se[0] * 900000 == pytest.approx(6158, abs=5)
+    # Точность производителя для обезлесения: 0,75 ± 0,21 (95 %)
+    assert 1.96 * report.weighted_producers_se[0] == pytest.approx(0.21, abs=5e-3)
+
+
+def test_kappa():
+    report = accuracy_statistics([1, 1, 2, 2], reference_labels=[1, 2, 2, 2])
+    # Наблюдаемое согласие 0,75, ожидаемое (2 * 1 + 2 * 3) / 16 = 0,5
+    assert report.overall == pytest.approx(0.75)
+    assert report.kappa == pytest.approx(0.5)
+    np.testing.assert_allclose(report.producers, [1.0, 2 / 3])
+
+
+def test_agreement_matches_matrix_diagonal():
+    map_labels, reference_labels = labels_from_matrix(OLOFSSON_MATRIX)
+    by_matrix = accuracy_statistics(map_labels, reference_labels=reference_labels, class_areas=OLOFSSON_AREAS)
+    by_agreement = accuracy_statistics(
+        map_labels, agreement=map_labels == reference_labels, class_areas=OLOFSSON_AREAS
+    )
+    np.testing.assert_allclose(by_agreement.users, by_matrix.users)
+    assert by_agreement.weighted_overall == pytest.approx(by_matrix.weighted_overall)
+    assert by_agreement.producers is None
+
+
+def test_running_accuracy_matches_batch_statistics():
+    map_labels, reference_labels = labels_from_matrix(OLOFSSON_MATRIX)
+    running = RunningAccuracy()
+    for label, reference in zip(map_labels.tolist(), reference_labels.tolist()):
+        running.record(label, int(label == reference), label)
+    running = RunningAccuracy.from_dict(running.to_dict())
+
+    report = running.report(OLOFSSON_AREAS)
+    expected = accuracy_statistics(map_labels, agreement=map_labels == reference_labels, class_areas=OLOFSSON_AREAS)
+    np.testing.assert_allclose(report.users, expected.users)
+    assert report.weighted_overall == pytest.approx(expected.weighted_overall)
+    assert running.total == map_labels.size
+
+
+def test_running_accuracy_from_columns():
+    labels = np.array(["лес", "лес", None, "вода", "", "вода"], dtype=object)
+    checks = np.array([1, 0, 1, np.nan, 1, 1])
+    raster_values = np.array([1, 1, np.nan, 2, 3, 2], dtype=np.float64)
+    running = RunningAccuracy.from_columns(labels, checks, raster_values)
+    # Неоценённые точки не учитываются, точки без класса — только в общем числе
+    assert running.counts == {"лес": [2, 1], "вода": [1, 1]}
+    assert running.unlabeled == 2
+    assert running.total == 5
+    assert running.names == {1.0: "лес", 2.0: "вода"}
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from accuracy_assessment import instrumentation
+
+
+@pytest.fixture
+def profiling():
+    instrumentation.set_enabled(True)
+    instrumentation.set_memory_tracing(True)
+    instrumentation.clear_profiles()
+    yield
+    instrumentation.set_memory_tracing(False)
+    instrumentation.set_enabled(False)
+    instrumentation.clear_profiles()
+
+
+def test_recorded_profiles_are_bounded(profiling):
+    for i in range(instrumentation.MAX_PROFILES + 5):
+        instrumentation.start_profile(f"operation_{i}").finish()
+    profiles = instrumentation.recorded_profiles()
+    assert len(profiles) == instrumentation.MAX_PROFILES
+    assert profiles[-1]["operation"] == f"operation_{instrumentation.MAX_PROFILES + 4}"
+
+
+def test_stage_peak_memory_only_for_stages_running_alone(profiling):
+    profile = instrumentation.start_profile("memory")
+    with profile.stage("alone"):
+        data = bytearray(4 * 2 ** 20)
+    del data
+    assert profile.stages["alone"]["peak_memory"] >= 4 * 2 ** 20
+
+    # Пока идёт этап, в другом потоке начинается этап другой операции:
+    # общий для процесса пик не приписывается ни одному из них
+    other = instrumentation.start_profile("other")
+    started, release = threading.Event(), threading.Event()
+
+    def run_other():
+        with other.stage("concurrent"):
+            started.set()
+            release.wait()
+
+    with profile.stage("overlapped"):
+        thread = threading.Thread(target=run_other)
+        thread.start()
+        started.wait()
+    release.set()
+    thread.join()
+    assert profile.stages["overlapped"]["peak_memory"] is None
+    assert other.stages["concurrent"]["peak_memory"] is None
+
+
+def test_memory_tracing_is_separate_from_timing(profiling):
+    instrumentation.set_memory_tracing(False)
+    profile = instrumentation.start_profile("timing")
+    with profile.stage("work", 10):
+        pass
+    stage = profile.finish().to_dict()["stages"][0]
+    assert stage["items"] == 10 and stage["peak_memory"] is None
@@ -0,0 +1,47 @@
+# Тесты выборки по полигонам и маски полигонов; нужны привязки GDAL (osgeo).
+import numpy as np
+import pytest
+
+ogr = pytest.importorskip("osgeo.ogr")
+
+from accuracy_assessment.polygon_mask import PolygonRasterMask
+from accuracy_assessment.polygon_sampling import PolygonPointSampler, points_in_polygon
+from accuracy_assessment.raster_sampling import RasterBlockSampler
+
+from test_window_statistics import ArraySource
+
+
+SQUARE_WITH_HOLE = "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0), (4 4, 6 4, 6 6, 4 6, 4 4))"
+
+
+def test_points_in_polygon_with_hole():
+    edges = np.array([
+        [0, 0, 10, 0], [10, 0, 10, 10], [10, 10, 0, 10], [0, 10, 0, 0],
+        [4, 4, 6, 4], [6, 4, 6, 6], [6, 6, 4, 6], [4, 6, 4, 4],
+    ], dtype=np.float64)
+    xs = np.array([1.0, 5.0, 11.0, 9.5, 4.5])
+    ys = np.array([1.0, 5.0, 5.0, 9.5, 7.0])
+    assert points_in_polygon(edges, xs, ys, chunk_size=8).tolist() == [True, False, False, True, True]
+
+
+def test_polygon_sampler_points_inside():
+    geometries = [
+        ogr.CreateGeometryFromWkt(SQUARE_WITH_HOLE),
+        ogr.CreateGeometryFromWkt("MULTIPOLYGON (((20 0, 30 0, 20 10, 20 0)))"),
+    ]
+    sampler = PolygonPointSampler(geometries, max_depth=4, seed=0)
+    assert sampler.area == pytest.approx(96 + 50)
+    xs, ys = sampler.sample(5000, batch_size=1000)
+    assert xs.size == ys.size == 5000
+    in_square = (xs >= 0) & (xs <= 10) & (ys >= 0) & (ys <= 10) & ~((xs > 4) & (xs < 6) & (ys > 4) & (ys < 6))
+    in_triangle = (xs >= 20) & (ys >= 0) & (xs - 20 + ys <= 10)
+    assert (in_square | in_triangle).all()
+    # Плотность точек равномерна: доли частей пропорциональны их площадям
+    assert in_triangle.mean() == pytest.approx(50 / 146, abs=0.03)
+
+
+def test_polygon_raster_mask_uses_pixel_centres():
+    sampler = RasterBlockSampler(ArraySource(np.ones((10, 10), dtype=np.uint8)), tile_size=4)
+    mask = PolygonRasterMask([ogr.CreateGeometryFromWkt("POLYGON ((0 0, 5 0, 5 10, 0 10, 0 0))")], sampler)
+    np.testing.assert_array_equal(mask(0, 0, 10, 10), np.broadcast_to(np.arange(10) < 5, (10, 10)))
+    assert not mask(0, 8, 4, 2).any()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from accuracy_assessment.spatial_hash import SpatialHash
+
+
+def greedy_filter(xs, ys, radius):
+    """Эталон: точки по порядку, каждая сравнивается со всеми принятыми."""
+    kept_xs, kept_ys, keep = [], [], []
+    for x, y in zip(xs, ys):
+        accepted = all((x - kx) ** 2 + (y - ky) ** 2 >= radius ** 2 for kx, ky in zip(kept_xs, kept_ys))
+        keep.append(accepted)
+        if accepted:
+            kept_xs.append(x)
+            kept_ys.append(y)
+    return np.array(keep, dtype=bool)
+
+
+@pytest.mark.parametrize("xs", [[0, 0.9, 1.3], [0, 0.8, 1.6]])
+def test_chain_keeps_far_end(xs):
+    keep = SpatialHash(1).insert(xs, np.zeros(len(xs)))
+    assert keep.tolist() == [True, False, True]
+
+
+def test_result_does_not_depend_on_batches():
+    xs, ys = [0, 0.9, 1.3], [0, 0, 0]
+    grid = SpatialHash(1)
+    keep = np.concatenate([grid.insert(xs[:1], ys[:1]), grid.insert(xs[1:], ys[1:])])
+    assert keep.tolist() == SpatialHash(1).insert(xs, ys).tolist()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_greedy_filter(seed):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(1, 400))
+    # Часть точек — близкие копии других, как при объединении слоёв
+    xs, ys = rng.uniform(0, 10, count), rng.uniform(0, 10, count)
+    copies = rng.integers(0, count, count // 3)
+    xs = np.concatenate([xs, xs[copies] + rng.normal(0, 0.1, copies.size)])
+    ys = np.concatenate([ys, ys[copies] + rng.normal(0, 0.1, copies.size)])
+    radius = rng.uniform(0.1, 2)
+
+    grid = SpatialHash(radius)
+    split = int(rng.integers(0, xs.size + 1))
+    keep = np.concatenate([grid.insert(xs[:split], ys[:split]), grid.insert(xs[split:], ys[split:])])
+    np.testing.assert_array_equal(keep, greedy_filter(xs, ys, radius))
+    assert len(grid) == keep.sum()
+
+
+def test_long_chain_matches_greedy_filter():
+    xs = np.arange(0, 100, 0.05)
+    ys = np.zeros(xs.size)
+    np.testing.assert_array_equal(SpatialHash(1).insert(xs, ys), greedy_filter(xs, ys, 1))
+
+
+def test_limit_and_invalid_coordinates():
+    keep = SpatialHash(1).insert([0, np.nan, 5, 10, 15], [0, 0, 0, 0, 0], limit=2)
+    # Точки с NaN не проверяются, но считаются добавленными
+    assert keep.tolist() == [True, True, False, False, False]
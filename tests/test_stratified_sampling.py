@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from accuracy_assessment.raster_sampling import RasterBlockSampler
+from accuracy_assessment.stratified_sampling import (
+    ClassAreaHistogram, allocate_equal, allocate_olofsson, allocate_proportional
+)
+
+from test_window_statistics import ArraySource
+
+
+def test_allocate_proportional():
+    assert allocate_proportional({1: 700, 2: 200, 3: 100}, 10) == {1: 7, 2: 2, 3: 1}
+    # Остаток распределяется по наибольшим дробным частям, сумма сохраняется
+    allocation = allocate_proportional({1: 1, 2: 1, 3: 1}, 100)
+    assert sum(allocation.values()) == 100
+    assert sorted(allocation.values()) == [33, 33, 34]
+
+
+def test_allocate_equal():
+    allocation = allocate_equal({1: 5, 2: 500, 3: 50000}, 10)
+    assert sum(allocation.values()) == 10
+    assert max(allocation.values()) - min(allocation.values()) <= 1
+
+
+def test_allocate_olofsson_sample_size():
+    # n = (sum W_i * S_i / S(O))^2 = (0,4 / 0,05)^2 = 64
+    assert allocate_olofsson({1: 1, 2: 1}, target_standard_error=0.05, expected_accuracy=0.8, min_per_class=0) == {
+        1: 32, 2: 32
+    }
+
+
+@pytest.mark.parametrize("min_per_class", [0, 50])
+def test_allocate_olofsson_minimum_per_class(min_per_class):
+    counts = {1: 200000, 2: 150000, 3: 3200000, 4: 6450000}
+    accuracies = {1: 0.7, 2: 0.6, 3: 0.9, 4: 0.95}
+    allocation = allocate_olofsson(counts, 0.01, accuracies, min_per_class=min_per_class)
+    assert min(allocation.values()) >= min_per_class
+    # Распределение по Нейману: больше точек в больших и менее точных классах
+    assert allocation[4] > allocation[3] > allocation[1] >= allocation[2]
+
+
+@pytest.mark.parametrize("target_standard_error", [0, -0.01, float("nan")])
+def test_allocate_olofsson_rejects_target_standard_error(target_standard_error):
+    with pytest.raises(ValueError):
+        allocate_olofsson({1: 1, 2: 1}, target_standard_error=target_standard_error)
+
+
+def test_class_area_histogram_block_mask():
+    data = np.repeat(np.arange(1, 5), 25).reshape(10, 10)
+    sampler = RasterBlockSampler(ArraySource(data), tile_size=4)
+    calls = []
+
+    def left_half(row0, col0, rows, cols):
+        calls.append((row0, col0, rows, cols))
+        return np.broadcast_to(np.arange(col0, col0 + cols) < 5, (rows, cols))
+
+    histogram = ClassAreaHistogram(sampler, mask=left_half)
+    assert histogram.compute() == {1: 15, 2: 10, 3: 15, 4: 10}
+    xs, ys, values = histogram.place_points({1: 5, 4: 20}, rng=np.random.default_rng(0))
+    # Маска строится один раз на блок и повторно используется при размещении точек
+    assert len(calls) == 9
+    assert (xs < 5).all()
+    assert (values == 1).sum() == 5 and (values == 4).sum() == 10
@@ -0,0 +1,23 @@
+import numpy as np
+
+from accuracy_assessment.value_mapping import mapped_values
+
+
+def test_mapped_values():
+    feature_ids = np.array([10, 11, 12, 13, 14])
+    values = np.array([1.0, 2.0, 1.0, np.nan, 3.0])
+    changes = mapped_values(feature_ids, values, {1.0: "Лес", 3.0: "Вода", 5.0: "Луг"})
+    # Значения без сопоставления и NULL (NaN) не изменяются
+    assert changes == {10: "Лес", 12: "Лес", 14: "Вода"}
+
+
+def test_mapped_values_matches_loop():
+    rng = np.random.default_rng(0)
+    feature_ids = rng.permutation(1000)
+    values = rng.integers(0, 20, 1000).astype(np.float64)
+    mappings = {float(value): f"Класс {value}" for value in range(0, 20, 3)}
+    expected = {
+        feature_id: mappings[value]
+        for feature_id, value in zip(feature_ids.tolist(), values.tolist()) if value in mappings
+    }
+    assert mapped_values(feature_ids, values, mappings) == expected
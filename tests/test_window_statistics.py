@@ -0,0 +1,68 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from accuracy_assessment.raster_sampling import Extent, RasterBlock, RasterBlockSampler
+from accuracy_assessment.window_statistics import window_modes, window_statistics
+
+
+class ArraySource:
+    """Источник растра для RasterBlockSampler из массива NumPy (пиксель 1 x 1)."""
+
+    def __init__(self, data, nodata=None):
+        self.data = data
+        self.nodata = nodata
+        self.uri = "memory"
+        self.crs_wkt = ""
+        self.height, self.width = data.shape
+        self.extent = Extent(0.0, 0.0, float(self.width), float(self.height))
+
+    def numpy_dtype(self, band):
+        return self.data.dtype
+
+    def read_block(self, band, row0, col0, rows, cols):
+        data = self.data[row0:row0 + rows, col0:col0 + cols].copy()
+        return RasterBlock(data, None if self.nodata is None else data == self.nodata, None)
+
+    def sample_point(self, x, y, band):
+        raise NotImplementedError
+
+
+def test_window_modes():
+    windows = np.array([
+        [1, 1, 2, np.nan],
+        [2, 1, 2, 1],
+        [np.nan, np.nan, np.nan, np.nan],
+        [3, 3, 3, 3],
+    ])
+    majority, purity, distinct = window_modes(windows)
+    # При равенстве частот выбирается меньшее значение; NaN не учитывается
+    np.testing.assert_array_equal(majority, [1, 1, np.nan, 3])
+    np.testing.assert_allclose(purity, [2 / 3, 0.5, np.nan, 1.0])
+    np.testing.assert_array_equal(distinct, [2, 2, 0, 1])
+
+
+@pytest.mark.parametrize("window_size", [1, 3, 5])
+def test_window_statistics_matches_direct_count(window_size):
+    rng = np.random.default_rng(window_size)
+    data = rng.integers(0, 4, (70, 90)).astype(np.uint8)
+    sampler = RasterBlockSampler(ArraySource(data, nodata=0), tile_size=16)
+    xs, ys = rng.uniform(-2, 92, 300), rng.uniform(-2, 72, 300)
+    majority, purity, distinct = window_statistics(sampler, xs, ys, window_size)
+
+    half = window_size // 2
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        row, col = int(np.floor(70 - y)), int(np.floor(x))
+        if not (0 <= row < 70 and 0 <= col < 90):
+            assert np.isnan(majority[i])
+            continue
+        window = data[max(row - half, 0):row + half + 1, max(col - half, 0):col + half + 1]
+        counts = Counter(value for value in window.ravel().tolist() if value != 0)
+        if not counts:
+            assert np.isnan(majority[i]) and distinct[i] == 0
+            continue
+        best = min(counts, key=lambda value: (-counts[value], value))
+        assert majority[i] == best
+        assert purity[i] == pytest.approx(counts[best] / sum(counts.values()))
+        assert distinct[i] == len(counts)
@@ -0,0 +1,22 @@
+import numpy as np
+
+
+def mapped_values(feature_ids, values, mappings):
+    """Новые значения объектов по сопоставлению {значение: новое значение}.
+
+    Возвращает словарь {идентификатор объекта: новое значение}. Объекты
+    группируются по значениям одной сортировкой, без просмотра всего
+    столбца для каждого значения сопоставления.
+    """
+    values = np.asarray(values)
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    keys = np.array(list(mappings), dtype=values.dtype)
+    starts = np.searchsorted(sorted_values, keys, side='left')
+    ends = np.searchsorted(sorted_values, keys, side='right')
+
+    changes = {}
+    for new_value, start, end in zip(mappings.values(), starts.tolist(), ends.tolist()):
+        for feature_id in np.asarray(feature_ids)[order[start:end]].tolist():
+            changes[feature_id] = new_value
+    return changes
@@ -0,0 +1,168 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+
+HOMOGENEITY_KEEP = "keep"
+HOMOGENEITY_DROP = "drop"
+HOMOGENEITY_REPLACE = "replace"
+
+# Действия с неоднородными точками и их названия в интерфейсе
+HOMOGENEITY_ACTIONS = [
+    (HOMOGENEITY_KEEP, "Оставить все точки"),
+    (HOMOGENEITY_DROP, "Удалить неоднородные точки"),
+    (HOMOGENEITY_REPLACE, "Заменить неоднородные точки"),
+]
+
+# Столбцы статистики окрестности в слое точек
+WINDOW_FIELDS = ("WindowMajority", "WindowPurity", "WindowClasses")
+
+# Точки выборки: координаты, значение растра и статистика окрестности
+PointSample = namedtuple('PointSample', ['xs', 'ys', 'values', 'majority', 'purity', 'distinct'])
+
+
+class WindowFilter:
+    """Параметры окрестности точки.
+
+    window_size — сторона окна в пикселях (нечётная), min_purity — доля
+    пикселей окна, которые должны относиться к преобладающему классу,
+    action — что делать с неоднородными точками: оставить, удалить или
+    заменить новыми.
+    """
+
+    def __init__(self, window_size=3, min_purity=0.0, action=HOMOGENEITY_KEEP):
+        if window_size < 1 or window_size % 2 == 0:
+            raise ValueError("Размер окна должен быть нечётным положительным числом.")
+        self.window_size = window_size
+        self.min_purity = min_purity
+        self.action = action
+
+    def accepted(self, purity):
+        """Маска точек с однородной окрестностью."""
+        with np.errstate(invalid='ignore'):
+            return np.asarray(purity) >= self.min_purity
+
+
+def window_statistics(sampler, xs, ys, window_size, feedback=None):
+    """Статистика окна window_size x window_size пикселей вокруг каждой точки.
+
+    Возвращает массивы преобладающего класса, доли его пикселей среди
+    пикселей окна с данными и числа различных классов. Окна извлекаются
+    векторной индексацией из тайлов кэша сэмплера (RasterBlockSampler);
+    координаты должны быть заданы в системе координат растра. Для точек
+    вне растра или без данных в окне класс и доля равны NaN.
+    """
+    if sampler.dtype is None:
+        raise ValueError("Растр не поддерживает поблочное чтение.")
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    majority = np.full(xs.shape, np.nan)
+    purity = np.full(xs.shape, np.nan)
+    distinct = np.zeros(xs.shape, dtype=np.int64)
+
+    half = window_size // 2
+    row_offsets, col_offsets = np.mgrid[0:window_size, 0:window_size]
+    row_offsets, col_offsets = row_offsets.ravel(), col_offsets.ravel()
+    tile_size = sampler.tile_size
+    for tile_row, tile_col, target, local_rows, local_cols in sampler.tile_groups(xs, ys, feedback):
+        # Тайл с полосами соседних тайлов шириной в половину окна
+        row0, col0 = tile_row * tile_size - half, tile_col * tile_size - half
+        pixels = sampler.read_pixels(row0, row0 + tile_size + 2 * half, col0, col0 + tile_size + 2 * half)
+        windows = pixels[local_rows[:, None] + row_offsets, local_cols[:, None] + col_offsets]
+        majority[target], purity[target], distinct[target] = window_modes(windows)
+    return majority, purity, distinct
+
+
+def window_modes(windows):
+    """Преобладающее значение, его доля и число различных значений в каждой строке.
+
+    windows — массив (точки, пиксели окна), NaN — пиксели без данных.
+    При равенстве частот выбирается меньшее значение.
+    """
+    point_count, window_length = windows.shape
+    ordered = np.sort(windows, axis=1)
+    valid = ~np.isnan(ordered)
+    # Начала серий одинаковых значений в отсортированных строках (NaN — в конце строк)
+    starts = valid.copy()
+    starts[:, 1:] &= ordered[:, 1:] != ordered[:, :-1]
+    distinct = starts.sum(axis=1)
+    valid_counts = valid.sum(axis=1)
+
+    run_starts = np.flatnonzero(starts.ravel())
+    run_ids = np.cumsum(starts.ravel()) - 1
+    lengths = np.bincount(run_ids[valid.ravel()], minlength=run_starts.size)
+    run_rows = run_starts // window_length
+
+    # Самая длинная серия в каждой строке
+    order = np.lexsort((-lengths, run_rows))
+    first = np.r_[True, run_rows[order][1:] != run_rows[order][:-1]] if order.size else np.zeros(0, dtype=bool)
+    best = order[first]
+
+    majority = np.full(point_count, np.nan)
+    purity = np.full(point_count, np.nan)
+    majority[run_rows[best]] = ordered.ravel()[run_starts[best]]
+    purity[run_rows[best]] = lengths[best] / valid_counts[run_rows[best]]
+    return majority, purity, distinct
+
+
+def collect_homogeneous(draw, allocation, window, stratified=False, max_rounds=20):
+    """Отбирает точки по однородности окрестности.
+
+    draw(allocation) возвращает PointSample для распределения {страта:
+    число точек}; без стратификации используется единственная страта None,
+    при стратификации стратой служит значение растра. Неоднородные точки
+    удаляются, а при замене недостающие точки добираются повторными
+    выборками (с запасом по доле принятых точек), но не более max_rounds раз.
+    """
+    sample = draw(allocation)
+    if window is None or window.action == HOMOGENEITY_KEEP:
+        return sample
+    accepted = [_take(sample, window.accepted(sample.purity))]
+    if window.action != HOMOGENEITY_REPLACE:
+        return accepted[0]
+
+    drawn = _strata_counts(sample, stratified)
+    kept = _strata_counts(accepted[0], stratified)
+    for _ in range(max_rounds):
+        missing = {
+            stratum: target - kept.get(stratum, 0)
+            for stratum, target in allocation.items() if target > kept.get(stratum, 0)
+        }
+        if not missing:
+            break
+        request = {}
+        for stratum, count in missing.items():
+            rate = kept.get(stratum, 0) / drawn[stratum] if drawn.get(stratum) else 1.0
+            request[stratum] = int(math.ceil(count / max(rate, 0.05)))
+        extra = draw(request)
+        if extra.xs.size == 0:
+            break
+        extra_accepted = _take(extra, window.accepted(extra.purity))
+        accepted.append(extra_accepted)
+        for counts, part in ((drawn, extra), (kept, extra_accepted)):
+            for stratum, count in _strata_counts(part, stratified).items():
+                counts[stratum] = counts.get(stratum, 0) + count
+
+    # Лишние точки последних выборок отбрасываются
+    result = _concatenate(accepted)
+    keep = np.zeros(result.xs.size, dtype=bool)
+    for stratum, target in allocation.items():
+        positions = np.flatnonzero(result.values == stratum) if stratified else np.arange(result.xs.size)
+        keep[positions[:target]] = True
+    return _take(result, keep)
+
+
+def _take(sample, mask):
+    return PointSample(*(array[mask] for array in sample))
+
+
+def _concatenate(samples):
+    return PointSample(*(np.concatenate(arrays) for arrays in zip(*samples)))
+
+
+def _strata_counts(sample, stratified):
+    if not stratified:
+        return {None: sample.xs.size}
+    values, counts = np.unique(sample.values, return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))